@@ -4,17 +4,35 @@ Pure Python wrapper around DuckDB's pybind11 generated wrapper.
 This API is intended to eventually be a drop-in replacement for SQLite
 in most cases.
 
+Importing the package is cheap: the connection classes, exceptions and
+type constructors are imported on first access, and DuckDB itself on
+first connect.
+
 """
-from pep249.type_constructors import *
-from pyduckdb.core import *
+import importlib
+
+# Not imported from `typing`, which is slow to import.
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from typing import Any, List, Optional
+    from pep249.type_constructors import *
+    from pyduckdb.core import *
+    from pyduckdb.core.adapters import register_adapter, register_converter
+    from pyduckdb.core.result_cache import ResultCache
+    from pyduckdb.core.rows import Row
 
 __all__ = [
     "apilevel",
     "threadsafety",
     "paramstyle",
     "connect",
+    "register_adapter",
+    "register_converter",
     "Connection",
     "Cursor",
+    "Row",
+    "ResultCache",
     "TimestampFromTicks",
     "TimeFromTicks",
     "DateFromTicks",
@@ -42,10 +60,87 @@ __version__ = "0.0.1b3"
 
 # pylint: disable=invalid-name
 apilevel = "2.0"
+# Connections can only be shared between threads when they're opened
+# with `thread_safe=True`, which isn't the default, so the module-level
+# guarantee is that threads may share the module but not connections.
 threadsafety = 1
 paramstyle = "qmark"
 
+_TYPE_CONSTRUCTORS = (
+    "TimestampFromTicks",
+    "TimeFromTicks",
+    "DateFromTicks",
+    "Date",
+    "Time",
+    "Timestamp",
+    "ROWID",
+    "DATETIME",
+    "NUMBER",
+    "BINARY",
+    "STRING",
+    "Binary",
+)
+_EXCEPTIONS = (
+    "Error",
+    "InterfaceError",
+    "DatabaseError",
+    "DataError",
+    "IntegrityError",
+    "InternalError",
+    "NotSupportedError",
+    "OperationalError",
+    "ProgrammingError",
+)
+# The module defining each lazily imported attribute.
+_LAZY_ATTRIBUTES = {
+    "Connection": "pyduckdb.core.connection",
+    "Cursor": "pyduckdb.core.cursor",
+    "Row": "pyduckdb.core.rows",
+    "ResultCache": "pyduckdb.core.result_cache",
+    "register_adapter": "pyduckdb.core.adapters",
+    "register_converter": "pyduckdb.core.adapters",
+    **{name: "pep249.type_constructors" for name in _TYPE_CONSTRUCTORS},
+    **{name: "pyduckdb.core.exceptions" for name in _EXCEPTIONS},
+}
+_SUBMODULES = ("aiopyduckdb", "core", "metrics", "parallel")
+
+
+def __getattr__(name: str) -> "Any":
+    """Import attributes on first access."""
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    try:
+        module = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
 
-def connect(connection_string: str = ":memory:", read_only=False) -> Connection:
+def __dir__() -> "List[str]":
+    return sorted(set(globals()) | set(__all__))
+
+
+def connect(
+    connection_string: str = ":memory:",
+    read_only=False,
+    statement_cache_size: int = 0,
+    statement_timeout: "Optional[float]" = None,
+    thread_safe: bool = False,
+    cursor_cache_size: int = 0,
+    result_cache: "Optional[ResultCache]" = None,
+) -> "Connection":
     """Connect to a DuckDB database, returning a connection."""
-    return Connection(connection_string, read_only=read_only)
+    # pylint: disable=import-outside-toplevel,redefined-outer-name
+    from pyduckdb.core.connection import Connection
+
+    return Connection(
+        connection_string,
+        read_only=read_only,
+        statement_cache_size=statement_cache_size,
+        statement_timeout=statement_timeout,
+        thread_safe=thread_safe,
+        cursor_cache_size=cursor_cache_size,
+        result_cache=result_cache,
+    )
@@ -1,26 +1,29 @@
 """
 Pure Python wrapper around DuckDB's pybind11 generated wrapper. This
-async implementation uses the sync implementation and asyncio.to_thread.
+async implementation runs the sync implementation on a dedicated worker
+thread per connection.
 
 This API is intended to showcase the utility of the PEP 249 abstract
 base classes.
 
+As with `pyduckdb`, attributes are imported on first access.
+
 """
-from pep249.type_constructors import *
-from pyduckdb.core.exceptions import (
-    DatabaseError,
-    DataError,
-    Error,
-    InterfaceError,
-    IntegrityError,
-    InternalError,
-    NotSupportedError,
-    OperationalError,
-    ProgrammingError,
-)
-from .connection import AsyncConnection
-from .cursor import AsyncCursor
-from .. import __version__
+import importlib
+from .. import _EXCEPTIONS, _TYPE_CONSTRUCTORS, __version__
+
+# Not imported from `typing`, which is slow to import.
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from typing import Any, List, Optional
+    from pep249.type_constructors import *
+    from pyduckdb.core.exceptions import *
+    from .connection import AsyncConnection
+    from .cursor import AsyncCursor
+    from .pool import AsyncConnectionPool
+    from pyduckdb.core.result_cache import ResultCache
+    from pyduckdb.core.rows import Row
 
 __all__ = [
     "apilevel",
@@ -29,6 +32,9 @@ __all__ = [
     "connect",
     "AsyncConnection",
     "AsyncCursor",
+    "AsyncConnectionPool",
+    "Row",
+    "ResultCache",
     "Binary",
     "STRING",
     "BINARY",
@@ -57,7 +63,51 @@ apilevel = "2.0"
 threadsafety = 1
 paramstyle = "qmark"
 
+_LAZY_ATTRIBUTES = {
+    "AsyncConnection": "pyduckdb.aiopyduckdb.connection",
+    "AsyncCursor": "pyduckdb.aiopyduckdb.cursor",
+    "AsyncConnectionPool": "pyduckdb.aiopyduckdb.pool",
+    "Row": "pyduckdb.core.rows",
+    "ResultCache": "pyduckdb.core.result_cache",
+    **{name: "pep249.type_constructors" for name in _TYPE_CONSTRUCTORS},
+    **{name: "pyduckdb.core.exceptions" for name in _EXCEPTIONS},
+}
+
+
+def __getattr__(name: str) -> "Any":
+    """Import attributes on first access."""
+    try:
+        module = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
 
-def connect(connection_string: str = ":memory:", read_only=False) -> AsyncConnection:
+
+def __dir__() -> "List[str]":
+    return sorted(set(globals()) | set(__all__))
+
+
+def connect(
+    connection_string: str = ":memory:",
+    read_only=False,
+    queue_size: int = 0,
+    statement_cache_size: int = 0,
+    statement_timeout: "Optional[float]" = None,
+    cursor_cache_size: int = 0,
+    result_cache: "Optional[ResultCache]" = None,
+) -> "AsyncConnection":
     """Connect to a DuckDB database, returning an async connection."""
-    return AsyncConnection(connection_string, read_only=read_only)
+    # pylint: disable=import-outside-toplevel,redefined-outer-name
+    from .connection import AsyncConnection
+
+    return AsyncConnection(
+        connection_string,
+        read_only=read_only,
+        queue_size=queue_size,
+        statement_cache_size=statement_cache_size,
+        statement_timeout=statement_timeout,
+        cursor_cache_size=cursor_cache_size,
+        result_cache=result_cache,
+    )
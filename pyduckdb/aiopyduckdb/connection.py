@@ -2,8 +2,9 @@
 Async connection object for DuckDB which fits the DB API spec.
 
 """
-from typing import Optional, Union, Sequence
-from duckdb import DuckDBPyConnection  # pylint: disable=no-name-in-module
+import asyncio
+import weakref
+from typing import Any, Iterable, List, Optional, Union, Sequence, TYPE_CHECKING
 from pep249 import aiopep249
 from pep249.aiopep249 import (
     SQLQuery,
@@ -12,9 +13,21 @@ from pep249.aiopep249 import (
     QueryParameters,
 )
 from .cursor import AsyncCursor
-from .utils import to_thread
+from .worker import ConnectionWorker, WorkerStats
+from ..core.bulk import DEFAULT_BATCH_SIZE
 from ..core.connection import Connection
+from ..core.cursor_cache import CursorCacheStats
 from ..core.exceptions import InterfaceError
+from ..core.ingest import CopyResult
+from ..core.parallel import ParallelResult
+from ..core.result_cache import CachedCursor, ResultCache, ResultCacheStats
+from ..core.rows import RowFactory
+from ..core.statement_cache import StatementCacheStats
+from ..core.tracing import ProfileCallback, TraceCallback
+from ..core.utils import is_duckdb_connection
+
+if TYPE_CHECKING:
+    from duckdb import DuckDBPyConnection  # pylint: disable=no-name-in-module
 
 
 class AsyncConnection(aiopep249.AsyncCursorExecuteMixin, aiopep249.AsyncConnection):
@@ -29,53 +42,264 @@ class AsyncConnection(aiopep249.AsyncCursorExecuteMixin, aiopep249.AsyncConnecti
     is only valid if passed a database string, and will raise an error
     otherwise.
 
+    Calls on the connection and its cursors run in order on a dedicated
+    worker thread. If `queue_size` is positive, at most that many calls
+    may be queued on the worker at once.
+
+    `statement_cache_size` is passed on to the sync connection, and is
+    likewise only valid if passed a database string. `statement_timeout`
+    is the default timeout for statements, as for the sync connection.
+    `cursor_cache_size` is passed on to the sync connection when it's
+    created here, and is ignored if passed a pyduckdb.Connection.
+    `result_cache` is passed on to the sync connection, and is only
+    valid if the connection is created here. Cache hits don't run any
+    statement, but are still returned through the worker thread.
+
+    When a task awaiting a call on the connection or its cursors is
+    cancelled, a statement it's executing is interrupted, and a call
+    which hasn't started yet is dropped.
+
     """
 
     def __init__(
         self,
-        database: Union[DuckDBPyConnection, Connection, str],
+        database: Union["DuckDBPyConnection", Connection, str],
         *,
-        read_only: Optional[bool] = None
+        read_only: Optional[bool] = None,
+        queue_size: int = 0,
+        statement_cache_size: int = 0,
+        statement_timeout: Optional[float] = None,
+        cursor_cache_size: int = 0,
+        result_cache: Optional[ResultCache] = None,
     ):
-        if isinstance(database, (str, DuckDBPyConnection)):
-            self._connection = Connection(database, read_only=read_only)
+        if isinstance(database, str) or is_duckdb_connection(database):
+            self._connection = Connection(
+                database,
+                read_only=read_only,
+                statement_cache_size=statement_cache_size,
+                statement_timeout=statement_timeout,
+                cursor_cache_size=cursor_cache_size,
+                result_cache=result_cache,
+            )
         else:
             if read_only is not None:
                 raise InterfaceError(
                     "`read_only` flag can only be set for database strings."
                 )
+            if statement_cache_size:
+                raise InterfaceError(
+                    "`statement_cache_size` can only be set for database strings."
+                )
+            if result_cache is not None:
+                raise InterfaceError(
+                    "`result_cache` can't be set for an existing pyduckdb.Connection."
+                )
             self._connection = database
+            if statement_timeout is not None:
+                database.statement_timeout = statement_timeout
+
+        self._worker = ConnectionWorker(queue_size)
+        weakref.finalize(self, self._worker.shutdown)
+
+    @property
+    def statement_cache_stats(self) -> Optional[StatementCacheStats]:
+        """Statement cache counters for the underlying connection."""
+        return self._connection.statement_cache_stats
+
+    @property
+    def cursor_cache_stats(self) -> Optional[CursorCacheStats]:
+        """Cursor cache counters for the underlying connection."""
+        return self._connection.cursor_cache_stats
+
+    @property
+    def result_cache_stats(self) -> Optional[ResultCacheStats]:
+        """Result cache counters for the underlying connection."""
+        return self._connection.result_cache_stats
+
+    @property
+    def worker_stats(self) -> WorkerStats:
+        """Queue depth and wait time statistics for the worker thread."""
+        return self._worker.stats()
+
+    @property
+    def statement_timeout(self) -> Optional[float]:
+        """The default timeout for statements. See `Connection.statement_timeout`."""
+        return self._connection.statement_timeout
+
+    @statement_timeout.setter
+    def statement_timeout(self, timeout: Optional[float]):
+        self._connection.statement_timeout = timeout
+
+    def interrupt(self) -> None:
+        """
+        Interrupt the statements being executed on the worker thread, which
+        raise `OperationalError`.
+
+        """
+        self._connection.interrupt()
+
+    @property
+    def row_factory(self) -> Optional[RowFactory]:
+        """
+        The row factory for new cursors. Rows are converted on the worker
+        thread.
+
+        """
+        return self._connection.row_factory
+
+    @row_factory.setter
+    def row_factory(self, factory: Optional[RowFactory]):
+        self._connection.row_factory = factory
+
+    def set_trace_callback(self, callback: Optional[TraceCallback]) -> None:
+        """
+        Set a function to be called with the SQL text of each statement
+        before it runs. It's called on the worker thread.
+
+        """
+        self._connection.set_trace_callback(callback)
+
+    def set_profile_callback(self, callback: Optional[ProfileCallback]) -> None:
+        """
+        Set a function to be called with a `QueryProfile` for each
+        statement, including the time its calls spent queued for the
+        worker thread. It's called on the worker thread.
+
+        """
+        self._connection.set_profile_callback(callback)
 
     async def commit(self) -> None:
-        await to_thread(self._connection.commit)
+        await self._worker.run(self._connection.commit)
 
     async def rollback(self) -> None:
-        await to_thread(self._connection.rollback)
+        await self._worker.run(self._connection.rollback)
 
     async def close(self) -> None:
-        await to_thread(self._connection.close)
+        await self._worker.run(self._connection.close)
+        self._worker.shutdown()
 
     async def cursor(self) -> AsyncCursor:
         return AsyncCursor(self, self._connection.cursor())
 
+    def _reused_cursor(self) -> AsyncCursor:
+        """
+        A cursor for a statement about to be executed, which may reuse a
+        free DuckDB cursor. See `Connection._reused_cursor`.
+
+        """
+        # pylint: disable=protected-access
+        return AsyncCursor(self, self._connection._reused_cursor())
+
     async def callproc(
         self, procname: ProcName, parameters: Optional[ProcArgs] = None
     ) -> Optional[ProcArgs]:
-        cursor = await self.cursor()
+        cursor = self._reused_cursor()
         return await cursor.callproc(procname, parameters)
 
     async def execute(
-        self, operation: SQLQuery, parameters: Optional[QueryParameters] = None
+        self,
+        operation: SQLQuery,
+        parameters: Optional[QueryParameters] = None,
+        *,
+        timeout: Optional[float] = None,
     ) -> AsyncCursor:
-        cursor = await self.cursor()
-        return await cursor.execute(operation, parameters)
+        # pylint: disable=protected-access
+        connection = self._connection
+        if connection._result_cache is None:
+            cursor = self._reused_cursor()
+            return await cursor.execute(operation, parameters, timeout=timeout)
+        lookup = await self._worker.run(
+            connection._look_up_cached, None, operation, parameters
+        )
+        if isinstance(lookup, CachedCursor):
+            return AsyncCursor(self, lookup)
+        # A cursor is only taken on a cache miss.
+        cursor = self._reused_cursor()
+        await cursor._run_interruptible(
+            connection._execute_recorded,
+            cursor._cursor,
+            lookup,
+            operation,
+            parameters,
+            timeout,
+        )
+        return cursor
 
     async def executescript(self, script: SQLQuery) -> AsyncCursor:
         """A lazy implementation of SQLite's `executescript`."""
         return await self.execute(script)
 
     async def executemany(
-        self, operation: SQLQuery, seq_of_parameters: Sequence[QueryParameters]
+        self,
+        operation: SQLQuery,
+        seq_of_parameters: Sequence[QueryParameters],
+        *,
+        timeout: Optional[float] = None,
+    ) -> AsyncCursor:
+        cursor = self._reused_cursor()
+        return await cursor.executemany(operation, seq_of_parameters, timeout=timeout)
+
+    async def insert_many(
+        self, table: str, rows: Any, batch_size: int = DEFAULT_BATCH_SIZE
     ) -> AsyncCursor:
-        cursor = await self.cursor()
-        return await cursor.executemany(operation, seq_of_parameters)
+        """Insert rows into a table in columnar batches. See `Cursor.insert_many`."""
+        cursor = self._reused_cursor()
+        return await cursor.insert_many(table, rows, batch_size)
+
+    async def execute_parallel(
+        self,
+        operation: SQLQuery,
+        seq_of_parameters: Iterable[Optional[QueryParameters]],
+        *,
+        max_workers: Optional[int] = None,
+        ordered: bool = True,
+        timeout: Optional[float] = None,
+    ) -> List[ParallelResult]:
+        """
+        Execute a statement with each of a sequence of parameter sets at
+        once, gathering all of the `ParallelResult`s into a list. See
+        `Connection.execute_parallel`.
+
+        The statements run on their own threads, but the call takes its
+        turn on the worker thread like any other. If the awaiting task is
+        cancelled, the running statements are interrupted.
+
+        """
+        execution = self._connection.execute_parallel(
+            operation,
+            seq_of_parameters,
+            max_workers=max_workers,
+            ordered=ordered,
+            timeout=timeout,
+        )
+        try:
+            return await self._worker.run(list, execution)
+        except asyncio.CancelledError:
+            execution.interrupt()
+            raise
+
+    # pylint: disable=too-many-arguments
+    async def copy_from(
+        self,
+        table: str,
+        source: Any,
+        *,
+        format: Optional[str] = None,  # pylint: disable=redefined-builtin
+        chunk_size: int = DEFAULT_BATCH_SIZE,
+        header: bool = False,
+        delimiter: str = ",",
+    ) -> CopyResult:
+        """
+        Load rows into a table in a single transaction on the worker
+        thread. See `Connection.copy_from`.
+
+        """
+        return await self._worker.run(
+            self._connection.copy_from,
+            table,
+            source,
+            format=format,
+            chunk_size=chunk_size,
+            header=header,
+            delimiter=delimiter,
+        )
@@ -2,8 +2,18 @@
 Async cursor object for DuckDB which fits the DB API spec.
 
 """
+import asyncio
 import weakref
-from typing import Optional, Sequence, Type, Union, TYPE_CHECKING
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Optional,
+    Sequence,
+    Type,
+    Union,
+    TYPE_CHECKING,
+)
 from pep249 import aiopep249
 from pep249.aiopep249 import (
     SQLQuery,
@@ -14,11 +24,19 @@ from pep249.aiopep249 import (
     ResultRow,
     ResultSet,
 )
-from ..core.cursor import Cursor
-from .utils import to_thread
+from ..core.bulk import DEFAULT_BATCH_SIZE
+from ..core.exceptions import NotSupportedError
+from ..core.explain import QueryPlan
+from ..core.export import ProgressCallback
+from ..core.ingest import CopyResult
+from ..core.rows import RowFactory
+from ..core.cursor import Cursor, DEFAULT_ROWS_PER_BATCH, MIN_ITERATION_BLOCK_SIZE
 
 if TYPE_CHECKING:
     from .connection import AsyncConnection  # pylint:disable=cyclic-import
+    import numpy
+    import pandas
+    import pyarrow
 
 # pylint: disable=too-many-ancestors
 class AsyncCursor(
@@ -37,6 +55,8 @@ class AsyncCursor(
     def __init__(self, connection: "AsyncConnection", cursor: Cursor):
         self._connection = weakref.proxy(connection)
         self._cursor = cursor
+        # pylint: disable=protected-access
+        self._run = connection._worker.run
 
     @property
     def connection(self) -> "AsyncConnection":
@@ -50,22 +70,44 @@ class AsyncCursor(
     def rowcount(self) -> int:
         return self._cursor.rowcount
 
+    @property
+    def statement_timeout(self) -> Optional[float]:
+        """The default timeout for statements. See `Cursor.statement_timeout`."""
+        return self._cursor.statement_timeout
+
+    @statement_timeout.setter
+    def statement_timeout(self, timeout: Optional[float]):
+        self._cursor.statement_timeout = timeout
+
+    def interrupt(self) -> None:
+        """Interrupt the statement being executed on the worker thread."""
+        self._cursor.interrupt()
+
+    @property
+    def row_factory(self) -> Optional[RowFactory]:
+        """The function rows are converted with. See `Cursor.row_factory`."""
+        return self._cursor.row_factory
+
+    @row_factory.setter
+    def row_factory(self, factory: Optional[RowFactory]):
+        self._cursor.row_factory = factory
+
     async def commit(self) -> None:
-        await to_thread(self._cursor.commit)
+        await self._run(self._cursor.commit)
 
     async def rollback(self) -> None:
-        await to_thread(self._cursor.rollback)
+        await self._run(self._cursor.rollback)
 
     async def close(self) -> None:
-        await to_thread(self._cursor.close)
+        await self._run(self._cursor.close)
 
     async def callproc(
         self, procname: ProcName, parameters: Optional[ProcArgs] = None
     ) -> Optional[ProcArgs]:
-        return await to_thread(self._cursor.callproc, procname, parameters)
+        return await self._run(self._cursor.callproc, procname, parameters)
 
     async def nextset(self) -> Optional[bool]:
-        return await to_thread(self._cursor.nextset)
+        return await self._run(self._cursor.nextset)
 
     def setinputsizes(self, sizes: Sequence[Optional[Union[int, Type]]]) -> None:
         self._cursor.setinputsizes(sizes)
@@ -73,10 +115,37 @@ class AsyncCursor(
     def setoutputsize(self, size: int, column: Optional[int] = None) -> None:
         self._cursor.setoutputsize(size, column)
 
+    async def _run_interruptible(self, func, *args, **kwargs) -> Any:
+        """
+        Run a call on the worker thread, interrupting the statement it's
+        executing if the awaiting task is cancelled.
+
+        """
+        try:
+            return await self._run(func, *args, **kwargs)
+        except asyncio.CancelledError:
+            try:
+                self._cursor.interrupt()
+            except NotSupportedError:
+                pass
+            raise
+
     async def execute(
-        self, operation: SQLQuery, parameters: Optional[QueryParameters] = None
+        self,
+        operation: SQLQuery,
+        parameters: Optional[QueryParameters] = None,
+        *,
+        timeout: Optional[float] = None,
     ) -> "AsyncCursor":
-        await to_thread(self._cursor.execute, operation, parameters)
+        """
+        Execute an operation on the worker thread. It's interrupted if it
+        takes longer than `timeout` seconds (see `Cursor.execute`), or if
+        the awaiting task is cancelled.
+
+        """
+        await self._run_interruptible(
+            self._cursor.execute, operation, parameters, timeout=timeout
+        )
         return self
 
     async def executescript(self, script: SQLQuery) -> "AsyncCursor":
@@ -84,18 +153,141 @@ class AsyncCursor(
         return await self.execute(script)
 
     async def executemany(
-        self, operation: SQLQuery, seq_of_parameters: Sequence[QueryParameters]
+        self,
+        operation: SQLQuery,
+        seq_of_parameters: Sequence[QueryParameters],
+        *,
+        timeout: Optional[float] = None,
+    ) -> "AsyncCursor":
+        await self._run_interruptible(
+            self._cursor.executemany, operation, seq_of_parameters, timeout=timeout
+        )
+        return self
+
+    async def insert_many(
+        self, table: str, rows: Any, batch_size: int = DEFAULT_BATCH_SIZE
     ) -> "AsyncCursor":
-        await to_thread(self._cursor.executemany, operation, seq_of_parameters)
+        """Insert rows into a table in columnar batches. See `Cursor.insert_many`."""
+        await self._run(self._cursor.insert_many, table, rows, batch_size)
         return self
 
     async def fetchone(self) -> Optional[ResultRow]:
-        return await to_thread(self._cursor.fetchone)
+        return await self._run(self._cursor.fetchone)
 
     async def fetchmany(self, size: Optional[int] = None) -> ResultSet:
         if size is None:
             size = self.arraysize
-        return await to_thread(self._cursor.fetchmany, size)
+        return await self._run(self._cursor.fetchmany, size)
 
     async def fetchall(self) -> ResultSet:
-        return await to_thread(self._cursor.fetchall)
+        return await self._run(self._cursor.fetchall)
+
+    async def fetchnumpy(self) -> Dict[str, "numpy.ndarray"]:
+        """Fetch the remaining rows as a dict of NumPy arrays, by column."""
+        return await self._run(self._cursor.fetchnumpy)
+
+    async def fetchdf(self) -> "pandas.DataFrame":
+        """Fetch the remaining rows as a pandas DataFrame."""
+        return await self._run(self._cursor.fetchdf)
+
+    async def fetch_arrow_table(self) -> "pyarrow.Table":
+        """Fetch the remaining rows as a PyArrow Table."""
+        return await self._run(self._cursor.fetch_arrow_table)
+
+    async def fetch_record_batches(
+        self, rows_per_batch: int = DEFAULT_ROWS_PER_BATCH
+    ) -> AsyncIterator["pyarrow.RecordBatch"]:
+        """
+        Iterate over the remaining rows as PyArrow RecordBatches of up to
+        `rows_per_batch` rows, fetching each batch on the worker thread.
+
+        """
+        batches = await self._run(self._cursor.fetch_record_batches, rows_per_batch)
+        while True:
+            batch = await self._run(next, batches, None)
+            if batch is None:
+                return
+            yield batch
+
+    # pylint: disable=too-many-arguments
+    async def copy_to(
+        self,
+        destination: Any,
+        *,
+        format: Optional[str] = None,  # pylint: disable=redefined-builtin
+        chunk_size: int = DEFAULT_BATCH_SIZE,
+        header: bool = True,
+        delimiter: str = ",",
+        progress: Optional[ProgressCallback] = None,
+    ) -> CopyResult:
+        """
+        Write the remaining rows of the result to a path or binary file on
+        the worker thread. See `Cursor.copy_to`. The `progress` callback
+        is called on the worker thread.
+
+        """
+        return await self._run(
+            self._cursor.copy_to,
+            destination,
+            format=format,
+            chunk_size=chunk_size,
+            header=header,
+            delimiter=delimiter,
+            progress=progress,
+        )
+
+    async def explain(
+        self,
+        operation: SQLQuery,
+        parameters: Optional[QueryParameters] = None,
+        *,
+        analyze: bool = True,
+    ) -> QueryPlan:
+        """
+        Return the plan for a query as a tree of operators, running it on
+        the worker thread if `analyze` is set. See `Cursor.explain`.
+
+        """
+        return await self._run(
+            self._cursor.explain, operation, parameters, analyze=analyze
+        )
+
+    async def _produce_batches(self, batches: "asyncio.Queue", batch_size: int):
+        """Fetch batches of rows on the worker thread into a queue."""
+        try:
+            while True:
+                batch = await self._run(self._cursor.fetchmany, batch_size)
+                await batches.put(batch)
+                if not batch:
+                    return
+        except Exception as err:  # pylint: disable=broad-except
+            await batches.put(err)
+
+    async def stream(
+        self, batch_size: Optional[int] = None, prefetch: int = 2
+    ) -> AsyncIterator[ResultRow]:
+        """
+        Iterate over the remaining rows of the result, fetching them in
+        batches of `batch_size` rows in the background.
+
+        Up to `prefetch` batches are fetched ahead of the consumer. When
+        they are all waiting to be consumed, fetching pauses until the
+        consumer catches up. If the consumer stops early, any rows which
+        were fetched ahead are discarded.
+
+        """
+        if batch_size is None:
+            batch_size = max(self.arraysize, MIN_ITERATION_BLOCK_SIZE)
+        batches: "asyncio.Queue" = asyncio.Queue(maxsize=max(prefetch, 1))
+        producer = asyncio.ensure_future(self._produce_batches(batches, batch_size))
+        try:
+            while True:
+                batch = await batches.get()
+                if isinstance(batch, Exception):
+                    raise batch
+                if not batch:
+                    return
+                for row in batch:
+                    yield row
+        finally:
+            producer.cancel()
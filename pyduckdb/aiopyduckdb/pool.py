@@ -0,0 +1,290 @@
+"""
+Async connection pool for DuckDB.
+
+"""
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from time import monotonic, perf_counter
+from typing import AsyncIterator, Deque, NamedTuple, Optional, Tuple
+from .connection import AsyncConnection
+from ..core.connection import Connection
+from ..core.exceptions import Error, OperationalError, ProgrammingError
+from ..core.result_cache import ResultCache
+
+__all__ = ["AsyncConnectionPool", "PoolStats"]
+
+POOL_CLOSED = ProgrammingError("Cannot operate on a closed pool.")
+
+
+class PoolStats(NamedTuple):
+    """
+    A snapshot of the state of a connection pool.
+
+    `size` counts every connection the pool holds, idle or in use.
+    Acquire times are the seconds callers spent waiting in `acquire`.
+
+    """
+
+    size: int
+    idle: int
+    in_use: int
+    waiters: int
+    acquired: int
+    timeouts: int
+    total_acquire_time: float
+    max_acquire_time: float
+
+    @property
+    def mean_acquire_time(self) -> float:
+        """The mean time, in seconds, callers spent waiting in `acquire`."""
+        return self.total_acquire_time / self.acquired if self.acquired else 0.0
+
+
+# pylint: disable=too-many-instance-attributes
+class AsyncConnectionPool:
+    """
+    A pool of async connections to a single DuckDB database.
+
+    Pooled connections are cursors of one shared DuckDB connection, so
+    they share a single database instance (and, for ":memory:", a single
+    in-memory database).
+
+    At least `min_size` connections are kept open, and at most `max_size`
+    are open at once. If `acquire_timeout` is set, `acquire` raises an
+    `OperationalError` when no connection is available in time. Idle
+    connections above `min_size` are closed after `max_idle_time`
+    seconds. If `check_on_acquire` is set, idle connections are checked
+    with a trivial query before they are handed out. `statement_timeout`
+    is the connections' default timeout for statements, and
+    `result_cache` (if given) is shared by all of them.
+
+    Connections are rolled back when they are returned to the pool.
+
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        database: str = ":memory:",
+        *,
+        read_only: Optional[bool] = None,
+        min_size: int = 1,
+        max_size: int = 10,
+        acquire_timeout: Optional[float] = None,
+        max_idle_time: Optional[float] = None,
+        check_on_acquire: bool = False,
+        statement_timeout: Optional[float] = None,
+        result_cache: Optional[ResultCache] = None
+    ):
+        if max_size < 1:
+            raise ValueError("`max_size` must be at least 1.")
+        if not 0 <= min_size <= max_size:
+            raise ValueError("`min_size` must be between 0 and `max_size`.")
+
+        self._root = Connection(database, read_only=read_only)
+        self._min_size = min_size
+        self._max_size = max_size
+        self._acquire_timeout = acquire_timeout
+        self._max_idle_time = max_idle_time
+        self._check_on_acquire = check_on_acquire
+        self._statement_timeout = statement_timeout
+        self._result_cache = result_cache
+        self._closed = False
+
+        self._idle: Deque[Tuple[AsyncConnection, float]] = deque()
+        self._waiters: "Deque[asyncio.Future[None]]" = deque()
+        self._size = 0
+        self._in_use = 0
+
+        self._acquired = 0
+        self._timeouts = 0
+        self._total_acquire_time = 0.0
+        self._max_acquire_time = 0.0
+
+        for _ in range(min_size):
+            self._size += 1
+            self._idle.append((self._new_connection(), monotonic()))
+
+    async def __aenter__(self) -> "AsyncConnectionPool":
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    @property
+    def closed(self) -> bool:
+        """Whether the pool has been closed."""
+        return self._closed
+
+    def stats(self) -> PoolStats:
+        """Return a snapshot of the pool's state."""
+        return PoolStats(
+            size=self._size,
+            idle=len(self._idle),
+            in_use=self._in_use,
+            waiters=sum(not waiter.done() for waiter in self._waiters),
+            acquired=self._acquired,
+            timeouts=self._timeouts,
+            total_acquire_time=self._total_acquire_time,
+            max_acquire_time=self._max_acquire_time,
+        )
+
+    def _new_connection(self) -> AsyncConnection:
+        """Create a new connection to the pool's database."""
+        # pylint: disable=protected-access
+        return AsyncConnection(
+            Connection(
+                self._root._connection.cursor(),
+                statement_timeout=self._statement_timeout,
+                result_cache=self._result_cache,
+            )
+        )
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[AsyncConnection]:
+        """
+        Acquire a connection from the pool, returning it when the context
+        manager exits.
+
+        """
+        connection = await self._get()
+        try:
+            yield connection
+        finally:
+            await self._put(connection)
+
+    async def _get(self) -> AsyncConnection:
+        """Take a connection from the pool, waiting for one if needed."""
+        started_at = perf_counter()
+        deadline = None
+        if self._acquire_timeout is not None:
+            deadline = monotonic() + self._acquire_timeout
+
+        while True:
+            if self._closed:
+                raise POOL_CLOSED
+
+            await self._evict_idle()
+            while self._idle:
+                connection, _ = self._idle.pop()
+                if await self._is_healthy(connection):
+                    return self._check_out(connection, started_at)
+                await self._discard(connection)
+
+            if self._size < self._max_size:
+                self._size += 1
+                try:
+                    connection = self._new_connection()
+                except BaseException:
+                    self._size -= 1
+                    raise
+                return self._check_out(connection, started_at)
+
+            await self._wait(deadline)
+
+    async def _wait(self, deadline: Optional[float]):
+        """Wait until a connection is returned to the pool."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        timeout = None if deadline is None else max(deadline - monotonic(), 0.0)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException as err:
+            if waiter.done() and not waiter.cancelled():
+                # Woken as we gave up waiting: pass the wake-up on.
+                self._wake_next()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(err, asyncio.TimeoutError):
+                self._timeouts += 1
+                raise OperationalError(
+                    "Timed out waiting for a connection from the pool."
+                ) from None
+            raise
+
+    def _check_out(self, connection: AsyncConnection, started_at: float):
+        """Record a connection as in use, returning it."""
+        elapsed = perf_counter() - started_at
+        self._in_use += 1
+        self._acquired += 1
+        self._total_acquire_time += elapsed
+        self._max_acquire_time = max(self._max_acquire_time, elapsed)
+        return connection
+
+    async def _put(self, connection: AsyncConnection):
+        """Return a connection to the pool, resetting its state."""
+        self._in_use -= 1
+        # pylint: disable=protected-access
+        if self._closed or connection._connection._closed:
+            await self._discard(connection)
+            return
+
+        # Rolling back with no transaction open succeeds. Anything else
+        # going wrong means the connection can't be trusted.
+        try:
+            await connection.rollback()
+        except Exception:  # pylint: disable=broad-except
+            await self._discard(connection)
+            return
+        self._idle.append((connection, monotonic()))
+        self._wake_next()
+
+    async def _is_healthy(self, connection: AsyncConnection) -> bool:
+        """Check whether an idle connection can be handed out."""
+        # pylint: disable=protected-access
+        if connection._connection._closed:
+            return False
+        if not self._check_on_acquire:
+            return True
+        try:
+            # Through a cursor, so that the result cache isn't used.
+            cursor = await connection.cursor()
+            await cursor.execute("SELECT 1;")
+            await cursor.close()
+        except Error:
+            return False
+        return True
+
+    async def _evict_idle(self):
+        """Close connections which have been idle for too long."""
+        if self._max_idle_time is None:
+            return
+        cutoff = monotonic() - self._max_idle_time
+        while self._idle and self._size > self._min_size and self._idle[0][1] < cutoff:
+            connection, _ = self._idle.popleft()
+            await self._discard(connection)
+
+    async def _discard(self, connection: AsyncConnection):
+        """Close a connection and remove it from the pool."""
+        self._size -= 1
+        try:
+            await connection.close()
+        except Exception:  # pylint: disable=broad-except
+            pass
+        finally:
+            self._wake_next()
+
+    def _wake_next(self):
+        """Wake the longest-waiting caller of `acquire`, if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def close(self) -> None:
+        """
+        Close the pool. Idle connections are closed immediately, and
+        connections in use are closed when they are returned.
+
+        """
+        if self._closed:
+            return
+        self._closed = True
+        while self._idle:
+            connection, _ = self._idle.popleft()
+            await self._discard(connection)
+        while self._waiters:
+            self._wake_next()
+        self._root.close()
@@ -0,0 +1,204 @@
+"""
+A dedicated worker thread for async connections.
+
+DuckDB connections are not safe to use concurrently from several threads,
+and calls made through the event loop's default executor can hop between
+threads and compete with unrelated blocking I/O. Each `AsyncConnection`
+instead owns a single `ConnectionWorker`, which runs its calls in order
+on one thread.
+
+"""
+import asyncio
+import itertools
+import queue
+import threading
+from contextvars import copy_context
+from functools import partial
+from time import perf_counter
+from typing import Any, Callable, NamedTuple, Optional
+from ..core.metrics import REGISTRY as METRICS
+from ..core.tracing import set_handoff_wait
+from ..core.types import ReturnType
+from .utils import to_thread
+
+__all__ = ["ConnectionWorker", "WorkerStats"]
+
+_STOP = object()
+_WORKER_IDS = itertools.count(1)
+
+
+class WorkerStats(NamedTuple):
+    """
+    A snapshot of the activity of a connection's worker thread.
+
+    `queue_depth` is the number of calls submitted but not yet started.
+    Wait times are the seconds calls spent queued before starting, and
+    `total_run_time` is the seconds spent running them.
+
+    """
+
+    queue_depth: int
+    max_queue_depth: int
+    submitted: int
+    completed: int
+    total_wait_time: float
+    max_wait_time: float
+    total_run_time: float
+
+    @property
+    def mean_wait_time(self) -> float:
+        """The mean time, in seconds, a call spent queued."""
+        started = self.submitted - self.queue_depth
+        return self.total_wait_time / started if started else 0.0
+
+
+class ConnectionWorker:
+    """
+    A single thread which runs blocking calls for one connection, in the
+    order they were submitted.
+
+    If `max_queue_size` is positive, at most that many calls may be
+    in flight at once, and further submissions wait for a free slot.
+    The thread is started on first use.
+
+    """
+
+    def __init__(self, max_queue_size: int = 0):
+        self._max_queue_size = max_queue_size
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._shut_down = False
+
+        # Counters written by the submitting (event loop) thread.
+        self._submitted = 0
+        self._max_queue_depth = 0
+        # Counters written by the worker thread.
+        self._started = 0
+        self._completed = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._total_run_time = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of calls submitted but not yet started."""
+        return self._submitted - self._started
+
+    def stats(self) -> WorkerStats:
+        """Return a snapshot of the worker's activity."""
+        return WorkerStats(
+            queue_depth=self.queue_depth,
+            max_queue_depth=self._max_queue_depth,
+            submitted=self._submitted,
+            completed=self._completed,
+            total_wait_time=self._total_wait_time,
+            max_wait_time=self._max_wait_time,
+            total_run_time=self._total_run_time,
+        )
+
+    def _ensure_started(self):
+        """Start the worker thread if it isn't already running."""
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._work,
+                    name=f"pyduckdb-worker-{next(_WORKER_IDS)}",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    async def run(self, func: Callable[..., ReturnType], *args, **kwargs) -> ReturnType:
+        """
+        Run *func* on the worker thread, returning its result.
+
+        The current `contextvars.Context` is propagated to the worker,
+        as with `asyncio.to_thread`.
+
+        """
+        if self._shut_down:
+            # Let the sync layer raise its usual errors for closed objects.
+            return await to_thread(func, *args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        if self._max_queue_size > 0:
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self._max_queue_size)
+            await self._slots.acquire()
+
+        self._ensure_started()
+        future = loop.create_future()
+        func_call = partial(copy_context().run, func, *args, **kwargs)
+        self._submitted += 1
+        self._max_queue_depth = max(self._max_queue_depth, self.queue_depth)
+        self._queue.put((loop, future, func_call, perf_counter()))
+        return await future
+
+    def _complete(
+        self,
+        future: "asyncio.Future[Any]",
+        result: Any,
+        error: Optional[BaseException],
+    ):
+        """Resolve a future on its event loop, and free its queue slot."""
+        if self._slots is not None:
+            self._slots.release()
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _work(self):
+        """The worker thread's main loop."""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            loop, future, func_call, submitted_at = item
+            if future.cancelled():
+                # The caller has given up, so don't start the call.
+                self._started += 1
+                self._completed += 1
+                try:
+                    loop.call_soon_threadsafe(self._complete, future, None, None)
+                except RuntimeError:  # Event loop already closed.
+                    pass
+                continue
+            started_at = perf_counter()
+            wait_time = started_at - submitted_at
+            self._started += 1
+            self._total_wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+            if METRICS.enabled:
+                METRICS.record_handoff(wait_time)
+
+            result, error = None, None
+            # Let query profiles include the time spent in the queue.
+            set_handoff_wait(wait_time)
+            try:
+                result = func_call()
+            except BaseException as err:  # pylint: disable=broad-except
+                error = err
+            self._total_run_time += perf_counter() - started_at
+            self._completed += 1
+
+            try:
+                loop.call_soon_threadsafe(self._complete, future, result, error)
+            except RuntimeError:  # Event loop already closed.
+                pass
+
+    def shutdown(self):
+        """
+        Stop the worker thread once it has finished any calls already
+        submitted. Later calls run in the default executor.
+
+        """
+        with self._thread_lock:
+            self._shut_down = True
+            if self._thread is not None:
+                self._queue.put(_STOP)
+                self._thread = None
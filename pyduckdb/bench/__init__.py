@@ -0,0 +1,22 @@
+"""
+Benchmarks for pyduckdb, comparing it against raw DuckDB and SQLite.
+
+Run them with `python -m pyduckdb.bench`; see `--help` for the options.
+
+"""
+from .runner import *
+
+__all__ = [
+    "TARGETS",
+    "Benchmark",
+    "BenchmarkResult",
+    "Comparison",
+    "BENCHMARKS",
+    "benchmark",
+    "select_benchmarks",
+    "run_benchmark",
+    "run_benchmark_isolated",
+    "run_benchmarks",
+    "compare",
+    "load_report",
+]
@@ -0,0 +1,161 @@
+"""
+The benchmark command line interface.
+
+Results are written as JSON to stdout (or `--output`), with a readable
+summary on stderr. With `--compare`, the exit status is 1 if any pyduckdb
+benchmark is slower than the baseline by more than `--threshold`.
+
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+from .import_time import IMPORT_BUDGET
+from .runner import (
+    TARGETS,
+    compare,
+    load_report,
+    run_benchmark,
+    run_benchmark_isolated,
+    run_benchmarks,
+    select_benchmarks,
+)
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m pyduckdb.bench",
+        description="Benchmark pyduckdb against raw DuckDB and SQLite.",
+    )
+    parser.add_argument(
+        "-k",
+        "--filter",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="only run benchmarks whose key contains PATTERN (repeatable)",
+    )
+    parser.add_argument(
+        "-t",
+        "--target",
+        action="append",
+        choices=TARGETS,
+        help="only run benchmarks for TARGET (repeatable)",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply workload sizes"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="timed runs per benchmark"
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="measure peak Python memory with tracemalloc",
+    )
+    parser.add_argument(
+        "--isolate",
+        action="store_true",
+        help="run each benchmark in a fresh process, recording peak RSS",
+    )
+    parser.add_argument("-o", "--output", help="write the JSON report to a file")
+    parser.add_argument(
+        "--compare", metavar="BASELINE", help="compare with a saved JSON report"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="fractional slowdown counted as a regression (default 0.1)",
+    )
+    parser.add_argument(
+        "--import-budget",
+        type=float,
+        default=IMPORT_BUDGET,
+        metavar="SECONDS",
+        help=f"fail if importing pyduckdb takes longer (default {IMPORT_BUDGET})",
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="list the benchmarks and exit"
+    )
+    parser.add_argument("--run-one", metavar="KEY", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return args
+
+
+def _report(line: str):
+    print(line, file=sys.stderr, flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmarks, returning the exit status."""
+    args = _parse_args(argv)
+    benchmarks = select_benchmarks(args.filter, args.target or TARGETS)
+
+    if args.run_one is not None:
+        matching = [bench for bench in benchmarks if bench.key == args.run_one]
+        if not matching:
+            _report(f"Unknown benchmark {args.run_one!r}.")
+            return 2
+        result = run_benchmark(
+            matching[0],
+            scale=args.scale,
+            repeat=args.repeat,
+            memory=args.memory,
+            measure_rss=True,
+        )
+        print(json.dumps(result.to_dict()))
+        return 0
+
+    if args.list:
+        for bench in benchmarks:
+            print(bench.key)
+        return 0
+
+    report = run_benchmarks(
+        benchmarks,
+        scale=args.scale,
+        repeat=args.repeat,
+        memory=args.memory,
+        run=run_benchmark_isolated if args.isolate else run_benchmark,
+        report=_report,
+    )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    regressions = 0
+    for result in report["results"]:
+        if (
+            result["name"].startswith("import")
+            and result["target"] == "pyduckdb"
+            and result["median"] > args.import_budget
+        ):
+            regressions += 1
+            _report(
+                f"{result['name']}:pyduckdb took {result['median']:.4f}s, over "
+                f"the import budget of {args.import_budget}s."
+            )
+
+    if args.compare is None:
+        return 1 if regressions else 0
+    _report(f"\nCompared with {args.compare}:")
+    for comparison in compare(report, load_report(args.compare)):
+        regressed = comparison.regressed(args.threshold)
+        # Only pyduckdb's own timings gate: the baselines are for context.
+        if regressed and comparison.key.endswith(":pyduckdb"):
+            regressions += 1
+        _report(
+            f"{comparison.key:<45} {comparison.ratio:>7.2f}x"
+            + ("  REGRESSED" if regressed else "")
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
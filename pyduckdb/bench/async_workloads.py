@@ -0,0 +1,174 @@
+"""
+Asynchronous benchmark workloads.
+
+These measure the async wrapper's throughput under concurrency: many
+tasks sharing one connection's worker thread, tasks spread over a
+connection pool, and streaming fetches. The baselines run the same
+queries on raw DuckDB cursors, one thread per call.
+
+"""
+# pylint: disable=c-extension-no-member
+import asyncio
+from typing import Any, Awaitable, Callable, Iterator
+import duckdb
+from .. import aiopyduckdb
+from ..aiopyduckdb.utils import to_thread
+from .runner import RunWorkload, benchmark
+from .workloads import POINT_QUERY, QUERIES, ROWS, SCAN_QUERY, populate_duckdb, scaled
+
+TASK_COUNTS = (1, 4, 16, 64)
+POOL_SIZES = (1, 2, 4, 8)
+POOL_TASKS = 64
+STREAM_BATCH_SIZE = 1_000
+
+
+def _run_in_loop(
+    setup: Callable[[], Awaitable[Any]],
+    work: Callable[[], Awaitable[int]],
+    teardown: Callable[[], Awaitable[None]],
+) -> Iterator[RunWorkload]:
+    """
+    Run a workload's coroutines on one event loop, which is kept open
+    for the lifetime of the workload so its setup isn't timed.
+
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(setup())
+        try:
+            yield lambda: loop.run_until_complete(work())
+        finally:
+            loop.run_until_complete(teardown())
+    finally:
+        loop.close()
+
+
+async def _gather_queries(tasks: int, queries: int, query_one) -> int:
+    """Split `queries` point queries across `tasks` concurrent tasks."""
+
+    async def task(offset: int):
+        for index in range(offset, queries, tasks):
+            await query_one(index)
+
+    await asyncio.gather(*(task(offset) for offset in range(tasks)))
+    return queries
+
+
+def _async_point_query_pyduckdb(scale: float, tasks: int) -> Iterator[RunWorkload]:
+    rows, queries = scaled(ROWS, scale), scaled(QUERIES, scale)
+    connection = aiopyduckdb.connect(":memory:")
+
+    async def setup():
+        await connection.execute(
+            "CREATE TABLE items AS SELECT range::INTEGER AS id, "
+            "'name-' || range::VARCHAR AS name, range * 0.5 AS value "
+            f"FROM range({rows});"
+        )
+
+    async def query_one(index: int):
+        cursor = await connection.execute(POINT_QUERY, (index % rows,))
+        await cursor.fetchone()
+
+    yield from _run_in_loop(
+        setup,
+        lambda: _gather_queries(tasks, queries, query_one),
+        connection.close,
+    )
+
+
+def _async_point_query_duckdb(scale: float, tasks: int) -> Iterator[RunWorkload]:
+    rows, queries = scaled(ROWS, scale), scaled(QUERIES, scale)
+    connection = duckdb.connect(":memory:")
+    populate_duckdb(connection, rows)
+    # One cursor per task: DuckDB cursors can't be shared between threads.
+    cursors = [connection.cursor() for _ in range(tasks)]
+
+    def query_sync(index: int):
+        cursor = cursors[index % tasks]
+        cursor.execute(POINT_QUERY, (index % rows,))
+        cursor.fetchone()
+
+    async def query_one(index: int):
+        await to_thread(query_sync, index)
+
+    async def setup():
+        pass
+
+    async def teardown():
+        connection.close()
+
+    yield from _run_in_loop(
+        setup, lambda: _gather_queries(tasks, queries, query_one), teardown
+    )
+
+
+for _tasks in TASK_COUNTS:
+    benchmark(f"async_point_query[tasks={_tasks}]", "pyduckdb")(
+        lambda scale, tasks=_tasks: _async_point_query_pyduckdb(scale, tasks)
+    )
+    benchmark(f"async_point_query[tasks={_tasks}]", "duckdb")(
+        lambda scale, tasks=_tasks: _async_point_query_duckdb(scale, tasks)
+    )
+
+
+def _async_pool_query(scale: float, size: int) -> Iterator[RunWorkload]:
+    rows, queries = scaled(ROWS, scale), scaled(QUERIES, scale)
+    pool = aiopyduckdb.AsyncConnectionPool(":memory:", min_size=size, max_size=size)
+
+    async def setup():
+        async with pool.acquire() as connection:
+            await connection.execute(
+                "CREATE TABLE items AS SELECT range::INTEGER AS id, "
+                "'name-' || range::VARCHAR AS name, range * 0.5 AS value "
+                f"FROM range({rows});"
+            )
+            await connection.commit()
+
+    async def query_one(index: int):
+        async with pool.acquire() as connection:
+            cursor = await connection.execute(POINT_QUERY, (index % rows,))
+            await cursor.fetchone()
+
+    yield from _run_in_loop(
+        setup,
+        lambda: _gather_queries(POOL_TASKS, queries, query_one),
+        pool.close,
+    )
+
+
+for _size in POOL_SIZES:
+    benchmark(f"async_pool_query[size={_size}]", "pyduckdb")(
+        lambda scale, size=_size: _async_pool_query(scale, size)
+    )
+
+
+def _async_fetch(scale: float, stream: bool) -> Iterator[RunWorkload]:
+    rows = scaled(ROWS, scale)
+    connection = aiopyduckdb.connect(":memory:")
+
+    async def setup():
+        await connection.execute(
+            "CREATE TABLE items AS SELECT range::INTEGER AS id, "
+            "'name-' || range::VARCHAR AS name, range * 0.5 AS value "
+            f"FROM range({rows});"
+        )
+
+    async def work():
+        cursor = await connection.execute(SCAN_QUERY)
+        fetched = 0
+        if stream:
+            async for _ in cursor.stream(STREAM_BATCH_SIZE):
+                fetched += 1
+        else:
+            while True:
+                batch = await cursor.fetchmany(STREAM_BATCH_SIZE)
+                if not batch:
+                    break
+                fetched += len(batch)
+        return fetched
+
+    yield from _run_in_loop(setup, work, connection.close)
+
+
+benchmark("async_fetchmany", "pyduckdb")(lambda scale: _async_fetch(scale, False))
+benchmark("async_stream", "pyduckdb")(lambda scale: _async_fetch(scale, True))
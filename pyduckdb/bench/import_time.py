@@ -0,0 +1,58 @@
+"""
+Cold import time benchmarks, measured with `python -X importtime` in a
+fresh interpreter for each run.
+
+`python -m pyduckdb.bench` fails if importing pyduckdb takes longer than
+`--import-budget` seconds (by default, `IMPORT_BUDGET`).
+
+"""
+import subprocess
+import sys
+from typing import Iterator, Tuple
+from .runner import RunWorkload, benchmark
+
+__all__ = ["IMPORT_BUDGET", "import_time"]
+
+IMPORT_BUDGET = 0.05
+
+
+def import_time(module: str) -> float:
+    """
+    Import a module in a new interpreter, returning the cumulative time
+    taken in seconds, as reported by `-X importtime`.
+
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    ).stderr
+    cumulative = None
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        if name.strip() == module:
+            cumulative = int(cumulative_us) / 1e6
+    if cumulative is None:
+        # Already imported at startup (e.g. by `sitecustomize`).
+        return 0.0
+    return cumulative
+
+
+def _import_workload(module: str) -> Iterator[RunWorkload]:
+    def run() -> Tuple[int, float]:
+        return 1, import_time(module)
+
+    yield run
+
+
+for _name, _module, _target in (
+    ("import", "pyduckdb", "pyduckdb"),
+    ("import_async", "pyduckdb.aiopyduckdb", "pyduckdb"),
+    ("import", "duckdb", "duckdb"),
+    ("import", "sqlite3", "sqlite3"),
+):
+    benchmark(_name, _target)(lambda scale, module=_module: _import_workload(module))
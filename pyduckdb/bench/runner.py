@@ -0,0 +1,383 @@
+"""
+The benchmark harness: workload registration, timing, and comparison
+against a saved baseline.
+
+"""
+import gc
+import importlib
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+__all__ = [
+    "TARGETS",
+    "Benchmark",
+    "BenchmarkResult",
+    "Comparison",
+    "BENCHMARKS",
+    "benchmark",
+    "select_benchmarks",
+    "run_benchmark",
+    "run_benchmark_isolated",
+    "run_benchmarks",
+    "compare",
+    "load_report",
+]
+
+TARGETS = ("pyduckdb", "duckdb", "sqlite3")
+
+RunWorkload = Callable[[], Union[int, Tuple[int, float]]]
+WorkloadFactory = Callable[[float], Iterator[RunWorkload]]
+
+
+class Benchmark(NamedTuple):
+    """
+    A registered benchmark: one workload run against one target.
+
+    `workload` is called with the scale factor, and returns a context
+    manager which sets up the workload and gives a function running it
+    once, returning the number of operations performed. Workloads which
+    time themselves return the number of operations and the seconds
+    taken instead.
+
+    """
+
+    name: str
+    target: str
+    workload: Callable[[float], ContextManager[RunWorkload]]
+    requires: Tuple[str, ...] = ()
+
+    @property
+    def key(self) -> str:
+        """A unique key for the benchmark."""
+        return f"{self.name}:{self.target}"
+
+    def missing_requirements(self) -> List[str]:
+        """The optional modules the benchmark needs which aren't installed."""
+        missing = []
+        for module in self.requires:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                missing.append(module)
+        return missing
+
+
+class BenchmarkResult(NamedTuple):
+    """The timings from running one benchmark."""
+
+    name: str
+    target: str
+    operations: int
+    times: List[float]
+    python_peak_bytes: Optional[int] = None
+    peak_rss_kib: Optional[int] = None
+
+    @property
+    def key(self) -> str:
+        """A unique key for the benchmark."""
+        return f"{self.name}:{self.target}"
+
+    @property
+    def median(self) -> float:
+        """The median time, in seconds, to run the workload once."""
+        return statistics.median(self.times)
+
+    @property
+    def ops_per_second(self) -> float:
+        """Operations per second, based on the median time."""
+        return self.operations / self.median if self.median else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the result to a JSON-serialisable dict."""
+        return {
+            "name": self.name,
+            "target": self.target,
+            "operations": self.operations,
+            "times": self.times,
+            "min": min(self.times),
+            "median": self.median,
+            "mean": statistics.mean(self.times),
+            "ops_per_second": self.ops_per_second,
+            "python_peak_bytes": self.python_peak_bytes,
+            "peak_rss_kib": self.peak_rss_kib,
+        }
+
+
+class Comparison(NamedTuple):
+    """A benchmark's median time compared with a baseline."""
+
+    key: str
+    baseline_median: float
+    median: float
+
+    @property
+    def ratio(self) -> float:
+        """The current median time as a multiple of the baseline's."""
+        return self.median / self.baseline_median if self.baseline_median else 1.0
+
+    def regressed(self, threshold: float) -> bool:
+        """Whether the benchmark is slower than the baseline by `threshold`."""
+        return self.ratio > 1.0 + threshold
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(
+    name: str, target: str, *, requires: Sequence[str] = ()
+) -> Callable[[WorkloadFactory], WorkloadFactory]:
+    """
+    Register a workload as a benchmark.
+
+    The decorated function takes the scale factor, sets up the workload,
+    yields a function which runs it once (returning the number of
+    operations), and then tears it down.
+
+    """
+    if target not in TARGETS:
+        raise ValueError(f"Unknown benchmark target {target!r}.")
+
+    def register(function: WorkloadFactory) -> WorkloadFactory:
+        BENCHMARKS.append(
+            Benchmark(name, target, contextmanager(function), tuple(requires))
+        )
+        return function
+
+    return register
+
+
+def _load_workloads():
+    """Import the workload modules, registering their benchmarks."""
+    # pylint: disable=import-outside-toplevel,unused-import,cyclic-import
+    from . import workloads, async_workloads, import_time
+
+
+def select_benchmarks(
+    patterns: Iterable[str] = (), targets: Iterable[str] = TARGETS
+) -> List[Benchmark]:
+    """
+    Return the registered benchmarks whose key contains any of
+    `patterns` (or all of them, if there are no patterns), for the given
+    targets.
+
+    """
+    _load_workloads()
+    patterns, targets = list(patterns), set(targets)
+    return [
+        bench
+        for bench in BENCHMARKS
+        if bench.target in targets
+        and (not patterns or any(pattern in bench.key for pattern in patterns))
+    ]
+
+
+def _peak_rss_kib() -> Optional[int]:
+    """The peak resident set size of this process, in KiB, if known."""
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KiB.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_benchmark(
+    bench: Benchmark,
+    *,
+    scale: float = 1.0,
+    repeat: int = 5,
+    memory: bool = False,
+    measure_rss: bool = False,
+) -> BenchmarkResult:
+    """
+    Run a benchmark: once to warm up, then `repeat` times, timing each
+    run. If `memory` is set, one more run measures the peak Python
+    memory allocated, using `tracemalloc`.
+
+    The process's peak RSS is only recorded if `measure_rss` is set,
+    since it's only meaningful when the benchmark has a process to
+    itself (see `run_benchmark_isolated`).
+
+    """
+    if repeat < 1:
+        raise ValueError("`repeat` must be at least 1.")
+    with bench.workload(scale) as run:
+        run()
+        times = []
+        for _ in range(repeat):
+            gc.collect()
+            started_at = perf_counter()
+            outcome = run()
+            elapsed = perf_counter() - started_at
+            if isinstance(outcome, tuple):
+                operations, elapsed = outcome
+            else:
+                operations = outcome
+            times.append(elapsed)
+
+        python_peak_bytes = None
+        if memory:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                run()
+                _, python_peak_bytes = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+    return BenchmarkResult(
+        bench.name,
+        bench.target,
+        operations,
+        times,
+        python_peak_bytes,
+        _peak_rss_kib() if measure_rss else None,
+    )
+
+
+def run_benchmark_isolated(
+    bench: Benchmark,
+    *,
+    scale: float = 1.0,
+    repeat: int = 5,
+    memory: bool = False,
+) -> BenchmarkResult:
+    """
+    Run a benchmark in a fresh interpreter, so that its peak RSS isn't
+    affected by earlier benchmarks.
+
+    """
+    command = [
+        sys.executable,
+        "-m",
+        "pyduckdb.bench",
+        "--run-one",
+        bench.key,
+        "--scale",
+        str(scale),
+        "--repeat",
+        str(repeat),
+    ]
+    if memory:
+        command.append("--memory")
+    output = subprocess.run(
+        command, check=True, stdout=subprocess.PIPE, universal_newlines=True
+    ).stdout
+    result = json.loads(output)
+    return BenchmarkResult(
+        result["name"],
+        result["target"],
+        result["operations"],
+        result["times"],
+        result["python_peak_bytes"],
+        result["peak_rss_kib"],
+    )
+
+
+def _metadata(scale: float, repeat: int) -> Dict[str, Any]:
+    """Describe the environment the benchmarks ran in."""
+    # pylint: disable=import-outside-toplevel
+    import duckdb
+    from .. import __version__
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "pyduckdb": __version__,
+        "duckdb": getattr(duckdb, "__version__", "unknown"),
+        "sqlite3": sqlite3.sqlite_version,
+        "scale": scale,
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(
+    benchmarks: Iterable[Benchmark],
+    *,
+    scale: float = 1.0,
+    repeat: int = 5,
+    memory: bool = False,
+    run: Callable[..., BenchmarkResult] = run_benchmark,
+    report: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run benchmarks, returning a JSON-serialisable report. Benchmarks
+    with missing optional requirements are skipped.
+
+    `run` is the function used to run each benchmark, and `report` (if
+    given) is called with a line of progress for each benchmark.
+
+    """
+    if repeat < 1:
+        raise ValueError("`repeat` must be at least 1.")
+    results, skipped = [], []
+    for bench in benchmarks:
+        missing = bench.missing_requirements()
+        if missing:
+            skipped.append({"key": bench.key, "missing": missing})
+            if report is not None:
+                report(f"{bench.key:<45} skipped (needs {', '.join(missing)})")
+            continue
+
+        result = run(bench, scale=scale, repeat=repeat, memory=memory)
+        results.append(result.to_dict())
+        if report is not None:
+            report(
+                f"{bench.key:<45} {result.median * 1e3:>10.2f} ms "
+                f"{result.ops_per_second:>14,.0f} ops/s"
+            )
+
+    return {
+        "metadata": _metadata(scale, repeat),
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Comparison]:
+    """
+    Compare the median times of two reports, for the benchmarks they
+    have in common.
+
+    """
+    baseline_medians = {
+        f"{result['name']}:{result['target']}": result["median"]
+        for result in baseline["results"]
+    }
+    comparisons = []
+    for result in current["results"]:
+        key = f"{result['name']}:{result['target']}"
+        if key in baseline_medians:
+            comparisons.append(Comparison(key, baseline_medians[key], result["median"]))
+    return comparisons
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    """Load a saved benchmark report."""
+    with open(path, "r") as file:
+        return json.load(file)
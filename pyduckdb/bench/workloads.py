@@ -0,0 +1,1027 @@
+"""
+Synchronous benchmark workloads.
+
+Each workload runs against pyduckdb and, where the comparison makes sense,
+against raw DuckDB and the standard library's SQLite, so that the cost of
+the wrapper can be told apart from the cost of the database.
+
+"""
+# pylint: disable=c-extension-no-member
+import csv
+import io
+import json
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Iterator, List, Tuple
+import duckdb
+import pyduckdb
+from pyduckdb import metrics
+from pyduckdb.parallel import map_query
+from pyduckdb.core.adapters import ADAPTERS, CONVERTERS
+from pyduckdb.core.ingest import CopyResult
+from .runner import RunWorkload, benchmark
+
+ROWS = 100_000
+QUERIES = 2_000
+CONNECTS = 200
+INSERTS = 5_000
+CALLS = 100_000
+FETCHMANY_SIZE = 1_000
+
+POINT_QUERY = "SELECT name, value FROM items WHERE id = ?;"
+SCAN_QUERY = "SELECT id, name, value FROM items;"
+INSERT_QUERY = "INSERT INTO loaded VALUES (?, ?, ?);"
+CREATE_LOADED = "CREATE TABLE loaded (id INTEGER, name VARCHAR, value DOUBLE);"
+
+
+def scaled(count: int, scale: float) -> int:
+    """Scale a workload size, keeping it positive."""
+    return max(int(count * scale), 1)
+
+
+def make_rows(count: int) -> List[Tuple[int, str, float]]:
+    """Generate rows for the `items` and `loaded` tables."""
+    return [(index, f"name-{index}", index * 0.5) for index in range(count)]
+
+
+def populate_duckdb(connection: Any, count: int):
+    """Create and fill the `items` table on a DuckDB-like connection."""
+    connection.execute(
+        "CREATE TABLE items AS SELECT range::INTEGER AS id, "
+        "'name-' || range::VARCHAR AS name, range * 0.5 AS value "
+        f"FROM range({count});"
+    )
+
+
+def populate_sqlite(connection: sqlite3.Connection, count: int):
+    """Create and fill the `items` table on a SQLite connection."""
+    connection.execute(
+        "CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, value REAL);"
+    )
+    connection.executemany("INSERT INTO items VALUES (?, ?, ?);", make_rows(count))
+    connection.commit()
+
+
+def _connections(target: str, rows: int) -> Any:
+    """
+    Open an in-memory connection for a target, with `items` populated.
+    Targets starting with "pyduckdb" are variants of it.
+
+    """
+    if target.startswith("pyduckdb"):
+        connection = pyduckdb.connect(":memory:")
+        populate_duckdb(connection, rows)
+    elif target == "duckdb":
+        connection = duckdb.connect(":memory:")
+        populate_duckdb(connection, rows)
+    else:
+        connection = sqlite3.connect(":memory:")
+        populate_sqlite(connection, rows)
+    return connection
+
+
+# Connecting.
+
+
+@benchmark("connect", "pyduckdb")
+def connect_pyduckdb(scale: float) -> Iterator[RunWorkload]:
+    count = scaled(CONNECTS, scale)
+
+    def run():
+        for _ in range(count):
+            pyduckdb.connect(":memory:").close()
+        return count
+
+    yield run
+
+
+@benchmark("connect", "duckdb")
+def connect_duckdb(scale: float) -> Iterator[RunWorkload]:
+    count = scaled(CONNECTS, scale)
+
+    def run():
+        for _ in range(count):
+            duckdb.connect(":memory:").close()
+        return count
+
+    yield run
+
+
+@benchmark("connect", "sqlite3")
+def connect_sqlite(scale: float) -> Iterator[RunWorkload]:
+    count = scaled(CONNECTS, scale)
+
+    def run():
+        for _ in range(count):
+            sqlite3.connect(":memory:").close()
+        return count
+
+    yield run
+
+
+@benchmark("connect_file", "pyduckdb")
+def connect_file_pyduckdb(scale: float) -> Iterator[RunWorkload]:
+    count = scaled(CONNECTS, scale)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bench.db")
+    # Keep the database open, as a long-running service would.
+    hot_connection = pyduckdb.connect(path)
+    populate_duckdb(hot_connection, 1_000)
+    hot_connection.commit()
+
+    def run():
+        for _ in range(count):
+            pyduckdb.connect(path).close()
+        return count
+
+    try:
+        yield run
+    finally:
+        hot_connection.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@benchmark("connect_file", "duckdb")
+def connect_file_duckdb(scale: float) -> Iterator[RunWorkload]:
+    count = scaled(CONNECTS, scale)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bench.db")
+    connection = duckdb.connect(path)
+    populate_duckdb(connection, 1_000)
+    connection.close()
+
+    def run():
+        for _ in range(count):
+            duckdb.connect(path).close()
+        return count
+
+    try:
+        yield run
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@benchmark("connect_file", "sqlite3")
+def connect_file_sqlite(scale: float) -> Iterator[RunWorkload]:
+    count = scaled(CONNECTS, scale)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bench.db")
+    populate_sqlite(sqlite3.connect(path), 1_000)
+
+    def run():
+        for _ in range(count):
+            sqlite3.connect(path).close()
+        return count
+
+    try:
+        yield run
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+# Point queries.
+
+
+def _point_queries(cursor: Any, queries: int, rows: int) -> RunWorkload:
+    """Run parameterised point queries on a reused cursor."""
+
+    def run():
+        for index in range(queries):
+            cursor.execute(POINT_QUERY, (index % rows,))
+            cursor.fetchone()
+        return queries
+
+    return run
+
+
+def _point_query_workload(target: str, scale: float) -> Iterator[RunWorkload]:
+    rows, queries = scaled(ROWS, scale), scaled(QUERIES, scale)
+    connection = _connections(target, rows)
+    try:
+        yield _point_queries(connection.cursor(), queries, rows)
+    finally:
+        connection.close()
+
+
+for _target in ("pyduckdb", "duckdb", "sqlite3"):
+    benchmark("point_query", _target)(
+        lambda scale, target=_target: _point_query_workload(target, scale)
+    )
+
+
+@benchmark("point_query_statement_cache", "pyduckdb")
+def point_query_cached_pyduckdb(scale: float) -> Iterator[RunWorkload]:
+    rows, queries = scaled(ROWS, scale), scaled(QUERIES, scale)
+    connection = pyduckdb.connect(":memory:", statement_cache_size=16)
+    populate_duckdb(connection, rows)
+    try:
+        yield _point_queries(connection.cursor(), queries, rows)
+    finally:
+        connection.close()
+
+
+def _connection_execute_workload(target: str, scale: float) -> Iterator[RunWorkload]:
+    rows, queries = scaled(ROWS, scale), scaled(QUERIES, scale)
+    connection = _connections(target, rows)
+
+    def run():
+        for index in range(queries):
+            connection.execute(POINT_QUERY, (index % rows,)).fetchone()
+        return queries
+
+    try:
+        yield run
+    finally:
+        connection.close()
+
+
+for _target in ("pyduckdb", "duckdb", "sqlite3"):
+    benchmark("connection_execute", _target)(
+        lambda scale, target=_target: _connection_execute_workload(target, scale)
+    )
+
+
+@benchmark("connection_execute_cursor_cache", "pyduckdb")
+def connection_execute_cached_pyduckdb(scale: float) -> Iterator[RunWorkload]:
+    """Small queries through `Connection.execute`, reusing DuckDB cursors."""
+    rows, queries = scaled(ROWS, scale), scaled(QUERIES, scale)
+    connection = pyduckdb.connect(":memory:", cursor_cache_size=8)
+    populate_duckdb(connection, rows)
+
+    def run():
+        for index in range(queries):
+            connection.execute(POINT_QUERY, (index % rows,)).fetchone()
+        return queries
+
+    try:
+        yield run
+    finally:
+        connection.close()
+
+
+@benchmark("point_query_raw", "pyduckdb")
+def point_query_raw_pyduckdb(scale: float) -> Iterator[RunWorkload]:
+    rows, queries = scaled(ROWS, scale), scaled(QUERIES, scale)
+    connection = _connections("pyduckdb", rows)
+    try:
+        yield _point_queries(connection.cursor().raw(), queries, rows)
+    finally:
+        connection.close()
+
+
+@benchmark("point_query_profiled", "pyduckdb")
+def point_query_profiled_pyduckdb(scale: float) -> Iterator[RunWorkload]:
+    rows, queries = scaled(ROWS, scale), scaled(QUERIES, scale)
+    connection = _connections("pyduckdb", rows)
+    profiles = []
+    connection.set_profile_callback(profiles.append)
+
+    def run():
+        profiles.clear()
+        return _point_queries(connection.cursor(), queries, rows)()
+
+    try:
+        yield run
+    finally:
+        connection.close()
+
+
+@benchmark("point_query_metrics", "pyduckdb")
+def point_query_metrics_pyduckdb(scale: float) -> Iterator[RunWorkload]:
+    rows, queries = scaled(ROWS, scale), scaled(QUERIES, scale)
+    connection = _connections("pyduckdb", rows)
+    metrics.enable()
+    try:
+        yield _point_queries(connection.cursor(), queries, rows)
+    finally:
+        metrics.disable()
+        metrics.reset()
+        connection.close()
+
+
+@benchmark("point_query_timeout", "pyduckdb")
+def point_query_timeout_pyduckdb(scale: float) -> Iterator[RunWorkload]:
+    """Point queries with a statement timeout, which is never reached."""
+    rows, queries = scaled(ROWS, scale), scaled(QUERIES, scale)
+    connection = _connections("pyduckdb", rows)
+    connection.statement_timeout = 60.0
+    try:
+        yield _point_queries(connection.cursor(), queries, rows)
+    finally:
+        connection.close()
+
+
+def _call_overhead_workload(target: str, scale: float) -> Iterator[RunWorkload]:
+    """
+    Call `fetchone` on an exhausted result, so that the time is almost
+    all per-call overhead rather than work done by the database.
+
+    """
+    calls = scaled(CALLS, scale)
+    connection = _connections(target, 1)
+    cursor = connection.cursor()
+    if target == "pyduckdb-raw":
+        cursor = cursor.raw()
+    cursor.execute("SELECT 1 WHERE FALSE;")
+
+    def run():
+        fetchone = cursor.fetchone
+        for _ in range(calls):
+            fetchone()
+        return calls
+
+    try:
+        yield run
+    finally:
+        connection.close()
+
+
+for _target in ("pyduckdb", "duckdb", "sqlite3"):
+    benchmark("call_overhead", _target)(
+        lambda scale, target=_target: _call_overhead_workload(target, scale)
+    )
+benchmark("call_overhead_raw", "pyduckdb")(
+    lambda scale: _call_overhead_workload("pyduckdb-raw", scale)
+)
+
+
+# Fetching.
+
+
+def _fetch_workload(target: str, scale: float, method: str) -> Iterator[RunWorkload]:
+    rows = scaled(ROWS, scale)
+    connection = _connections(target, rows)
+    cursor = connection.cursor()
+
+    def run():
+        cursor.execute(SCAN_QUERY)
+        fetched = 0
+        if method == "fetchone":
+            while cursor.fetchone() is not None:
+                fetched += 1
+        elif method == "iterate":
+            for _ in cursor:
+                fetched += 1
+        elif method == "fetchmany":
+            while True:
+                batch = cursor.fetchmany(FETCHMANY_SIZE)
+                if not batch:
+                    break
+                fetched += len(batch)
+        else:
+            fetched = len(cursor.fetchall())
+        return fetched
+
+    try:
+        yield run
+    finally:
+        connection.close()
+
+
+for _method in ("fetchone", "fetchmany", "fetchall"):
+    for _target in ("pyduckdb", "duckdb", "sqlite3"):
+        benchmark(_method, _target)(
+            lambda scale, target=_target, method=_method: _fetch_workload(
+                target, scale, method
+            )
+        )
+# Raw DuckDB connections aren't iterable.
+for _target in ("pyduckdb", "sqlite3"):
+    benchmark("iterate", _target)(
+        lambda scale, target=_target: _fetch_workload(target, scale, "iterate")
+    )
+
+
+# Large results held for random access: a plain `fetchall` list against
+# a lazy sequence spilling to disk past a small memory budget. Run with
+# `--isolate` to compare peak RSS.
+
+LAZY_MEMORY_BUDGET = 8 * 2**20
+RANDOM_READS = 10_000
+
+
+def _large_result_workload(
+    scale: float, lazy: bool, access: str
+) -> Iterator[RunWorkload]:
+    """
+    Fetch a large result, then read every row in order (`access` is
+    "scan") or `RANDOM_READS` rows at random ("random").
+
+    """
+    rows = scaled(ROWS * 10, scale)
+    connection = _connections("pyduckdb", rows)
+    cursor = connection.cursor()
+    indices = random.Random(0).sample(range(rows), min(RANDOM_READS, rows))
+
+    def run():
+        cursor.execute(SCAN_QUERY)
+        if lazy:
+            result = cursor.fetch_sequence(memory_budget=LAZY_MEMORY_BUDGET)
+        else:
+            result = cursor.fetchall()
+        if access == "scan":
+            read = sum(1 for _ in result)
+        else:
+            read = len([result[index] for index in indices])
+        if lazy:
+            result.close()
+        return read
+
+    try:
+        yield run
+    finally:
+        connection.close()
+
+
+for _access in ("scan", "random"):
+    benchmark(f"large_result_{_access}_fetchall", "pyduckdb")(
+        lambda scale, access=_access: _large_result_workload(scale, False, access)
+    )
+    benchmark(f"large_result_{_access}_lazy", "pyduckdb")(
+        lambda scale, access=_access: _large_result_workload(scale, True, access)
+    )
+
+
+# Named rows: `pyduckdb.Row` as a row factory, against wrapping tuples in
+# dicts or namedtuples after fetching them, and against `sqlite3.Row`.
+# Run with `--memory` to compare the memory used per row.
+
+
+def _named_rows_workload(
+    target: str, scale: float, style: str
+) -> Iterator[RunWorkload]:
+    rows = scaled(ROWS, scale)
+    connection = _connections(target, rows)
+    cursor = connection.cursor()
+    if style == "row":
+        cursor.row_factory = pyduckdb.Row if target == "pyduckdb" else sqlite3.Row
+    item = namedtuple("Item", ["id", "name", "value"])
+    get_name = attrgetter("name") if style == "namedtuple" else itemgetter("name")
+
+    def run():
+        cursor.execute(SCAN_QUERY)
+        result = cursor.fetchall()
+        if style == "dict":
+            names = [column[0] for column in cursor.description]
+            result = [dict(zip(names, row)) for row in result]
+        elif style == "namedtuple":
+            result = [item._make(row) for row in result]
+        # Named access to one column per row, as a caller would.
+        for row in result:
+            get_name(row)
+        return len(result)
+
+    try:
+        yield run
+    finally:
+        connection.close()
+
+
+for _target in ("pyduckdb", "sqlite3"):
+    benchmark("named_rows", _target)(
+        lambda scale, target=_target: _named_rows_workload(target, scale, "row")
+    )
+for _style in ("dict", "namedtuple"):
+    benchmark(f"named_rows_{_style}", "pyduckdb")(
+        lambda scale, style=_style: _named_rows_workload("pyduckdb", scale, style)
+    )
+
+
+def _columnar_workload(scale: float, method: str) -> Iterator[RunWorkload]:
+    rows = scaled(ROWS, scale)
+    connection = _connections("pyduckdb", rows)
+    cursor = connection.cursor()
+
+    def run():
+        cursor.execute(SCAN_QUERY)
+        result = getattr(cursor, method)()
+        if method == "fetchall":
+            return len(result)
+        if method == "fetchnumpy":
+            return len(result["id"])
+        return len(result)
+
+    try:
+        yield run
+    finally:
+        connection.close()
+
+
+for _method, _requires in (
+    ("fetchnumpy", ("numpy",)),
+    ("fetchdf", ("pandas",)),
+    ("fetch_arrow_table", ("pyarrow",)),
+):
+    benchmark(f"columnar_{_method}", "pyduckdb", requires=_requires)(
+        lambda scale, method=_method: _columnar_workload(scale, method)
+    )
+benchmark("columnar_fetchall", "pyduckdb")(
+    lambda scale: _columnar_workload(scale, "fetchall")
+)
+
+
+@benchmark("columnar_fetch_record_batches", "pyduckdb", requires=("pyarrow",))
+def record_batches_pyduckdb(scale: float) -> Iterator[RunWorkload]:
+    rows = scaled(ROWS, scale)
+    connection = _connections("pyduckdb", rows)
+    cursor = connection.cursor()
+
+    def run():
+        cursor.execute(SCAN_QUERY)
+        return sum(batch.num_rows for batch in cursor.fetch_record_batches(10_000))
+
+    try:
+        yield run
+    finally:
+        connection.close()
+
+
+# Adapters and converters, against processing values one by one before
+# `executemany` and after `fetchall`.
+
+DOCUMENTS_QUERY = "SELECT id, doc::JSON AS doc, value FROM documents;"
+
+
+@contextmanager
+def _registered(adapter: bool, converters: bool):
+    """Register JSON adapters and converters for the length of a workload."""
+    if adapter:
+        pyduckdb.register_adapter(dict, json.dumps)
+    if converters:
+        pyduckdb.register_converter("JSON", json.loads)
+        pyduckdb.register_converter("DOUBLE", lambda column: column * 2, batch=True)
+    try:
+        yield
+    finally:
+        ADAPTERS.clear()
+        CONVERTERS.clear()
+
+
+def _documents(scale: float) -> Tuple[Any, int]:
+    """A pyduckdb connection with a `documents` table of JSON strings."""
+    rows = scaled(ROWS, scale)
+    connection = pyduckdb.connect(":memory:")
+    connection.execute(
+        "CREATE TABLE documents AS SELECT range::INTEGER AS id, "
+        "'{\"name\": \"name-' || range::VARCHAR || '\"}' AS doc, "
+        f"range * 0.5 AS value FROM range({rows});"
+    )
+    return connection, rows
+
+
+def _convert_workload(scale: float, registered: bool) -> Iterator[RunWorkload]:
+    connection, _ = _documents(scale)
+    cursor = connection.cursor()
+
+    def run():
+        cursor.execute(DOCUMENTS_QUERY)
+        result = cursor.fetchall()
+        if not registered:
+            result = [
+                (item_id, None if doc is None else json.loads(doc), value * 2)
+                for item_id, doc, value in result
+            ]
+        return len(result)
+
+    with _registered(False, registered):
+        try:
+            yield run
+        finally:
+            connection.close()
+
+
+benchmark("convert_fetchall", "pyduckdb")(lambda scale: _convert_workload(scale, True))
+benchmark("convert_fetchall_by_value", "pyduckdb")(
+    lambda scale: _convert_workload(scale, False)
+)
+
+
+@benchmark("convert_fetchall_unmatched", "pyduckdb")
+def convert_unmatched_pyduckdb(scale: float) -> Iterator[RunWorkload]:
+    """Fetch a result with none of the registered converters' types."""
+    with _registered(True, True):
+        yield from _fetch_workload("pyduckdb", scale, "fetchall")
+
+
+def _adapt_workload(scale: float, registered: bool) -> Iterator[RunWorkload]:
+    inserts = scaled(INSERTS, scale)
+    rows = [(index, {"name": f"name-{index}"}) for index in range(inserts)]
+    connection = pyduckdb.connect(":memory:")
+
+    def run():
+        connection.execute("DROP TABLE IF EXISTS loaded;")
+        connection.execute("CREATE TABLE loaded (id INTEGER, doc VARCHAR);")
+        if registered:
+            connection.executemany("INSERT INTO loaded VALUES (?, ?);", rows)
+        else:
+            connection.executemany(
+                "INSERT INTO loaded VALUES (?, ?);",
+                [(item_id, json.dumps(doc)) for item_id, doc in rows],
+            )
+        return inserts
+
+    with _registered(registered, False):
+        try:
+            yield run
+        finally:
+            connection.close()
+
+
+benchmark("adapt_executemany", "pyduckdb")(lambda scale: _adapt_workload(scale, True))
+benchmark("adapt_executemany_by_value", "pyduckdb")(
+    lambda scale: _adapt_workload(scale, False)
+)
+
+
+# Loading.
+
+
+def _executemany_workload(target: str, scale: float) -> Iterator[RunWorkload]:
+    inserts = scaled(INSERTS, scale)
+    rows = make_rows(inserts)
+    connection = _connections(target, 1)
+
+    def run():
+        connection.execute("DROP TABLE IF EXISTS loaded;")
+        connection.execute(CREATE_LOADED)
+        connection.executemany(INSERT_QUERY, rows)
+        return inserts
+
+    try:
+        yield run
+    finally:
+        connection.close()
+
+
+for _target in ("pyduckdb", "duckdb", "sqlite3"):
+    benchmark("executemany_insert", _target)(
+        lambda scale, target=_target: _executemany_workload(target, scale)
+    )
+
+
+@benchmark("copy_from_rows", "pyduckdb")
+def copy_from_rows_pyduckdb(scale: float) -> Iterator[RunWorkload]:
+    inserts = scaled(INSERTS, scale)
+    connection = pyduckdb.connect(":memory:")
+
+    def run():
+        connection.execute("DROP TABLE IF EXISTS loaded;")
+        connection.execute(CREATE_LOADED)
+        rows = ((index, f"name-{index}", index * 0.5) for index in range(inserts))
+        return _copied_rows(connection.copy_from("loaded", rows), inserts)
+
+    try:
+        yield run
+    finally:
+        connection.close()
+
+
+@benchmark("copy_from_csv", "pyduckdb")
+def copy_from_csv_pyduckdb(scale: float) -> Iterator[RunWorkload]:
+    inserts = scaled(INSERTS, scale)
+    connection = pyduckdb.connect(":memory:")
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "loaded.csv")
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(("id", "name", "value"))
+        writer.writerows(make_rows(inserts))
+
+    def run():
+        connection.execute("DROP TABLE IF EXISTS loaded;")
+        connection.execute(CREATE_LOADED)
+        return _copied_rows(connection.copy_from("loaded", path, header=True), inserts)
+
+    try:
+        yield run
+    finally:
+        connection.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _copied_rows(result: Any, expected: int) -> int:
+    """The rows `copy_from` loaded, checking that it loaded all of them."""
+    if not isinstance(result, CopyResult) or result.rows != expected:
+        raise RuntimeError(f"Expected {expected} rows to be loaded, got {result!r}.")
+    return result.rows
+
+
+# Exporting.
+
+
+def _write_csv_with_fetchall(cursor: Any, file: Any) -> int:
+    """Export a result the naive way: fetch everything, then write it."""
+    rows = cursor.fetchall()
+    writer = csv.writer(io.TextIOWrapper(file, encoding="utf-8", newline=""))
+    writer.writerow([column[0] for column in cursor.description])
+    writer.writerows(rows)
+    return len(rows)
+
+
+@benchmark("export_csv_fetchall", "pyduckdb")
+def export_csv_fetchall_pyduckdb(scale: float) -> Iterator[RunWorkload]:
+    connection = _connections("pyduckdb", scaled(ROWS, scale))
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "export.csv")
+
+    def run():
+        with open(path, "wb") as file:
+            return _write_csv_with_fetchall(connection.execute(SCAN_QUERY), file)
+
+    try:
+        yield run
+    finally:
+        connection.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@benchmark("export_csv_fetchall", "sqlite3")
+def export_csv_fetchall_sqlite(scale: float) -> Iterator[RunWorkload]:
+    connection = _connections("sqlite3", scaled(ROWS, scale))
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "export.csv")
+
+    def run():
+        with open(path, "wb") as file:
+            return _write_csv_with_fetchall(connection.execute(SCAN_QUERY), file)
+
+    try:
+        yield run
+    finally:
+        connection.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _copy_to_workload(scale: float, to_file_object: bool) -> Iterator[RunWorkload]:
+    connection = _connections("pyduckdb", scaled(ROWS, scale))
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "export.csv")
+
+    def run():
+        cursor = connection.execute(SCAN_QUERY)
+        if to_file_object:
+            with open(path, "wb") as file:
+                return cursor.copy_to(file, format="csv").rows
+        return cursor.copy_to(path).rows
+
+    try:
+        yield run
+    finally:
+        connection.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+benchmark("export_csv_copy_to", "pyduckdb")(
+    lambda scale: _copy_to_workload(scale, False)
+)
+benchmark("export_csv_copy_to_chunked", "pyduckdb")(
+    lambda scale: _copy_to_workload(scale, True)
+)
+
+
+# Concurrent queries.
+
+THREAD_COUNTS = (1, 2, 4, 8)
+
+
+def _run_threads(threads: int, work: Callable[[int], int]) -> int:
+    """Run `work(thread_number)` on `threads` threads, summing the results."""
+    counts = [0] * threads
+    errors: List[BaseException] = []
+
+    def target(number: int):
+        try:
+            counts[number] = work(number)
+        except BaseException as err:  # pylint: disable=broad-except
+            errors.append(err)
+
+    workers = [
+        threading.Thread(target=target, args=(number,)) for number in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+    return sum(counts)
+
+
+def _threaded_workload(
+    target: str, scale: float, threads: int, shared: bool
+) -> Iterator[RunWorkload]:
+    """
+    Point queries from several threads at once, either through one
+    thread-safe connection shared by them all, or through a connection
+    of each thread's own to the same database file.
+
+    """
+    rows, queries = scaled(ROWS, scale), scaled(QUERIES, scale)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bench.db")
+    connect = duckdb.connect if target == "duckdb" else pyduckdb.connect
+    setup = connect(path)
+    populate_duckdb(setup, rows)
+    setup.commit()
+    if shared:
+        connections = [pyduckdb.connect(path, thread_safe=True)] * threads
+    else:
+        connections = [connect(path) for _ in range(threads)]
+    per_thread = max(queries // threads, 1)
+
+    def work(number: int) -> int:
+        execute = connections[number].execute
+        for index in range(number, number + per_thread):
+            execute(POINT_QUERY, (index % rows,)).fetchone()
+        return per_thread
+
+    try:
+        yield lambda: _run_threads(threads, work)
+    finally:
+        for connection in connections:
+            connection.close()
+        setup.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+for _threads in THREAD_COUNTS:
+    benchmark(f"threaded_query[threads={_threads}]", "pyduckdb")(
+        lambda scale, threads=_threads: _threaded_workload(
+            "pyduckdb", scale, threads, True
+        )
+    )
+    for _target in ("pyduckdb", "duckdb"):
+        benchmark(f"threaded_query_per_thread[threads={_threads}]", _target)(
+            lambda scale, target=_target, threads=_threads: _threaded_workload(
+                target, scale, threads, False
+            )
+        )
+
+
+# Partitioned queries.
+
+PARTITIONS = 64
+PARTITION_QUERY = (
+    "SELECT count(*), sum(value), max(name) FROM items WHERE id >= ? AND id < ?;"
+)
+
+
+def _partitions(rows: int) -> List[Tuple[int, int]]:
+    """Split the `items` table's ids into disjoint ranges."""
+    size = -(-rows // PARTITIONS)
+    return [(start, start + size) for start in range(0, rows, size)]
+
+
+def _partitioned_workload(scale: float, workers: int) -> Iterator[RunWorkload]:
+    """
+    An aggregate over each of a set of disjoint id ranges, either one
+    after another on one cursor (with no workers) or with
+    `execute_parallel`.
+
+    """
+    rows = scaled(ROWS * 10, scale)
+    connection = _connections("pyduckdb", rows)
+    partitions = _partitions(rows)
+
+    def run():
+        if not workers:
+            cursor = connection.cursor()
+            for parameters in partitions:
+                cursor.execute(PARTITION_QUERY, parameters).fetchall()
+        else:
+            for _ in connection.execute_parallel(
+                PARTITION_QUERY, partitions, max_workers=workers
+            ):
+                pass
+        return len(partitions)
+
+    try:
+        yield run
+    finally:
+        connection.close()
+
+
+benchmark("partitioned_query_sequential", "pyduckdb")(
+    lambda scale: _partitioned_workload(scale, 0)
+)
+for _threads in THREAD_COUNTS:
+    benchmark(f"partitioned_query_parallel[workers={_threads}]", "pyduckdb")(
+        lambda scale, workers=_threads: _partitioned_workload(scale, workers)
+    )
+
+
+# Scans with Python post-processing.
+
+PROCESS_COUNTS = (1, 2, 4)
+SCAN_WORK = 20
+
+
+def score_rows(rows: List[Tuple[int, str, float]]) -> int:
+    """CPU-bound Python work on each row of a batch, as a pipeline might do."""
+    total = 0
+    for _, name, value in rows:
+        for round_ in range(SCAN_WORK):
+            total = (
+                total * 31 + ord(name[round_ % len(name)]) + int(value)
+            ) % 1_000_003
+    return total
+
+
+def add_scores(left: int, right: int) -> int:
+    """Combine the results of `score_rows`."""
+    return (left + right) % 1_000_003
+
+
+def _python_scan_workload(scale: float, processes: int) -> Iterator[RunWorkload]:
+    """
+    Score every row of a database file, iterating over one cursor (with
+    no processes) or with `map_query`.
+
+    """
+    rows = scaled(ROWS, scale)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bench.db")
+    with pyduckdb.connect(path) as connection:
+        populate_duckdb(connection, rows)
+        connection.commit()
+
+    def run():
+        if not processes:
+            with pyduckdb.connect(path, read_only=True) as connection:
+                cursor = connection.execute(SCAN_QUERY)
+                while True:
+                    batch = cursor.fetchmany(FETCHMANY_SIZE * 10)
+                    if not batch:
+                        break
+                    score_rows(batch)
+        else:
+            map_query(
+                path, SCAN_QUERY, score_rows, reduce=add_scores, processes=processes
+            )
+        return rows
+
+    try:
+        yield run
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+benchmark("python_scan_cursor", "pyduckdb")(
+    lambda scale: _python_scan_workload(scale, 0)
+)
+for _processes in PROCESS_COUNTS:
+    benchmark(f"python_scan_map_query[processes={_processes}]", "pyduckdb")(
+        lambda scale, processes=_processes: _python_scan_workload(scale, processes)
+    )
+
+
+# Repeated reads.
+
+AGGREGATE_QUERY = (
+    "SELECT id % 10 AS bucket, count(*), sum(value) FROM items "
+    "WHERE id >= ? GROUP BY bucket ORDER BY bucket;"
+)
+AGGREGATE_PARAMETERS = 5
+
+
+def _repeated_aggregate_workload(
+    target: str, scale: float, result_cache: bool = False
+) -> Iterator[RunWorkload]:
+    """
+    The same few aggregate queries again and again, as a dashboard would
+    run them, through `Connection.execute`.
+
+    """
+    rows, queries = scaled(ROWS, scale), scaled(QUERIES // 10, scale)
+    if result_cache:
+        connection = pyduckdb.connect(":memory:", result_cache=pyduckdb.ResultCache())
+        populate_duckdb(connection, rows)
+    else:
+        connection = _connections(target, rows)
+
+    def run():
+        for index in range(queries):
+            parameters = ((index % AGGREGATE_PARAMETERS) * 10,)
+            connection.execute(AGGREGATE_QUERY, parameters).fetchall()
+        return queries
+
+    try:
+        yield run
+    finally:
+        connection.close()
+
+
+for _target in ("pyduckdb", "duckdb", "sqlite3"):
+    benchmark("repeated_aggregate", _target)(
+        lambda scale, target=_target: _repeated_aggregate_workload(target, scale)
+    )
+benchmark("repeated_aggregate_result_cache", "pyduckdb")(
+    lambda scale: _repeated_aggregate_workload("pyduckdb", scale, True)
+)
@@ -1,16 +1,23 @@
 """
 Core functionality implemented by pyduckdb.
 
-This is mostly the concrete implementation of the DB 2.0 API.
+This is mostly the concrete implementation of the DB 2.0 API. The
+connection, cursor and row classes are imported on first access.
 
 """
-from .connection import Connection
-from .cursor import Cursor
+import importlib
+from typing import Any, List, TYPE_CHECKING
 from .exceptions import *
 
+if TYPE_CHECKING:
+    from .connection import Connection
+    from .cursor import Cursor
+    from .rows import Row
+
 __all__ = [
     "Connection",
     "Cursor",
+    "Row",
     "Error",
     "InterfaceError",
     "DatabaseError",
@@ -21,3 +28,20 @@ __all__ = [
     "OperationalError",
     "ProgrammingError",
 ]
+
+_LAZY_ATTRIBUTES = {"Connection": ".connection", "Cursor": ".cursor", "Row": ".rows"}
+
+
+def __getattr__(name: str) -> Any:
+    """Import the connection, cursor and row classes on first access."""
+    try:
+        module = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
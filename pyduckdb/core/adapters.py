@@ -0,0 +1,253 @@
+"""
+Adapters and converters between Python values and DuckDB's, set with
+`pyduckdb.register_adapter` and `pyduckdb.register_converter`.
+
+These are modelled on `sqlite3`'s, but work a column at a time. Adapters
+are applied to each column of an `executemany` parameter sequence (and
+to the parameters of `execute`), and converters to each column of a
+fetched block of rows, matched by the column's type in
+`Cursor.description`. Results with no matching columns are returned
+untouched, and nothing is checked at all while the registries are empty.
+
+"""
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from pep249 import ColumnDescription, QueryParameters, ResultRow
+from .exceptions import ProgrammingError
+
+__all__ = [
+    "ADAPTERS",
+    "CONVERTERS",
+    "NUMERIC_TYPES",
+    "Adapter",
+    "Converter",
+    "RowsConverter",
+    "register_adapter",
+    "register_converter",
+    "find_converter",
+    "adapt_parameters",
+    "adapt_column",
+    "adapt_rows",
+    "rows_converter",
+    "convert_numpy_columns",
+]
+
+Adapter = Callable[[Any], Any]
+RowsConverter = Callable[[Sequence[ResultRow]], List[ResultRow]]
+
+# Types whose columns are passed to batch converters as NumPy arrays, when
+# they have no NULLs. "NUMBER" is the type code older DuckDB releases give
+# for all numeric columns.
+NUMERIC_TYPES = frozenset(
+    {
+        "TINYINT",
+        "SMALLINT",
+        "INTEGER",
+        "BIGINT",
+        "UTINYINT",
+        "USMALLINT",
+        "UINTEGER",
+        "UBIGINT",
+        "FLOAT",
+        "DOUBLE",
+        "NUMBER",
+    }
+)
+
+
+class Converter(NamedTuple):
+    """
+    A registered converter: a function of one value, or (if `batch` is
+    set) of a whole column of values, returning a column of the same
+    length.
+
+    """
+
+    function: Callable[[Any], Any]
+    batch: bool
+
+
+ADAPTERS: Dict[type, Adapter] = {}
+CONVERTERS: Dict[str, Converter] = {}
+
+
+def register_adapter(type_: type, adapter: Adapter) -> None:
+    """
+    Register a function converting parameters of exactly `type_` into a
+    value DuckDB accepts.
+
+    """
+    ADAPTERS[type_] = adapter
+
+
+def register_converter(
+    typename: str, converter: Callable[[Any], Any], *, batch: bool = False
+) -> None:
+    """
+    Register a function converting fetched values from columns of type
+    `typename` (case-insensitive, as in `Cursor.description`).
+    Parameterised types such as "DECIMAL(18,3)" also match a converter
+    for the bare name ("DECIMAL").
+
+    By default, the converter is called with each value, skipping NULLs.
+    If `batch` is set, it's called once per fetched block with the whole
+    column, and must return a column of the same length. Numeric columns
+    with no NULLs are passed as NumPy arrays (if NumPy is installed), as
+    are all columns from `Cursor.fetchnumpy`; other columns are passed
+    as tuples.
+
+    Converters registered while a result is being fetched apply from the
+    next statement.
+
+    """
+    CONVERTERS[typename.upper()] = Converter(converter, batch)
+
+
+def _unadapted(value: Any) -> Any:
+    return value
+
+
+def find_converter(type_code: Any) -> Optional[Converter]:
+    """Find the converter for a column's type code, if there is one."""
+    name = str(type_code).upper()
+    converter = CONVERTERS.get(name)
+    if converter is None and "(" in name:
+        converter = CONVERTERS.get(name.split("(", 1)[0].strip())
+    return converter
+
+
+def adapt_parameters(parameters: QueryParameters) -> QueryParameters:
+    """Adapt one statement's parameters."""
+    if isinstance(parameters, Mapping):
+        return {
+            key: ADAPTERS.get(type(value), _unadapted)(value)
+            for key, value in parameters.items()
+        }
+    return [ADAPTERS.get(type(value), _unadapted)(value) for value in parameters]
+
+
+def adapt_column(values: Sequence[Any]) -> Sequence[Any]:
+    """
+    Adapt a column of parameter values, returning the column itself if
+    no value in it has an adapter.
+
+    """
+    dtype = getattr(values, "dtype", None)
+    if dtype is not None and dtype.kind != "O":
+        return values
+    types = set(map(type, values))
+    if types.isdisjoint(ADAPTERS):
+        return values
+    if len(types) == 1:
+        return list(map(ADAPTERS[types.pop()], values))
+    adapters = {type_: ADAPTERS.get(type_, _unadapted) for type_ in types}
+    return [adapters[type(value)](value) for value in values]
+
+
+def adapt_rows(seq_of_parameters: Sequence[QueryParameters]) -> Sequence[Any]:
+    """Adapt a sequence of statement parameters, a column at a time."""
+    rows = seq_of_parameters
+    if not isinstance(rows, (list, tuple)):
+        rows = list(rows)
+    if not rows:
+        return rows
+    if isinstance(rows[0], Mapping) or len(set(map(len, rows))) != 1:
+        return [adapt_parameters(parameters) for parameters in rows]
+
+    columns = list(zip(*rows))
+    adapted = [adapt_column(column) for column in columns]
+    if all(new is old for new, old in zip(adapted, columns)):
+        return rows
+    return list(zip(*adapted))
+
+
+def _import_numpy():
+    """Import NumPy if it's installed, returning None otherwise."""
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return numpy
+
+
+def _convert_column(
+    values: Tuple[Any, ...], converter: Converter, numpy: Any
+) -> Sequence[Any]:
+    """Convert one column of a block of rows."""
+    function = converter.function
+    if not converter.batch:
+        return [None if value is None else function(value) for value in values]
+    if numpy is None or None in values:
+        converted = function(values)
+    else:
+        converted = function(numpy.array(values))
+        tolist = getattr(converted, "tolist", None)
+        if tolist is not None:
+            converted = tolist()
+    if len(converted) != len(values):
+        raise ProgrammingError(
+            f"A batch converter returned {len(converted)} values for "
+            f"{len(values)} rows."
+        )
+    return converted
+
+
+def rows_converter(
+    description: Optional[Sequence[ColumnDescription]],
+) -> Optional[RowsConverter]:
+    """
+    Return a function converting blocks of rows for a result with this
+    description, or None if no column has a converter.
+
+    Each block is transposed into columns, and each converted column is
+    converted in one pass: batch converters are called once with the
+    column, and others with each of its values (skipping NULLs).
+
+    """
+    if not CONVERTERS or not description:
+        return None
+    converters: List[Tuple[int, Converter, bool]] = []
+    for index, column in enumerate(description):
+        converter = find_converter(column[1])
+        if converter is not None:
+            numeric = str(column[1]).upper() in NUMERIC_TYPES
+            converters.append((index, converter, converter.batch and numeric))
+    if not converters:
+        return None
+    numpy = _import_numpy() if any(use for _, _, use in converters) else None
+
+    def convert(rows: Sequence[ResultRow]) -> List[ResultRow]:
+        columns: List[Sequence[Any]] = list(zip(*rows))
+        for index, converter, use_numpy in converters:
+            columns[index] = _convert_column(
+                columns[index], converter, numpy if use_numpy else None
+            )
+        return list(zip(*columns))
+
+    return convert
+
+
+def convert_numpy_columns(
+    columns: Dict[str, Any], description: Optional[Sequence[ColumnDescription]]
+) -> Dict[str, Any]:
+    """
+    Apply batch converters to the arrays from `Cursor.fetchnumpy`. Other
+    converters only apply to rows.
+
+    """
+    if not CONVERTERS or not description:
+        return columns
+    for name, column in zip(list(columns), description):
+        converter = find_converter(column[1])
+        if converter is not None and converter.batch:
+            columns[name] = converter.function(columns[name])
+    return columns
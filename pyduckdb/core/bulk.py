@@ -0,0 +1,225 @@
+"""
+Columnar bulk inserts.
+
+Rather than running an INSERT statement once per row, rows are split into
+batches, each batch is transposed into columns, and the columns are
+inserted as a single Arrow relation. This needs PyArrow: without it (or
+for values Arrow can't convert), batches are inserted with DuckDB's
+row-by-row `executemany`.
+
+Each batch is a statement of its own, so outside a transaction, rows in
+the batches before a failed one stay inserted. Open a transaction
+around the insert to make it atomic.
+
+"""
+# pylint: disable=c-extension-no-member
+import itertools
+import re
+from typing import (
+    Any,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+)
+from pep249 import SQLQuery
+from .adapters import ADAPTERS, adapt_column
+from .exceptions import ProgrammingError
+
+if TYPE_CHECKING:
+    from duckdb import DuckDBPyConnection  # pylint: disable=no-name-in-module
+
+__all__ = [
+    "DEFAULT_BATCH_SIZE",
+    "PlainInsert",
+    "parse_plain_insert",
+    "quote_identifier",
+    "import_pyarrow",
+    "insert_arrow",
+    "insert_columnar",
+]
+
+DEFAULT_BATCH_SIZE = 100_000
+
+_PLAIN_INSERT = re.compile(
+    r"""
+    ^\s*INSERT\s+INTO\s+
+    (?P<table>(?:[\w$]+|"(?:[^"]|"")+")(?:\.(?:[\w$]+|"(?:[^"]|"")+"))*)\s*
+    (?P<columns>\([^()]*\))?\s*
+    VALUES\s*\((?P<values>\s*\?\s*(?:,\s*\?\s*)*)\)
+    \s*;?\s*$
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+_VIEW_IDS = itertools.count(1)
+
+ColumnBatch = Tuple[Optional[List[str]], List[Sequence[Any]]]
+
+
+class PlainInsert(NamedTuple):
+    """An INSERT statement whose values are all placeholders."""
+
+    table: str
+    columns: str
+    width: int
+
+
+def parse_plain_insert(operation: SQLQuery) -> Optional[PlainInsert]:
+    """
+    Parse a statement of the form `INSERT INTO table [(columns)] VALUES
+    (?, ...)`, returning None for any other statement.
+
+    """
+    match = _PLAIN_INSERT.match(operation)
+    if match is None:
+        return None
+    return PlainInsert(
+        match.group("table"),
+        match.group("columns") or "",
+        match.group("values").count("?"),
+    )
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a SQL identifier."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def import_pyarrow():
+    """Import PyArrow if it's installed, returning None otherwise."""
+    try:
+        import pyarrow  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def _row_batches(
+    rows: Iterator[Sequence[Any]], batch_size: int
+) -> Iterator[ColumnBatch]:
+    """Split an iterable of rows into batches of columns."""
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        try:
+            lengths = set(map(len, batch))
+        except TypeError:
+            raise ProgrammingError("Rows must be sequences of values.") from None
+        if len(lengths) != 1:
+            raise ProgrammingError("Rows must all have the same length.")
+        yield None, list(zip(*batch))
+
+
+def _column_batches(data: Any, batch_size: int) -> Iterator[ColumnBatch]:
+    """
+    Split row data into batches of columns, with the column names if the
+    data has them.
+
+    The data can be an iterable of row sequences, a dict of columns, or a
+    2D or structured NumPy array. A 1D array is a single column.
+
+    """
+    names: Optional[List[str]] = None
+    if isinstance(data, dict):
+        names, columns = list(data.keys()), list(data.values())
+    elif getattr(data, "dtype", None) is not None and data.dtype.names:
+        names = list(data.dtype.names)
+        columns = [data[name] for name in names]
+    elif getattr(data, "ndim", None) == 2:
+        columns = [data[:, index] for index in range(data.shape[1])]
+    elif getattr(data, "ndim", None) == 1:
+        columns = [data]
+    else:
+        yield from _row_batches(data, batch_size)
+        return
+
+    if len({len(column) for column in columns}) > 1:
+        raise ProgrammingError("Columns must all have the same length.")
+    length = len(columns[0]) if columns else 0
+    for start in range(0, length, batch_size):
+        yield names, [column[start : start + batch_size] for column in columns]
+
+
+def insert_arrow(duckdb_cursor: "DuckDBPyConnection", target: str, data: Any) -> None:
+    """
+    Insert an Arrow table or record batch into `target`, which is a table
+    name with an optional parenthesised column list.
+
+    """
+    view_name = f"__pyduckdb_bulk_{next(_VIEW_IDS)}"
+    duckdb_cursor.register(view_name, data)
+    try:
+        duckdb_cursor.execute(f"INSERT INTO {target} SELECT * FROM {view_name}")
+    finally:
+        duckdb_cursor.unregister(view_name)
+
+
+def _insert_batch(
+    duckdb_cursor: "DuckDBPyConnection",
+    pyarrow: Any,
+    target: str,
+    columns: List[Sequence[Any]],
+) -> bool:
+    """
+    Insert one batch of columns as an Arrow relation, returning False if
+    Arrow can't convert the values.
+
+    """
+    try:
+        arrays = [pyarrow.array(column) for column in columns]
+    except (pyarrow.ArrowException, TypeError, ValueError):
+        return False
+
+    names = [f"column{index}" for index in range(len(arrays))]
+    insert_arrow(duckdb_cursor, target, pyarrow.Table.from_arrays(arrays, names))
+    return True
+
+
+def insert_columnar(
+    duckdb_cursor: "DuckDBPyConnection",
+    table: str,
+    data: Any,
+    *,
+    columns: str = "",
+    width: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Insert row data into `table` in columnar batches, returning the
+    number of rows inserted.
+
+    `columns` is an optional parenthesised column list for the INSERT,
+    which is generated from the data's column names if it has any. If
+    `width` is given, each row must have that many values. Registered
+    adapters are applied to each column of each batch.
+
+    """
+    if batch_size < 1:
+        raise ProgrammingError("`batch_size` must be at least 1.")
+    pyarrow = import_pyarrow()
+    inserted = 0
+    for names, batch in _column_batches(data, batch_size):
+        if width is not None and len(batch) != width:
+            raise ProgrammingError(
+                f"Expected {width} values per row, got {len(batch)}."
+            )
+        if ADAPTERS:
+            batch = [adapt_column(column) for column in batch]
+        column_list = columns
+        if not column_list and names is not None:
+            column_list = "(" + ", ".join(map(quote_identifier, names)) + ")"
+        target = f"{table} {column_list}".rstrip()
+
+        if pyarrow is None or not _insert_batch(duckdb_cursor, pyarrow, target, batch):
+            placeholders = ", ".join("?" * len(batch))
+            duckdb_cursor.executemany(
+                f"INSERT INTO {target} VALUES ({placeholders})",
+                [list(row) for row in zip(*batch)],
+            )
+        inserted += len(batch[0]) if batch else 0
+    return inserted
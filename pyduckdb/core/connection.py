@@ -3,9 +3,10 @@ Connection object for DuckDB which fits the DB API spec.
 
 """
 # pylint: disable=c-extension-no-member
-from typing import Optional, Sequence, Union
-import duckdb
-from duckdb import DuckDBPyConnection  # pylint: disable=no-name-in-module
+import threading
+import weakref
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union, TYPE_CHECKING
 import pep249
 from pep249 import (
     SQLQuery,
@@ -13,13 +14,76 @@ from pep249 import (
     ProcName,
     ProcArgs,
 )
+from .bulk import DEFAULT_BATCH_SIZE
 from .cursor import Cursor
-from .exceptions import InterfaceError, convert_runtime_errors
-from .utils import raise_if_closed, ignore_transaction_error
+from .cursor_cache import CursorCache, CursorCacheStats
+from .exceptions import (
+    DUCKDB_ERRORS,
+    Error,
+    InterfaceError,
+    NotSupportedError,
+    convert_runtime_errors,
+)
+from .ingest import CopyResult, copy_into
+from .metrics import REGISTRY as METRICS
+from .parallel import ParallelExecution
+from .registry import acquire_database, database_key, release_database
+from .result_cache import (
+    CachedCursor,
+    ResultCache,
+    ResultCacheStats,
+    ResultRecorder,
+    analyse_query,
+    parameters_key,
+)
+from .rows import RowFactory
+from .statement_cache import StatementCache, StatementCacheStats
+from .tracing import ProfileCallback, TraceCallback
+from .utils import (
+    check_interruptible,
+    is_duckdb_connection,
+    raise_if_closed,
+    raise_if_closed_and_convert,
+    ignore_transaction_error,
+)
+
+if TYPE_CHECKING:
+    from duckdb import DuckDBPyConnection  # pylint: disable=no-name-in-module
 
 __all__ = ["Connection"]
 
 
+def _close_cursors(cursors: "weakref.WeakSet[Cursor]", lock: threading.Lock):
+    """Mark a connection's cursors as closed."""
+    with lock:
+        cursors = list(cursors)
+    for cursor in cursors:
+        cursor._closed = True  # pylint: disable=protected-access
+
+
+def _close_thread_cursor(cursor: Cursor):
+    """
+    Close a thread's cursor when the thread exits or the connection is
+    closed, ignoring errors so that they can't stop the rest of the
+    connection being closed (or end up printed from a finalizer).
+
+    """
+    try:
+        cursor.close()
+    except (Error, *DUCKDB_ERRORS):
+        pass
+
+
+class _ThreadOwner:
+    """
+    Only referenced from a thread's local storage, so that it's freed (and
+    its finalizers run) when the thread exits.
+
+    """
+
+    __slots__ = ("__weakref__",)
+
+
 # pylint: disable=too-many-ancestors
 class Connection(
     pep249.CursorExecuteMixin, pep249.ConcreteErrorMixin, pep249.Connection
@@ -35,33 +99,239 @@ class Connection(
     is only valid if passed a database string, and will raise an error
     otherwise.
 
+    Connections to the same database file (with the same read_only flag)
+    share one DuckDB database instance, which is closed when the last of
+    them is closed. In-memory databases are never shared.
+
+    If `statement_cache_size` is positive, the connection keeps an LRU
+    cache of up to that many parsed statements, shared by its cursors and
+    cleared after DDL.
+
+    Statements can be traced and timed with `set_trace_callback` and
+    `set_profile_callback`. When neither is set, they cost nothing
+    beyond a check per call.
+
+    If `statement_timeout` is set, statements running for longer than
+    that many seconds are interrupted, raising `OperationalError`. It can
+    be overridden per statement, and `interrupt` stops the statements
+    being executed by all of the connection's cursors. DuckDB releases
+    which can't interrupt statements raise `NotSupportedError` when a
+    timeout is set.
+
+    If `cursor_cache_size` is positive, `execute`, `executemany`,
+    `callproc` and `insert_many` reuse the DuckDB cursors of finished
+    cursors (those which have been closed or garbage collected), keeping
+    up to that many of them, unless a statement may have left state
+    behind on them, such as an open transaction, a changed setting or a
+    temporary table. By default, each call creates a new DuckDB cursor.
+
+    If a `ResultCache` is given as `result_cache`, `execute` returns the
+    results of repeated read-only queries from it, as a `CachedCursor`
+    (which can only be fetched from), until a write through any
+    connection with the same cache invalidates them. See
+    `pyduckdb.core.result_cache`.
+
+    `execute_parallel` runs a statement with many parameter sets at once,
+    on a pool of cursors and threads.
+
+    If `thread_safe` is set, the connection can be shared between
+    threads: `execute`, `executemany`, `insert_many`, `commit` and
+    `rollback` use a cursor of the calling thread's own, created on first
+    use, so each thread has its own transaction (and its own current
+    result). These cursors are closed, rolling back any transaction left
+    open, when their threads exit. Cursors from `cursor()` still belong
+    to one thread at a time.
+
+    New cursors take their `row_factory` from the connection's, as with
+    `sqlite3`. Set it to `pyduckdb.Row` to fetch rows which can also be
+    indexed by column name.
+
     """
 
     def __init__(
         self,
-        database: Union[DuckDBPyConnection, str],
+        database: Union["DuckDBPyConnection", str],
         *,
-        read_only: Optional[bool] = None
+        read_only: Optional[bool] = None,
+        statement_cache_size: int = 0,
+        statement_timeout: Optional[float] = None,
+        thread_safe: bool = False,
+        cursor_cache_size: int = 0,
+        result_cache: Optional[ResultCache] = None,
     ):
-        if isinstance(database, DuckDBPyConnection):
+        if is_duckdb_connection(database):
             if read_only is not None:
                 raise InterfaceError(
                     "`read_only` flag can only be set for database strings."
                 )
             self._connection = database
+            self._release = None
         else:
-            self._connection = duckdb.connect(database, bool(read_only))
+            key = database_key(database, bool(read_only))
+            if key is None:
+                # DuckDB is only imported once it's needed, to keep
+                # `import pyduckdb` fast.
+                import duckdb  # pylint: disable=import-outside-toplevel
+
+                self._connection = duckdb.connect(database, bool(read_only))
+                self._release = None
+            else:
+                self._connection = acquire_database(key)
+                self._release = weakref.finalize(self, release_database, key)
+        if statement_timeout is not None:
+            check_interruptible(self._connection)
+        self._statement_cache = None
+        if statement_cache_size > 0:
+            if not hasattr(self._connection, "extract_statements"):
+                raise NotSupportedError(
+                    "This version of DuckDB can't cache parsed statements."
+                )
+            self._statement_cache = StatementCache(statement_cache_size)
+        self._cursor_cache = None
+        if cursor_cache_size > 0:
+            self._cursor_cache = CursorCache(cursor_cache_size)
+        self._result_cache = result_cache
+        # Cursors check a flag of their own rather than the connection's,
+        # so closing (or collecting) the connection pushes it down. The
+        # lock guards creating cursors, and copying the set.
+        self._cursors: "weakref.WeakSet[Cursor]" = weakref.WeakSet()
+        self._cursor_lock = threading.Lock()
+        self._close_cursors = weakref.finalize(
+            self, _close_cursors, self._cursors, self._cursor_lock
+        )
+        # Each thread's cursor, in thread-safe mode.
+        self._thread_cursors: Optional[threading.local] = None
+        if thread_safe:
+            self._thread_cursors = threading.local()
+        self._trace_callback: Optional[TraceCallback] = None
+        self._profile_callback: Optional[ProfileCallback] = None
+        self.row_factory: Optional[RowFactory] = None
+        self._statement_timeout = statement_timeout
         self._closed = False
+        if METRICS.enabled:
+            METRICS.track_connection(self)
 
-    @raise_if_closed
-    @convert_runtime_errors
+    @property
+    def statement_cache_stats(self) -> Optional[StatementCacheStats]:
+        """
+        Hit, miss, eviction and invalidation counts for the statement
+        cache, or None if the cache is disabled.
+
+        """
+        if self._statement_cache is None:
+            return None
+        return self._statement_cache.stats()
+
+    @property
+    def cursor_cache_stats(self) -> Optional[CursorCacheStats]:
+        """
+        Cursor cache counters, or None if the cache is disabled. Hits are
+        DuckDB cursors reused by `execute` and friends, and misses are new
+        ones they had to create.
+
+        """
+        if self._cursor_cache is None:
+            return None
+        return self._cursor_cache.stats()
+
+    @property
+    def result_cache_stats(self) -> Optional[ResultCacheStats]:
+        """Result cache counters, or None if there's no result cache."""
+        if self._result_cache is None:
+            return None
+        return self._result_cache.stats()
+
+    @property
+    def thread_safe(self) -> bool:
+        """Whether the connection can be shared between threads."""
+        return self._thread_cursors is not None
+
+    def _open_cursors(self) -> List[Cursor]:
+        """A snapshot of the connection's cursors."""
+        with self._cursor_lock:
+            return list(self._cursors)
+
+    def _thread_cursor(self) -> Cursor:
+        """The calling thread's cursor, in thread-safe mode."""
+        thread_cursors = self._thread_cursors
+        cursor = getattr(thread_cursors, "cursor", None)
+        if cursor is None or cursor._closed:  # pylint: disable=protected-access
+            cursor = self.cursor()
+            thread_cursors.cursor = cursor
+            thread_cursors.owner = _ThreadOwner()
+            weakref.finalize(thread_cursors.owner, _close_thread_cursor, cursor)
+        return cursor
+
+    @property
+    def statement_timeout(self) -> Optional[float]:
+        """
+        The default timeout for statements, in seconds, or None for no
+        timeout. Setting it applies to existing cursors as well as new ones,
+        and raises `NotSupportedError` if this DuckDB release can't
+        interrupt statements.
+
+        """
+        return self._statement_timeout
+
+    @statement_timeout.setter
+    def statement_timeout(self, timeout: Optional[float]):
+        if timeout is not None:
+            check_interruptible(self._connection)
+        self._statement_timeout = timeout
+        for cursor in self._open_cursors():
+            cursor.statement_timeout = timeout
+
+    def interrupt(self) -> None:
+        """
+        Interrupt the statements being executed by this connection's
+        cursors, from another thread. Each raises `OperationalError`.
+
+        """
+        for cursor in self._open_cursors():
+            cursor.interrupt()
+
+    def set_trace_callback(self, callback: Optional[TraceCallback]) -> None:
+        """
+        Set a function to be called with the SQL text of each statement
+        run by this connection's cursors, before it runs, or remove it
+        by passing None. Errors it raises are logged, not raised.
+
+        """
+        self._trace_callback = callback
+        for cursor in self._open_cursors():
+            cursor._trace_callback = callback  # pylint: disable=protected-access
+
+    def set_profile_callback(self, callback: Optional[ProfileCallback]) -> None:
+        """
+        Set a function to be called with a `QueryProfile` for each
+        statement run by this connection's cursors, or remove it by
+        passing None. It's called once the statement's results have been
+        consumed, or when its cursor runs another statement or is closed
+        or garbage collected. Errors it raises are logged, not raised.
+
+        A `SlowQueryLogger` can be used as the callback to log slow
+        statements.
+
+        """
+        self._profile_callback = callback
+        for cursor in self._open_cursors():
+            cursor._profile_callback = callback  # pylint: disable=protected-access
+
+    @raise_if_closed_and_convert
     def commit(self) -> None:
+        if self._thread_cursors is not None:
+            self._thread_cursor().commit()
+            return
         self._connection.commit()
 
-    @raise_if_closed
+    # Transaction errors are ignored before they're converted, so that
+    # they aren't counted in the error metrics.
+    @raise_if_closed_and_convert
     @ignore_transaction_error
-    @convert_runtime_errors
     def rollback(self) -> None:
+        if self._thread_cursors is not None:
+            self._thread_cursor().rollback()
+            return
         self._connection.rollback()
 
     @convert_runtime_errors
@@ -71,33 +341,256 @@ class Connection(
             return
 
         try:
-            # Rolling back unstaged commits.
-            self.rollback()
-            # Close the underlying DuckDB connection.
-            self._connection.close()
+            try:
+                # Rolling back unstaged commits. Other threads' transactions
+                # are aborted by closing the DuckDB connection.
+                if self._thread_cursors is None:
+                    self.rollback()
+                else:
+                    cursor = getattr(self._thread_cursors, "cursor", None)
+                    if cursor is not None:
+                        _close_thread_cursor(cursor)
+            finally:
+                if self._cursor_cache is not None:
+                    self._cursor_cache.close()
+                # Close the underlying DuckDB connection.
+                self._connection.close()
         except ImportError:  # Underlying connection garbage collected.
             pass
-        self._closed = True
+        finally:
+            if self._release is not None:
+                # Release our reference to the shared database instance.
+                self._release()
+            self._closed = True
+            self._close_cursors()
 
-    @raise_if_closed
-    @convert_runtime_errors
+    @raise_if_closed_and_convert
     def cursor(self) -> Cursor:
-        return Cursor(self, self._connection.cursor())
+        with self._cursor_lock:
+            return Cursor(self, self._connection.cursor())
+
+    def _reused_cursor(self) -> Cursor:
+        """
+        A cursor for a statement about to be executed, reusing a free
+        DuckDB cursor if there is one. A reused DuckDB cursor may still
+        hold its last result until the statement runs, so these are only
+        for `execute` and friends, never for `cursor()`.
+
+        """
+        cursor_cache = self._cursor_cache
+        if cursor_cache is None or self._closed:
+            return self.cursor()
+        free = cursor_cache.take()
+        if free is None:
+            return self.cursor()
+        with self._cursor_lock:
+            return Cursor(self, free)
 
     def callproc(
         self, procname: ProcName, parameters: Optional[ProcArgs] = None
     ) -> Optional[ProcArgs]:
-        return self.cursor().callproc(procname, parameters)
+        return self._reused_cursor().callproc(procname, parameters)
 
     def execute(
-        self, operation: SQLQuery, parameters: Optional[QueryParameters] = None
+        self,
+        operation: SQLQuery,
+        parameters: Optional[QueryParameters] = None,
+        *,
+        timeout: Optional[float] = None,
     ) -> Cursor:
-        return self.cursor().execute(operation, parameters)
+        if self._thread_cursors is not None:
+            cursor = self._thread_cursor()
+        elif self._result_cache is not None:
+            # Only taken on a cache miss.
+            cursor = None
+        else:
+            cursor = self._reused_cursor()
+        if self._result_cache is not None:
+            return self._execute_cached(cursor, operation, parameters, timeout)
+        return cursor.execute(operation, parameters, timeout=timeout)
+
+    def _execute_cached(
+        self,
+        cursor: Optional[Cursor],
+        operation: SQLQuery,
+        parameters: Optional[QueryParameters],
+        timeout: Optional[float],
+    ) -> Union[Cursor, CachedCursor]:
+        """
+        Execute a statement on `cursor` (or, if it's None, a reused one),
+        or return its result from the result cache if it's there.
+
+        """
+        lookup = self._look_up_cached(cursor, operation, parameters)
+        if isinstance(lookup, CachedCursor):
+            return lookup
+        if cursor is None:
+            cursor = self._reused_cursor()
+        return self._execute_recorded(cursor, lookup, operation, parameters, timeout)
+
+    def _look_up_cached(
+        self,
+        cursor: Optional[Cursor],
+        operation: SQLQuery,
+        parameters: Optional[QueryParameters],
+    ) -> Union[CachedCursor, ResultRecorder, None]:
+        """
+        Look a statement's result up in the result cache. Returns a cursor
+        over it if it's there, or else a recorder to store it as it's
+        fetched, or None if it can't be cached. Results aren't cached in
+        transactions.
+
+        """
+        # pylint: disable=protected-access
+        cache = self._result_cache
+        # Taken first, so a write while the statement runs stops it being
+        # stored.
+        version = cache.version
+        if cursor is not None and cursor._in_transaction:
+            return None
+        query = analyse_query(operation)
+        if query is None:
+            return None
+        key = (query[0], parameters_key(parameters))
+        if key[1] is None:
+            return None
+        cacheable, tables = cache.dependencies(query[1], self._read_catalog)
+        if not cacheable:
+            return None
+        result = cache.get(key)
+        if result is not None:
+            return CachedCursor(self, result, operation, parameters)
+        return ResultRecorder(cache, key, tables, version)
+
+    # pylint: disable=too-many-arguments
+    def _execute_recorded(
+        self,
+        cursor: Cursor,
+        recorder: Optional[ResultRecorder],
+        operation: SQLQuery,
+        parameters: Optional[QueryParameters],
+        timeout: Optional[float],
+    ) -> Cursor:
+        """Execute a statement, recording its rows with `recorder` if given."""
+        cursor.execute(operation, parameters, timeout=timeout)
+        if recorder is not None:
+            cursor._record_result(recorder)  # pylint: disable=protected-access
+        return cursor
+
+    def _read_catalog(self) -> Dict[str, str]:
+        """Map the database's table and view names to their kinds."""
+        with self._cursor_lock:
+            duckdb_cursor = self._connection.cursor()
+        try:
+            duckdb_cursor.execute("SELECT name, type FROM sqlite_master;")
+            return {name.lower(): kind for name, kind in duckdb_cursor.fetchall()}
+        finally:
+            duckdb_cursor.close()
 
     def executemany(
-        self, operation: SQLQuery, seq_of_parameters: Sequence[QueryParameters]
+        self,
+        operation: SQLQuery,
+        seq_of_parameters: Sequence[QueryParameters],
+        *,
+        timeout: Optional[float] = None,
+    ) -> Cursor:
+        if self._thread_cursors is not None:
+            cursor = self._thread_cursor()
+        else:
+            cursor = self._reused_cursor()
+        return cursor.executemany(operation, seq_of_parameters, timeout=timeout)
+
+    def insert_many(
+        self, table: str, rows: Any, batch_size: int = DEFAULT_BATCH_SIZE
     ) -> Cursor:
-        return self.cursor().executemany(operation, seq_of_parameters)
+        """Insert rows into a table in columnar batches. See `Cursor.insert_many`."""
+        if self._thread_cursors is not None:
+            cursor = self._thread_cursor()
+        else:
+            cursor = self._reused_cursor()
+        return cursor.insert_many(table, rows, batch_size)
+
+    @raise_if_closed
+    def execute_parallel(
+        self,
+        operation: SQLQuery,
+        seq_of_parameters: Iterable[Optional[QueryParameters]],
+        *,
+        max_workers: Optional[int] = None,
+        ordered: bool = True,
+        timeout: Optional[float] = None,
+    ) -> ParallelExecution:
+        """
+        Execute a statement with each of a sequence of parameter sets at
+        once, on up to `max_workers` threads (by default, one per CPU)
+        each with a cursor of its own, returning an iterator over the
+        `ParallelResult`s: the index and parameters of each set, and all
+        of the rows its statement returned.
+
+        Results are yielded in the order of the parameter sets, or as
+        the statements complete if `ordered` is False, and statements are
+        only submitted a few at a time ahead of the results being read.
+        Statements run in autocommit mode, and don't see the writes of a
+        transaction open on this connection. `timeout` applies to each
+        statement.
+
+        If a statement raises, the others are interrupted or dropped and
+        its error is raised from the iterator. Closing the iterator early
+        stops the remaining statements.
+
+        """
+        return ParallelExecution(
+            self, operation, seq_of_parameters, max_workers, ordered, timeout
+        )
+
+    # pylint: disable=too-many-arguments
+    def copy_from(
+        self,
+        table: str,
+        source: Any,
+        *,
+        format: Optional[str] = None,  # pylint: disable=redefined-builtin
+        chunk_size: int = DEFAULT_BATCH_SIZE,
+        header: bool = False,
+        delimiter: str = ",",
+    ) -> CopyResult:
+        """
+        Load rows into a table in a single transaction, returning the
+        number of rows loaded and the time taken.
+
+        The source can be an iterable of rows (including generators), a
+        file object, or a path to a CSV or Parquet file. Paths are read by
+        DuckDB directly, while iterables and file objects are inserted in
+        chunks of `chunk_size` rows. The format ("csv" or "parquet") is
+        inferred from a path's extension if not given, and file objects
+        are read as CSV by default.
+
+        If loading fails, the transaction is rolled back.
+
+        """
+        started_at = perf_counter()
+        cursor = self.cursor()
+        try:
+            cursor.execute("BEGIN TRANSACTION;")
+            try:
+                rows = convert_runtime_errors(copy_into)(
+                    cursor._cursor,  # pylint: disable=protected-access
+                    table,
+                    source,
+                    file_format=format,
+                    chunk_size=chunk_size,
+                    header=header,
+                    delimiter=delimiter,
+                )
+            except BaseException:
+                cursor.rollback()
+                raise
+            if self._result_cache is not None:
+                cursor._track_insert(table)  # pylint: disable=protected-access
+            cursor.commit()
+        finally:
+            cursor.close()
+        return CopyResult(rows, perf_counter() - started_at)
 
     def executescript(self, script: SQLQuery) -> Cursor:
         """A lazy implementation of SQLite's `executescript`."""
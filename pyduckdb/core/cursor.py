@@ -3,9 +3,26 @@ Cursor object for DuckDB which fits the DB API spec.
 
 """
 # pylint: disable=c-extension-no-member
+import os
+import threading
 import weakref
-from typing import Optional, Sequence, Type, Union, TYPE_CHECKING
-from duckdb import DuckDBPyConnection  # pylint: disable=no-name-in-module
+from collections import deque
+from functools import partial
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Deque,
+    Iterator,
+    Optional,
+    Sequence,
+    FrozenSet,
+    Tuple,
+    Type,
+    Union,
+    TYPE_CHECKING,
+)
 import pep249
 from pep249 import (
     SQLQuery,
@@ -16,17 +33,164 @@ from pep249 import (
     ResultRow,
     ResultSet,
 )
+from .adapters import (
+    ADAPTERS,
+    CONVERTERS,
+    adapt_parameters,
+    adapt_rows,
+    convert_numpy_columns,
+    rows_converter,
+)
+from .bulk import DEFAULT_BATCH_SIZE, insert_columnar, parse_plain_insert
+from .cursor_cache import is_reusable
+from .export import (
+    ProgressCallback,
+    can_copy_result,
+    copy_result,
+    resolve_export_format,
+    write_csv,
+    write_ndjson,
+    write_parquet,
+)
+from .explain import QueryPlan, explain_query, profile_query
 from .exceptions import (
+    DUCKDB_ERRORS,
     NotSupportedError,
+    OperationalError,
+    ProgrammingError,
     convert_runtime_errors,
+    _parse_runtime_error,
+)
+from .ingest import CopyResult
+from .lazy_rows import DEFAULT_CHUNK_SIZE, DEFAULT_MEMORY_BUDGET, LazyRows
+from .metrics import REGISTRY as METRICS
+from .result_cache import (
+    BEGIN_STATEMENTS,
+    COMMIT_STATEMENTS,
+    ROLLBACK_STATEMENTS,
+    ResultCache,
+    ResultRecorder,
+    table_names,
+    written_tables,
+)
+from .rows import BatchConverter, RowFactory, batch_converter
+from .statement_cache import statement_kind
+from .timeouts import WATCHDOG, Deadline
+from .tracing import QueryTimer, call_hook, report_profile
+from .utils import (
+    check_interruptible,
+    raise_if_closed,
+    raise_if_closed_and_convert,
+    ignore_transaction_error,
 )
-from .utils import raise_if_closed, ignore_transaction_error
 
 if TYPE_CHECKING:
+    from duckdb import DuckDBPyConnection  # pylint: disable=no-name-in-module
+
     # pylint: disable=cyclic-import
     from pyduckdb.core.connection import Connection
+    import numpy
+    import pandas
+    import pyarrow
+
+__all__ = ["Cursor", "RawCursor"]
+
+MIN_ITERATION_BLOCK_SIZE = 1024
+# DuckDB can miss an interrupt made while a statement is starting, so a
+# statement past its deadline is interrupted again this often (in
+# seconds) until it stops.
+INTERRUPT_RETRY_INTERVAL = 0.1
+DEFAULT_ROWS_PER_BATCH = 1_000_000
+
+
+def _unconverted(rows: ResultSet) -> ResultSet:
+    """The row conversion for results without a row factory or converters."""
+    return rows
+
+
+def _timeout_error(timeout: float) -> OperationalError:
+    """The error raised by a statement interrupted by its timeout."""
+    if METRICS.enabled:
+        METRICS.record_error(OperationalError.__name__)
+    return OperationalError(f"Statement timed out after {timeout:g} seconds.")
+
+
+def _column_length(columns: Dict[str, "numpy.ndarray"]) -> int:
+    """The number of rows in a dict of columns."""
+    return len(next(iter(columns.values()), ()))
+
+
+def _iter_record_batches(
+    reader: "pyarrow.RecordBatchReader",
+) -> Iterator["pyarrow.RecordBatch"]:
+    """Iterate over a record batch reader, raising correct errors."""
+    read_next_batch = convert_runtime_errors(reader.read_next_batch)
+    while True:
+        try:
+            batch = read_next_batch()
+        except StopIteration:
+            return
+        yield batch
+
+
+class RawCursor:
+    """
+    A minimal view of a cursor for trusted hot paths, from `Cursor.raw`.
+
+    Calls go almost straight to DuckDB, with DuckDB's errors converted
+    to the usual exception types. The view doesn't check whether the
+    cursor or its connection is closed, and statements run through it
+    don't use (or invalidate) the statement cache.
+
+    """
+
+    __slots__ = ("_cursor", "arraysize")
+
+    def __init__(self, duckdb_cursor: "DuckDBPyConnection", arraysize: int):
+        self._cursor = duckdb_cursor
+        self.arraysize = arraysize
+
+    @property
+    def description(self) -> Optional[Sequence[ColumnDescription]]:
+        """The description of the current result."""
+        try:
+            return self._cursor.description
+        except DUCKDB_ERRORS:
+            return None
 
-__all__ = ["Cursor"]
+    def execute(
+        self, operation: SQLQuery, parameters: Optional[QueryParameters] = None
+    ) -> "RawCursor":
+        """Execute an operation, without caching its parsed statement."""
+        try:
+            if parameters is None:
+                self._cursor.execute(operation)
+            else:
+                self._cursor.execute(operation, parameters)
+        except DUCKDB_ERRORS as err:
+            raise _parse_runtime_error(err) from err
+        return self
+
+    def fetchone(self) -> Optional[ResultRow]:
+        """Fetch the next row of the result."""
+        try:
+            return self._cursor.fetchone()
+        except DUCKDB_ERRORS as err:
+            raise _parse_runtime_error(err) from err
+
+    def fetchmany(self, size: Optional[int] = None) -> ResultSet:
+        """Fetch the next `size` rows of the result."""
+        try:
+            return self._cursor.fetchmany(self.arraysize if size is None else size)
+        except DUCKDB_ERRORS as err:
+            raise _parse_runtime_error(err) from err
+
+    def fetchall(self) -> ResultSet:
+        """Fetch the remaining rows of the result."""
+        try:
+            return self._cursor.fetchall()
+        except DUCKDB_ERRORS as err:
+            raise _parse_runtime_error(err) from err
 
 
 # pylint: disable=too-many-ancestors
@@ -40,25 +204,93 @@ class Cursor(
     Can be constructed by passing a Connection and a DuckDB 'cursor'
     (DuckDBPyConnection).
 
+    Iterating over the cursor fetches rows in blocks of `arraysize` rows
+    (or `MIN_ITERATION_BLOCK_SIZE`, whichever is larger), and hands them
+    out from a local buffer. The `fetch*` methods consume the buffer
+    first, so iteration can be freely mixed with explicit fetches.
+
+    The columnar `fetchnumpy`, `fetchdf`, `fetch_arrow_table` and
+    `fetch_record_batches` methods use DuckDB's native export, and
+    require NumPy, pandas or PyArrow respectively.
+
+    `fetch_sequence` (or `fetchall(lazy=True)`) returns the rest of a
+    large result as a sequence which is fetched as it's read, and spills
+    to disk past a memory budget.
+
+    For hot loops where the cursor is known to be open, `raw` gives a
+    lighter view with the same exception types.
+
+    If `row_factory` is set (by default, to the connection's), rows are
+    converted by it as they're fetched, a block at a time, after any
+    converters registered for their columns' types (see
+    `pyduckdb.register_converter`). Parameters are adapted by the
+    registered adapters. The `raw` views skip all of these, and only
+    batch converters apply to `fetchnumpy`.
+
+    Statements are traced and profiled through the hooks set on the
+    connection (see `Connection.set_trace_callback` and
+    `Connection.set_profile_callback`).
+
+    A statement being executed can be stopped from another thread with
+    `interrupt`, or after a timeout (by default, the connection's
+    `statement_timeout`). Either way, it raises `OperationalError`, and
+    the cursor can be used again (after a rollback, in a transaction).
+
     """
 
-    def __init__(self, connection: "Connection", duckdb_cursor: DuckDBPyConnection):
+    def __init__(
+        self,
+        connection: "Connection",
+        duckdb_cursor: "DuckDBPyConnection",
+    ):
         self._connection = weakref.proxy(connection)
         self._cursor = duckdb_cursor
-        self.__closed = False
-
-    @property
-    def _closed(self) -> bool:
+        # Set by the connection when it's closed or garbage collected.
+        self._closed = False
+        connection._cursors.add(self)  # pylint: disable=protected-access
+        self._row_buffer: Deque[ResultRow] = deque()
+        # Counts the statements run, so lazy sequences of rows can tell
+        # when their result has been replaced.
+        self._result_number = 0
+        # The last query and its parameters, until its results are fetched.
+        self._pending_query: Optional[Tuple[SQLQuery, Optional[QueryParameters]]] = None
         # pylint: disable=protected-access
-        try:
-            return self.__closed or self.connection._closed
-        except ReferenceError:
-            # Parent connection already GC'd.
-            return True
-
-    @_closed.setter
-    def _closed(self, value: bool):
-        self.__closed = value
+        self._statements = connection._statement_cache
+        # Gives the DuckDB cursor back to the connection's cursor cache
+        # when this cursor is closed or collected, unless it's detached
+        # because a statement may have left state behind on it.
+        self._recycle: Optional[weakref.finalize] = None
+        cursor_cache = connection._cursor_cache
+        if cursor_cache is not None:
+            self._recycle = weakref.finalize(self, cursor_cache.give, duckdb_cursor)
+        # Hooks are pushed down by the connection when they're set.
+        self._trace_callback = connection._trace_callback
+        self._profile_callback = connection._profile_callback
+        # Timings for the current statement, only when profiling, and the
+        # finalizer which reports them to the profile callback, so that
+        # they're reported even if the cursor is dropped unfinished.
+        self._timer: Optional[QueryTimer] = None
+        self._report_profile: Optional[weakref.finalize] = None
+        self._row_factory: Optional[RowFactory] = connection.row_factory
+        # Applies the row factory to the current result, made on first use.
+        self._convert_rows: Optional[BatchConverter] = None
+        self._statement_timeout: Optional[float] = connection.statement_timeout
+        # Whether a statement is executing, and the ID of the current
+        # statement with a timeout, so that interrupts never reach a later
+        # statement than the one they were meant for.
+        self._interrupt_lock = threading.Lock()
+        self._executing = False
+        self._statement_id = 0
+        self._timed_out = False
+        # The connection's result cache, and this cursor's transaction
+        # state: the tables written in the current transaction (None for
+        # "any of them") are only invalidated when it commits.
+        self._result_cache: Optional[ResultCache] = connection._result_cache
+        self._in_transaction = False
+        self._pending_writes: Optional[FrozenSet[str]] = frozenset()
+        # Records the current result's rows as they're fetched, when it
+        # missed the result cache, until it's stored.
+        self._recorder: Optional[ResultRecorder] = None
 
     @property
     def connection(self) -> "Connection":
@@ -68,7 +300,7 @@ class Cursor(
     def description(self) -> Optional[Sequence[ColumnDescription]]:
         try:
             return self._cursor.description
-        except RuntimeError:
+        except DUCKDB_ERRORS:
             return None
 
     @property
@@ -76,15 +308,33 @@ class Cursor(
         # DuckDB doesn't implement this functionality.
         return -1
 
-    @raise_if_closed
-    @convert_runtime_errors
+    @property
+    def row_factory(self) -> Optional[RowFactory]:
+        """
+        The function rows are converted with, or None to fetch tuples.
+        See `pyduckdb.Row`.
+
+        """
+        return self._row_factory
+
+    @row_factory.setter
+    def row_factory(self, factory: Optional[RowFactory]):
+        self._row_factory = factory
+        self._convert_rows = None
+
+    @raise_if_closed_and_convert
     def commit(self) -> None:
         self._cursor.commit()
+        if self._result_cache is not None:
+            self._commit_writes()
 
-    @raise_if_closed
+    # Transaction errors are ignored before they're converted, so that
+    # they aren't counted in the error metrics.
+    @raise_if_closed_and_convert
     @ignore_transaction_error
-    @convert_runtime_errors
     def rollback(self) -> None:
+        if self._result_cache is not None:
+            self._discard_writes()
         self._cursor.rollback()
 
     @convert_runtime_errors
@@ -93,14 +343,29 @@ class Cursor(
         if self._closed:
             return
 
-        try:
-            # Rolling back unstaged commits.
-            self.rollback()
-            # Close the underlying DuckDB connection.
-            self._cursor.close()
-        except ImportError:  # Underlying connection garbage collected.
-            pass
+        recycle = self._recycle
+        if recycle is None:
+            try:
+                # Rolling back unstaged commits.
+                self.rollback()
+                # Close the underlying DuckDB connection.
+                self._cursor.close()
+            except ImportError:  # Underlying connection garbage collected.
+                pass
+        self._row_buffer.clear()
+        self._pending_query = None
+        self._recorder = None
+        self._finish_query()
         self._closed = True
+        if recycle is not None:
+            # No transaction can be open, so there's nothing to roll back.
+            self._recycle = None
+            recycle()
+
+    def _keep_duckdb_cursor(self):
+        """Stop the DuckDB cursor from being given back to the cursor cache."""
+        self._recycle.detach()
+        self._recycle = None
 
     def callproc(
         self, procname: ProcName, parameters: Optional[ProcArgs] = None
@@ -120,42 +385,677 @@ class Cursor(
     def setoutputsize(self, size: int, column: Optional[int]) -> None:
         pass
 
-    @raise_if_closed
-    @convert_runtime_errors
+    @raise_if_closed_and_convert
     def execute(
-        self, operation: SQLQuery, parameters: Optional[QueryParameters] = None
+        self,
+        operation: SQLQuery,
+        parameters: Optional[QueryParameters] = None,
+        *,
+        timeout: Optional[float] = None,
     ) -> "Cursor":
-        if parameters is None:
-            self._cursor.execute(operation)
-        else:
-            self._cursor.execute(operation, parameters)
+        """
+        Execute an operation. If it runs for longer than `timeout` seconds
+        (by default, the connection's `statement_timeout`), it's
+        interrupted and raises `OperationalError`.
+
+        """
+        self._row_buffer.clear()
+        self._pending_query = None
+        self._recorder = None
+        self._convert_rows = None
+        self._result_number += 1
+        if self._timer is not None:
+            self._finish_query()
+        if self._recycle is not None and not is_reusable(operation):
+            self._keep_duckdb_cursor()
+        if self._trace_callback is not None:
+            call_hook(self._trace_callback, operation)
+        timer = None
+        if self._profile_callback is not None or METRICS.enabled:
+            timer = QueryTimer(operation, parameters)
+        if ADAPTERS and parameters is not None:
+            parameters = adapt_parameters(parameters)
+        if timeout is None:
+            timeout = self._statement_timeout
+        deadline = self._set_deadline(timeout) if timeout else None
+
+        self._executing = True
+        try:
+            if self._statements is not None:
+                self._statements.execute(self._cursor, operation, parameters)
+            elif parameters is None:
+                self._cursor.execute(operation)
+            else:
+                self._cursor.execute(operation, parameters)
+        except DUCKDB_ERRORS as err:
+            if self._timed_out:
+                raise _timeout_error(timeout) from err
+            raise
+        finally:
+            self._finish_executing(deadline)
+
+        if self._result_cache is not None:
+            self._track_writes(operation)
+        if timer is not None:
+            timer.executed()
+            self._start_profile(timer)
+            if METRICS.enabled:
+                METRICS.record_query(timer.execute_time)
+        self._pending_query = (operation, parameters)
         return self
 
+    def _track_writes(self, operation: SQLQuery):
+        """Invalidate the cached results a statement may have changed."""
+        tables = written_tables(operation)
+        if tables is None:
+            # A script could also have started a transaction, so its
+            # commit invalidates everything again.
+            self._result_cache.invalidate(None)
+            self._pending_writes = None
+        elif tables:
+            self._record_writes(tables)
+        else:
+            kind = statement_kind(operation)
+            if kind in BEGIN_STATEMENTS:
+                self._in_transaction = True
+            elif kind in COMMIT_STATEMENTS:
+                self._commit_writes()
+            elif kind in ROLLBACK_STATEMENTS:
+                self._discard_writes()
+
+    def _track_insert(self, table: str):
+        """Invalidate the cached results from a table inserted into."""
+        tables = table_names(table)
+        if tables is None:
+            self._result_cache.invalidate(None)
+        else:
+            self._record_writes(tables)
+
+    def _record_writes(self, tables: FrozenSet[str]):
+        """Invalidate results from `tables`, or do so on commit."""
+        if not self._in_transaction:
+            self._result_cache.invalidate(tables)
+        elif self._pending_writes is not None:
+            self._pending_writes |= tables
+
+    def _commit_writes(self):
+        """Invalidate the results from the tables the transaction wrote."""
+        self._in_transaction = False
+        pending, self._pending_writes = self._pending_writes, frozenset()
+        if pending is None or pending:
+            self._result_cache.invalidate(pending)
+
+    def _discard_writes(self):
+        """Forget the tables the transaction wrote, as it's rolled back."""
+        self._in_transaction = False
+        self._pending_writes = frozenset()
+
+    def _record_result(self, recorder: ResultRecorder):
+        """
+        Record the current result's rows as they're fetched, to store it
+        in the result cache once they all have been.
+
+        """
+        recorder.description = self.description
+        self._recorder = recorder
+
     def executescript(self, script: SQLQuery) -> "Cursor":
         """A lazy implementation of SQLite's `executescript`."""
         return self.execute(script)
 
-    @raise_if_closed
-    @convert_runtime_errors
+    @property
+    def statement_timeout(self) -> Optional[float]:
+        """
+        The default timeout for statements, in seconds, or None for no
+        timeout. Taken from the connection when the cursor is created.
+        Setting it raises `NotSupportedError` if this DuckDB release
+        can't interrupt statements.
+
+        """
+        return self._statement_timeout
+
+    @statement_timeout.setter
+    def statement_timeout(self, timeout: Optional[float]):
+        if timeout is not None:
+            check_interruptible(self._cursor)
+        self._statement_timeout = timeout
+
+    def interrupt(self) -> None:
+        """
+        Interrupt the statement this cursor is executing, from another
+        thread, making it raise `OperationalError`. This does nothing if
+        no statement is executing.
+
+        """
+        check_interruptible(self._cursor)
+        with self._interrupt_lock:
+            if self._executing:
+                self._cursor.interrupt()
+
+    def _set_deadline(self, timeout: float) -> Deadline:
+        """Interrupt the statement about to run if it takes too long."""
+        check_interruptible(self._cursor)
+        return WATCHDOG.call_later(timeout, partial(self._time_out, self._statement_id))
+
+    def _time_out(self, statement_id: int):
+        """Interrupt a statement which has passed its deadline."""
+        with self._interrupt_lock:
+            if self._executing and self._statement_id == statement_id:
+                self._timed_out = True
+                self._cursor.interrupt()
+                WATCHDOG.call_later(
+                    INTERRUPT_RETRY_INTERVAL, partial(self._time_out, statement_id)
+                )
+
+    def _finish_executing(self, deadline: Optional[Deadline]):
+        """Mark the current statement as finished, cancelling its deadline."""
+        with self._interrupt_lock:
+            self._executing = False
+            if deadline is not None:
+                deadline.cancel()
+                self._statement_id += 1
+                self._timed_out = False
+
+    @raise_if_closed_and_convert
     def executemany(
-        self, operation: SQLQuery, seq_of_parameters: Sequence[QueryParameters]
+        self,
+        operation: SQLQuery,
+        seq_of_parameters: Sequence[QueryParameters],
+        *,
+        timeout: Optional[float] = None,
     ) -> "Cursor":
-        self._cursor.executemany(operation, seq_of_parameters)
+        """
+        Execute an operation once for each set of parameters, within
+        `timeout` seconds in all (as for `execute`).
+
+        Plain `INSERT INTO table [(columns)] VALUES (?, ...)` statements
+        are run as columnar bulk inserts instead. For these, the
+        parameters can also be a dict of columns or a NumPy array. The
+        rows are inserted in batches of `DEFAULT_BATCH_SIZE`, each in a
+        statement of its own, so outside a transaction a failure can
+        leave earlier batches inserted.
+
+        """
+        self._row_buffer.clear()
+        self._pending_query = None
+        self._recorder = None
+        self._convert_rows = None
+        self._result_number += 1
+        self._finish_query()
+        if self._recycle is not None and not is_reusable(operation):
+            self._keep_duckdb_cursor()
+        if self._trace_callback is not None:
+            call_hook(self._trace_callback, operation)
+        timer = None
+        if self._profile_callback is not None or METRICS.enabled:
+            timer = QueryTimer(operation, seq_of_parameters)
+
+        if timeout is None:
+            timeout = self._statement_timeout
+        deadline = self._set_deadline(timeout) if timeout else None
+
+        self._executing = True
+        try:
+            plain_insert = parse_plain_insert(operation)
+            if plain_insert is not None:
+                insert_columnar(
+                    self._cursor,
+                    plain_insert.table,
+                    seq_of_parameters,
+                    columns=plain_insert.columns,
+                    width=plain_insert.width,
+                )
+            else:
+                if ADAPTERS:
+                    seq_of_parameters = adapt_rows(seq_of_parameters)
+                if self._statements is not None:
+                    self._statements.executemany(
+                        self._cursor, operation, seq_of_parameters
+                    )
+                else:
+                    self._cursor.executemany(operation, seq_of_parameters)
+        except DUCKDB_ERRORS as err:
+            if self._timed_out:
+                raise _timeout_error(timeout) from err
+            raise
+        finally:
+            self._finish_executing(deadline)
+
+        if self._result_cache is not None:
+            self._track_writes(operation)
+        if timer is not None:
+            timer.executed()
+            self._start_profile(timer)
+            if METRICS.enabled:
+                METRICS.record_query(timer.execute_time)
+            self._finish_query()
         return self
 
-    @raise_if_closed
-    @convert_runtime_errors
+    @raise_if_closed_and_convert
+    def insert_many(
+        self, table: str, rows: Any, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> "Cursor":
+        """
+        Insert rows into a table in columnar batches of `batch_size` rows.
+
+        The rows can be an iterable of row sequences, a dict of columns, or
+        a 2D, 1D (a single column) or structured NumPy array. Column names
+        from a dict or a structured array are used to match the table's
+        columns. The table name is used as given, so it must be quoted if
+        needed. As with `executemany`, outside a transaction a failure can
+        leave earlier batches inserted.
+
+        """
+        self._row_buffer.clear()
+        self._pending_query = None
+        self._recorder = None
+        self._convert_rows = None
+        self._result_number += 1
+        self._finish_query()
+        insert_columnar(self._cursor, table, rows, batch_size=batch_size)
+        if self._result_cache is not None:
+            self._track_insert(table)
+        return self
+
+    @raise_if_closed_and_convert
     def fetchone(self) -> Optional[ResultRow]:
-        return self._cursor.fetchone()
+        if self._row_buffer:
+            return self._row_buffer.popleft()
+        self._pending_query = None
+        if self._timer is None:
+            row = self._cursor.fetchone()
+        else:
+            started_at = perf_counter()
+            row = self._cursor.fetchone()
+            self._record_fetch(started_at, 0 if row is None else 1, row is None)
+        if self._recorder is not None:
+            self._record_rows([] if row is None else [row], row is None)
+        if row is None or (self._row_factory is None and not CONVERTERS):
+            return row
+        return self._converted((row,))[0]
 
-    @raise_if_closed
-    @convert_runtime_errors
+    @raise_if_closed_and_convert
     def fetchmany(self, size: Optional[int] = None) -> ResultSet:
         if size is None:
             size = self.arraysize
-        return self._cursor.fetchmany(size)
+        self._pending_query = None
+        buffer = self._row_buffer
+        if not buffer:
+            return self._fetch_rows(size)
+
+        rows = [buffer.popleft() for _ in range(min(size, len(buffer)))]
+        if len(rows) < size:
+            rows.extend(self._fetch_rows(size - len(rows)))
+        return rows
+
+    @raise_if_closed_and_convert
+    def fetchall(self, lazy: bool = False) -> ResultSet:
+        """
+        Fetch the remaining rows of the result. If `lazy` is set, return
+        them as a `LazyRows` sequence, fetched as they're needed, instead
+        of a list (see `fetch_sequence`).
+
+        """
+        if lazy:
+            return self.fetch_sequence()
+        self._pending_query = None
+        buffer = self._row_buffer
+        if not buffer:
+            return self._fetch_rows()
+
+        rows = list(buffer)
+        buffer.clear()
+        rows.extend(self._fetch_rows())
+        return rows
+
+    @raise_if_closed_and_convert
+    def fetch_sequence(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    ) -> LazyRows:
+        """
+        Return the remaining rows of the result as a `LazyRows` sequence,
+        which supports `len`, indexing and slicing, but only fetches rows
+        (`chunk_size` at a time) as they're needed. Chunks past about
+        `memory_budget` bytes are spilled to a temporary file.
+
+        The sequence reads from this cursor, so it raises
+        `ProgrammingError` if it needs more rows after another statement
+        has been run here.
+
+        """
+        self._pending_query = None
+        buffer = self._row_buffer
+        first = list(buffer)
+        buffer.clear()
+        result_number = self._result_number
+
+        def fetch() -> ResultSet:
+            if self._result_number != result_number:
+                raise ProgrammingError(
+                    "The cursor has run another statement since its rows were "
+                    "returned lazily."
+                )
+            return self.fetchmany(chunk_size)
+
+        return LazyRows(fetch, memory_budget, first)
+
+    @raise_if_closed_and_convert
+    def _fetch_block(self) -> ResultSet:
+        """Fetch the next block of rows for iteration."""
+        self._pending_query = None
+        return self._fetch_rows(max(self.arraysize, MIN_ITERATION_BLOCK_SIZE))
+
+    def _fetch_rows(self, size: Optional[int] = None) -> ResultSet:
+        """
+        Fetch `size` rows (or all of them) from DuckDB, timing the fetch
+        if profiling, and converting the rows if there's a row factory or
+        any converters are registered.
+
+        """
+        if self._timer is None:
+            if size is None:
+                rows = self._cursor.fetchall()
+            else:
+                rows = self._cursor.fetchmany(size)
+        elif size is None:
+            rows = self._timed_fetch(self._cursor.fetchall)
+        else:
+            rows = self._timed_fetch(self._cursor.fetchmany, size)
+        if self._recorder is not None:
+            self._record_rows(rows, size is None or len(rows) < size)
+        if not rows or (self._row_factory is None and not CONVERTERS):
+            return rows
+        return self._converted(rows)
+
+    def _record_rows(self, rows: Sequence[ResultRow], exhausted: bool):
+        """Record fetched rows for the result cache, until it's stored."""
+        if not self._recorder.record(rows, exhausted):
+            self._recorder = None
+
+    def _converted(self, rows: Sequence[ResultRow]) -> ResultSet:
+        """Apply the converters and row factory to the current result's rows."""
+        convert = self._convert_rows
+        if convert is None:
+            convert = self._convert_rows = self._make_converter()
+        return convert(rows)
+
+    def _make_converter(self) -> BatchConverter:
+        """Make the function converting rows for the current result."""
+        convert_types = rows_converter(self.description)
+        if self._row_factory is None:
+            return convert_types or _unconverted
+        make_rows = batch_converter(self._row_factory, self)
+        if convert_types is None:
+            return make_rows
+        return lambda rows: make_rows(convert_types(rows))
+
+    def _start_profile(self, timer: QueryTimer):
+        """Start recording fetches of the statement just run."""
+        self._timer = timer
+        if self._profile_callback is not None:
+            self._report_profile = weakref.finalize(
+                self, report_profile, self._profile_callback, timer
+            )
+
+    def _finish_query(self):
+        """Report the current statement's timings, if it's being profiled."""
+        self._timer = None
+        report, self._report_profile = self._report_profile, None
+        if report is not None:
+            report()
+
+    def _record_fetch(self, started_at: float, rows: int, exhausted: bool):
+        """Record a fetch of the current statement's rows."""
+        self._timer.fetched(started_at, rows)
+        if METRICS.enabled:
+            METRICS.record_rows(rows)
+        if exhausted:
+            self._finish_query()
+
+    def _timed_fetch(
+        self,
+        fetch: Callable[..., Any],
+        size: Optional[int] = None,
+        count: Callable[[Any], int] = len,
+    ) -> Any:
+        """
+        Fetch `size` rows (or all of them) with `fetch`, recording the
+        time taken and the number of rows, as counted by `count`.
+
+        """
+        started_at = perf_counter()
+        result = fetch() if size is None else fetch(size)
+        rows = count(result)
+        self._record_fetch(started_at, rows, size is None or rows < size)
+        return result
+
+    def _timed_batches(
+        self, batches: Iterator["pyarrow.RecordBatch"]
+    ) -> Iterator["pyarrow.RecordBatch"]:
+        """Record the time taken to fetch each record batch."""
+        timer = self._timer
+        while True:
+            started_at = perf_counter()
+            batch = next(batches, None)
+            if self._timer is timer:  # No other statement has been run since.
+                rows = 0 if batch is None else batch.num_rows
+                self._record_fetch(started_at, rows, batch is None)
+            if batch is None:
+                return
+            yield batch
+
+    def __next__(self) -> ResultRow:
+        buffer = self._row_buffer
+        if not buffer:
+            buffer.extend(self._fetch_block())
+            if not buffer:
+                raise StopIteration
+        return buffer.popleft()
+
+    @raise_if_closed_and_convert
+    def explain(
+        self,
+        operation: SQLQuery,
+        parameters: Optional[QueryParameters] = None,
+        *,
+        analyze: bool = True,
+    ) -> QueryPlan:
+        """
+        Return the plan for a query as a tree of operators.
+
+        If `analyze` is set, the query is run (as with `EXPLAIN ANALYZE`)
+        and its results discarded, and the plan includes each operator's
+        time and actual rows alongside the optimizer's estimate. This
+        replaces the cursor's current result. Otherwise, the query isn't
+        run, which needs a DuckDB release supporting
+        `EXPLAIN (FORMAT JSON)`.
+
+        """
+        self._row_buffer.clear()
+        self._pending_query = None
+        self._recorder = None
+        self._convert_rows = None
+        self._result_number += 1
+        self._finish_query()
+        if analyze:
+            if self._recycle is not None:
+                # Profiling leaves settings behind on the DuckDB cursor (its
+                # output path, at least), and the query may leave state too.
+                self._keep_duckdb_cursor()
+            plan = profile_query(self._cursor, operation, parameters)
+            if self._result_cache is not None:
+                self._track_writes(operation)
+            return plan
+        return explain_query(self._cursor, operation, parameters)
 
     @raise_if_closed
-    @convert_runtime_errors
-    def fetchall(self) -> ResultSet:
-        return self._cursor.fetchall()
+    def raw(self) -> RawCursor:
+        """
+        Return a `RawCursor` view of this cursor for trusted hot paths,
+        which skips the closed-state checks and the row buffer.
+
+        Rows buffered by iteration can't be fetched through the view, so
+        this raises if there are any left.
+
+        """
+        if self._row_buffer:
+            raise ProgrammingError(
+                "Cannot create a raw view while rows are buffered from iteration."
+            )
+        self._pending_query = None
+        self._recorder = None
+        if self._recycle is not None:
+            self._keep_duckdb_cursor()
+        return RawCursor(self._cursor, self.arraysize)
+
+    def _check_unbuffered(self):
+        """Raise if iteration has buffered rows the columnar fetches would skip."""
+        if self._row_buffer:
+            raise ProgrammingError(
+                "Cannot fetch columns while rows are buffered from iteration."
+            )
+        self._pending_query = None
+        self._recorder = None
+
+    @raise_if_closed_and_convert
+    def fetchnumpy(self) -> Dict[str, "numpy.ndarray"]:
+        """Fetch the remaining rows as a dict of NumPy arrays, by column."""
+        self._check_unbuffered()
+        if self._timer is None:
+            columns = self._cursor.fetchnumpy()
+        else:
+            columns = self._timed_fetch(self._cursor.fetchnumpy, count=_column_length)
+        if not CONVERTERS:
+            return columns
+        return convert_numpy_columns(columns, self.description)
+
+    @raise_if_closed_and_convert
+    def fetchdf(self) -> "pandas.DataFrame":
+        """Fetch the remaining rows as a pandas DataFrame."""
+        self._check_unbuffered()
+        if self._timer is None:
+            return self._cursor.fetchdf()
+        return self._timed_fetch(self._cursor.fetchdf)
+
+    @raise_if_closed_and_convert
+    def fetch_arrow_table(self) -> "pyarrow.Table":
+        """Fetch the remaining rows as a PyArrow Table."""
+        self._check_unbuffered()
+        if self._timer is None:
+            return self._cursor.fetch_arrow_table()
+        return self._timed_fetch(
+            self._cursor.fetch_arrow_table, count=lambda table: table.num_rows
+        )
+
+    @raise_if_closed_and_convert
+    def fetch_record_batches(
+        self, rows_per_batch: int = DEFAULT_ROWS_PER_BATCH
+    ) -> Iterator["pyarrow.RecordBatch"]:
+        """
+        Iterate over the remaining rows as PyArrow RecordBatches of up to
+        `rows_per_batch` rows.
+
+        Batches are streamed from DuckDB where it supports this. Older
+        DuckDB releases fetch the whole result as one table, and split it.
+
+        """
+        self._check_unbuffered()
+        fetch_record_batch = getattr(self._cursor, "fetch_record_batch", None)
+        if fetch_record_batch is None:
+            table = self._cursor.fetch_arrow_table()
+            batches = iter(table.to_batches(max_chunksize=rows_per_batch))
+        else:
+            batches = _iter_record_batches(fetch_record_batch(rows_per_batch))
+            if self._recycle is not None:
+                # The batches are streamed from the DuckDB cursor, perhaps
+                # after this cursor has been collected.
+                self._keep_duckdb_cursor()
+        if self._timer is None:
+            return batches
+        return self._timed_batches(batches)
+
+    # pylint: disable=too-many-arguments
+    @raise_if_closed_and_convert
+    def copy_to(
+        self,
+        destination: Any,
+        *,
+        format: Optional[str] = None,  # pylint: disable=redefined-builtin
+        chunk_size: int = DEFAULT_BATCH_SIZE,
+        header: bool = True,
+        delimiter: str = ",",
+        progress: Optional[ProgressCallback] = None,
+    ) -> CopyResult:
+        """
+        Write the remaining rows of the result to a path or a writable
+        binary file object, returning the number of rows written and the
+        time taken.
+
+        The format ("csv", "parquet" or "ndjson") is inferred from a
+        path's extension if not given, and file objects are written as
+        CSV by default. If no rows have been fetched yet and the
+        destination is a local CSV or Parquet path, the result is written
+        by DuckDB's own `COPY ... TO` (this needs PyArrow). Otherwise, rows
+        are fetched and written in chunks of `chunk_size` rows, and
+        `progress` (if given) is called with the running total of rows
+        written after each chunk.
+
+        """
+        started_at = perf_counter()
+        file_format = resolve_export_format(destination, format)
+        if isinstance(destination, (str, os.PathLike)):
+            if self._pending_query is not None and can_copy_result(
+                self._cursor, file_format
+            ):
+                self._pending_query = None
+                self._recorder = None
+                rows = copy_result(
+                    self._cursor,
+                    destination,
+                    file_format,
+                    header=header,
+                    delimiter=delimiter,
+                    rows_per_batch=chunk_size,
+                )
+                if self._timer is not None:
+                    self._record_fetch(started_at, rows, True)
+                if progress is not None:
+                    progress(rows)
+                return CopyResult(rows, perf_counter() - started_at)
+
+            with open(destination, "wb") as file:
+                return self.copy_to(
+                    file,
+                    format=file_format,
+                    chunk_size=chunk_size,
+                    header=header,
+                    delimiter=delimiter,
+                    progress=progress,
+                )
+
+        description = self.description or ()
+        names = [column[0] for column in description]
+        if file_format == "parquet":
+            rows = write_parquet(
+                destination,
+                names,
+                self.fetch_record_batches(chunk_size),
+                progress=progress,
+            )
+        elif file_format == "ndjson":
+            rows = write_ndjson(
+                destination, names, self.fetchmany, chunk_size, progress=progress
+            )
+        else:
+            rows = write_csv(
+                destination,
+                names,
+                self.fetchmany,
+                chunk_size,
+                header=header,
+                delimiter=delimiter,
+                progress=progress,
+            )
+        return CopyResult(rows, perf_counter() - started_at)
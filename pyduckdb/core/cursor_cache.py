@@ -0,0 +1,139 @@
+"""
+A free-list of DuckDB cursors, so that `Connection.execute` and friends
+can reuse the DuckDB cursor of a finished `Cursor` rather than creating
+a new one per call.
+
+A `Cursor` gives its DuckDB cursor back when it's closed or garbage
+collected, unless it may have left state behind on it (an open
+transaction, a changed setting, a temporary object, a profiled
+`explain`, or anything run through its `raw` view), or a stream of record batches may still be
+reading from it. Those DuckDB cursors are closed as before.
+
+"""
+# pylint: disable=c-extension-no-member
+import re
+from collections import deque
+from typing import Deque, NamedTuple, Optional, TYPE_CHECKING
+from pep249 import SQLQuery
+from .statement_cache import statement_kind
+
+if TYPE_CHECKING:
+    from duckdb import DuckDBPyConnection  # pylint: disable=no-name-in-module
+
+__all__ = ["CursorCacheStats", "CursorCache", "REUSABLE_STATEMENTS", "is_reusable"]
+
+# Statements which leave nothing behind on a DuckDB cursor once they've
+# run in autocommit mode. Anything else (`BEGIN`, `SET`, `PRAGMA`, `USE`
+# and so on) stops the cursor from being reused.
+REUSABLE_STATEMENTS = frozenset(
+    (
+        "SELECT",
+        "WITH",
+        "VALUES",
+        "FROM",
+        "INSERT",
+        "UPDATE",
+        "DELETE",
+        "CREATE",
+        "DROP",
+        "ALTER",
+        "COPY",
+        "DESCRIBE",
+        "SHOW",
+        "SUMMARIZE",
+        "EXPLAIN",
+        "CHECKPOINT",
+        "ANALYZE",
+    )
+)
+
+
+# Temporary objects belong to the DuckDB cursor which created them.
+_TEMPORARY_CREATE = re.compile(
+    r"[\s(]*CREATE\s+(?:OR\s+REPLACE\s+)?TEMP(?:ORARY)?\b", re.IGNORECASE
+)
+# Functions which change the DuckDB cursor's state.
+_STATEFUL_FUNCTIONS = re.compile(r"\bsetseed\s*\(", re.IGNORECASE)
+
+
+def is_reusable(operation: SQLQuery) -> bool:
+    """
+    Whether a DuckDB cursor can be reused after running `operation`:
+    a single statement of one of the `REUSABLE_STATEMENTS` kinds, which
+    doesn't create a temporary object or call a stateful function such
+    as `setseed`.
+
+    """
+    return (
+        statement_kind(operation) in REUSABLE_STATEMENTS
+        and ";" not in operation.rstrip().rstrip(";")
+        and _TEMPORARY_CREATE.match(operation) is None
+        and _STATEFUL_FUNCTIONS.search(operation) is None
+    )
+
+
+class CursorCacheStats(NamedTuple):
+    """A snapshot of a connection's cursor cache counters."""
+
+    hits: int
+    misses: int
+    returned: int
+    discarded: int
+
+    @property
+    def reuse_rate(self) -> float:
+        """The share of cursors taken from the cache, from 0 to 1."""
+        taken = self.hits + self.misses
+        return self.hits / taken if taken else 0.0
+
+
+class CursorCache:
+    """
+    A bounded free-list of DuckDB cursors for one connection.
+
+    Cursors are given back by finalizers, which can run on any thread,
+    so the list is a deque (whose appends and pops are atomic) rather
+    than being guarded by a lock.
+
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._free: Deque["DuckDBPyConnection"] = deque()
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+        self.returned = 0
+        self.discarded = 0
+
+    def take(self) -> Optional["DuckDBPyConnection"]:
+        """Take a free DuckDB cursor, or return None if there are none."""
+        try:
+            free = self._free.pop()
+        except IndexError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return free
+
+    def give(self, duckdb_cursor: "DuckDBPyConnection"):
+        """Give back a DuckDB cursor, closing it if the cache is full."""
+        if not self._closed and len(self._free) < self.capacity:
+            self._free.append(duckdb_cursor)
+            self.returned += 1
+            return
+        self.discarded += 1
+        try:
+            duckdb_cursor.close()
+        except Exception:  # pylint: disable=broad-except
+            # Already closed with the connection.
+            pass
+
+    def close(self):
+        """Drop the free cursors, and stop accepting any more."""
+        self._closed = True
+        self._free.clear()
+
+    def stats(self) -> CursorCacheStats:
+        """Return a snapshot of the counters."""
+        return CursorCacheStats(self.hits, self.misses, self.returned, self.discarded)
@@ -1,14 +1,17 @@
 """
 This module covers the exceptions outlined in PEP 249.
 
-It also includes a function to convert DuckDB's pybind11-generated
-RuntimeErrors to true exception types, and a decorator to do this
-implicitly by wrapping functions.
+It also includes a function to convert DuckDB's errors to true
+exception types, and a decorator to do this implicitly by wrapping
+functions. DuckDB raised pybind11-generated `RuntimeError`s before
+0.8, and has raised subclasses of its own `duckdb.Error` since, which
+aren't `RuntimeError`s in some releases.
 
 """
 # pylint: disable=missing-class-docstring
 from functools import wraps
-from typing import Callable
+from typing import Callable, Tuple, Type
+import duckdb
 from pep249 import (
     DatabaseError,
     DataError,
@@ -20,6 +23,7 @@ from pep249 import (
     OperationalError,
     ProgrammingError,
 )
+from .metrics import REGISTRY as METRICS
 from .types import ReturnType
 
 
@@ -34,10 +38,13 @@ __all__ = [
     "OperationalError",
     "ProgrammingError",
     "CONNECTION_CLOSED",
+    "DUCKDB_ERRORS",
     "convert_runtime_errors",
 ]
 
 CONNECTION_CLOSED = ProgrammingError("Cannot operate on a closed connection.")
+# The exceptions DuckDB raises, to be converted.
+DUCKDB_ERRORS: Tuple[Type[Exception], ...] = (RuntimeError, duckdb.Error)
 
 INTEGRITY_ERRORS = ("Constraint Error",)
 PROGRAMMING_ERRORS = (
@@ -48,23 +55,25 @@ PROGRAMMING_ERRORS = (
 )
 DATA_ERRORS = ("Invalid Input Error", "Out of Range Error")
 INTERNAL_ERRORS = ()
-OPERATIONAL_ERRORS = ()
+OPERATIONAL_ERRORS = ("INTERRUPT Error",)
 NOT_SUPPORTED_ERRORS = ()
 
 
-def _parse_runtime_error(error: RuntimeError) -> DatabaseError:
+def _parse_runtime_error(error: Exception) -> DatabaseError:
     """
-    Parse a runtime error straight from DuckDB and return a more
-    appropriate exception.
+    Parse an error straight from DuckDB and return a more appropriate
+    exception.
 
     """
-    if isinstance(error, Error) or not isinstance(error, RuntimeError):
+    if isinstance(error, Error) or not isinstance(error, DUCKDB_ERRORS):
         return error
     error_string = str(error)
     error_type, *error_components = error_string.split(":")
     error_message = ":".join(error_components).strip()
 
     if error_type == "connection closed":
+        if METRICS.enabled:
+            METRICS.record_error(ProgrammingError.__name__)
         return CONNECTION_CLOSED
 
     new_error_type = DatabaseError
@@ -85,19 +94,21 @@ def _parse_runtime_error(error: RuntimeError) -> DatabaseError:
         new_error_type = ProgrammingError
         error_message = error_type
 
+    if METRICS.enabled:
+        METRICS.record_error(new_error_type.__name__)
     return new_error_type(error_message)
 
 
 def convert_runtime_errors(
     function: Callable[..., ReturnType]
 ) -> Callable[..., ReturnType]:
-    """Wrap a function, raising correct errors from `RuntimeError`s."""
+    """Wrap a function, raising correct errors from DuckDB's errors."""
 
     @wraps(function)
     def wrapper(*args, **kwargs):
         try:
             return function(*args, **kwargs)
-        except RuntimeError as err:
+        except DUCKDB_ERRORS as err:
             raise _parse_runtime_error(err) from err
 
     return wrapper
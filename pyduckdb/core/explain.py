@@ -0,0 +1,249 @@
+"""
+Query plans as Python objects, for `Cursor.explain`.
+
+Plans are read from DuckDB's JSON profiling output, which has changed
+shape between releases: older releases nest the operator tree under
+"tree", with "name", "timing" and "cardinality" keys, while newer ones
+put it under "children", with "operator_name", "operator_timing" and
+"operator_cardinality". Both are accepted.
+
+"""
+# pylint: disable=c-extension-no-member
+import json
+import os
+import re
+import tempfile
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+    TYPE_CHECKING,
+)
+from pep249 import QueryParameters, SQLQuery
+from .utils import string_literal
+
+if TYPE_CHECKING:
+    from duckdb import DuckDBPyConnection  # pylint: disable=no-name-in-module
+
+__all__ = ["PlanNode", "QueryPlan", "parse_plan", "explain_query", "profile_query"]
+
+_ESTIMATE = re.compile(r"(?:EC|Estimated Cardinality):\s*~?(\d+)|~(\d+) rows?")
+
+ExtraInfo = Union[Dict[str, Any], str]
+
+
+class PlanNode(NamedTuple):
+    """
+    One operator in a query plan.
+
+    `timing` (in seconds) and `cardinality` (the rows the operator
+    produced) are only known when the query has been run. The
+    `estimated_cardinality` is the optimizer's estimate, if DuckDB gives
+    one.
+
+    """
+
+    name: str
+    timing: Optional[float]
+    cardinality: Optional[int]
+    estimated_cardinality: Optional[int]
+    extra_info: ExtraInfo
+    children: Tuple["PlanNode", ...]
+
+    def walk(self) -> Iterator["PlanNode"]:
+        """Iterate over this operator and all of its descendants."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    @property
+    def estimate_ratio(self) -> Optional[float]:
+        """
+        The actual rows as a multiple of the estimate, or None if either
+        is unknown.
+
+        """
+        if self.cardinality is None or not self.estimated_cardinality:
+            return None
+        return self.cardinality / self.estimated_cardinality
+
+
+class QueryPlan(NamedTuple):
+    """
+    The plan for a query, with the total time taken and rows returned if
+    it was run (`EXPLAIN ANALYZE`).
+
+    """
+
+    sql: SQLQuery
+    total_time: Optional[float]
+    rows_returned: Optional[int]
+    root: PlanNode
+    raw: Any
+
+    def operators(self) -> List[PlanNode]:
+        """All of the plan's operators, depth first."""
+        return list(self.root.walk())
+
+    def most_expensive(self, count: int = 1) -> List[PlanNode]:
+        """The `count` operators which took the longest."""
+        timed = [node for node in self.root.walk() if node.timing is not None]
+        return sorted(timed, key=lambda node: node.timing, reverse=True)[:count]
+
+    def misestimated(self, factor: float = 10.0) -> List[PlanNode]:
+        """
+        The operators whose actual rows are off from the optimizer's
+        estimate by more than `factor` times either way.
+
+        """
+        return [
+            node
+            for node in self.root.walk()
+            if node.estimate_ratio is not None
+            and not 1 / factor <= node.estimate_ratio <= factor
+        ]
+
+    def summary(self) -> str:
+        """Render the plan as a compact, indented tree."""
+        lines = []
+        if self.total_time is not None:
+            lines.append(
+                f"Total: {self.total_time * 1e3:.3f} ms, "
+                f"{self.rows_returned} rows returned"
+            )
+
+        def render(node: PlanNode, depth: int):
+            parts = ["  " * depth + node.name]
+            if node.timing is not None:
+                parts.append(f"{node.timing * 1e3:.3f} ms")
+            if node.cardinality is not None:
+                parts.append(f"rows={node.cardinality}")
+            if node.estimated_cardinality is not None:
+                parts.append(f"est={node.estimated_cardinality}")
+            lines.append("  ".join(parts))
+            for child in node.children:
+                render(child, depth + 1)
+
+        render(self.root, 0)
+        return "\n".join(lines)
+
+
+def _estimate(extra_info: ExtraInfo) -> Optional[int]:
+    """Find the optimizer's row estimate in an operator's extra info."""
+    if isinstance(extra_info, dict):
+        estimate = extra_info.get("Estimated Cardinality")
+        if estimate is not None:
+            try:
+                return int(str(estimate).lstrip("~"))
+            except ValueError:
+                return None
+        extra_info = json.dumps(extra_info)
+    match = _ESTIMATE.search(extra_info or "")
+    if match is None:
+        return None
+    return int(match.group(1) or match.group(2))
+
+
+def _first(node: Dict[str, Any], *keys: str) -> Any:
+    """The value of the first of `keys` present in `node`."""
+    for key in keys:
+        if key in node:
+            return node[key]
+    return None
+
+
+def _parse_node(node: Dict[str, Any]) -> PlanNode:
+    """Parse an operator from either JSON profiling format."""
+    extra_info = node.get("extra_info") or ""
+    return PlanNode(
+        name=_first(node, "operator_name", "operator_type", "name") or "UNKNOWN",
+        timing=_first(node, "operator_timing", "timing"),
+        cardinality=_first(node, "operator_cardinality", "cardinality"),
+        estimated_cardinality=_estimate(extra_info),
+        extra_info=extra_info,
+        children=tuple(_parse_node(child) for child in node.get("children", ())),
+    )
+
+
+def _parse_roots(nodes: List[Dict[str, Any]], **query: Any) -> PlanNode:
+    """Parse the top of a plan, which may have several root operators."""
+    roots = [_parse_node(node) for node in nodes]
+    if len(roots) == 1:
+        return roots[0]
+    return PlanNode(
+        "QUERY",
+        query.get("timing"),
+        query.get("cardinality"),
+        None,
+        "",
+        tuple(roots),
+    )
+
+
+def parse_plan(sql: SQLQuery, data: Any) -> QueryPlan:
+    """Parse DuckDB's JSON profiling or `EXPLAIN` output into a plan."""
+    if isinstance(data, list):
+        return QueryPlan(sql, None, None, _parse_roots(data), data)
+    if "tree" in data:
+        root = _parse_node(data["tree"])
+        total_time = _first(data, "result", "timing")
+        return QueryPlan(sql, total_time, root.cardinality, root, data)
+
+    total_time = _first(data, "latency", "timing", "operator_timing")
+    rows_returned = data.get("rows_returned")
+    root = _parse_roots(
+        data.get("children", []), timing=total_time, cardinality=rows_returned
+    )
+    return QueryPlan(sql, total_time, rows_returned, root, data)
+
+
+def explain_query(
+    duckdb_cursor: "DuckDBPyConnection",
+    operation: SQLQuery,
+    parameters: Optional[QueryParameters],
+) -> QueryPlan:
+    """Return a query's plan without running it."""
+    explain = f"EXPLAIN (FORMAT JSON) {operation}"
+    if parameters is None:
+        duckdb_cursor.execute(explain)
+    else:
+        duckdb_cursor.execute(explain, parameters)
+    rows = duckdb_cursor.fetchall()
+    return parse_plan(operation, json.loads(rows[0][1]))
+
+
+def profile_query(
+    duckdb_cursor: "DuckDBPyConnection",
+    operation: SQLQuery,
+    parameters: Optional[QueryParameters],
+) -> QueryPlan:
+    """
+    Run a query with JSON profiling enabled, discarding its results and
+    returning its plan, with the time and rows for each operator.
+
+    Profiling is disabled afterwards, so this replaces any profiling
+    settings on the DuckDB cursor.
+
+    """
+    handle, path = tempfile.mkstemp(prefix="pyduckdb-profile-", suffix=".json")
+    os.close(handle)
+    try:
+        duckdb_cursor.execute("PRAGMA enable_profiling='json'")
+        try:
+            duckdb_cursor.execute(f"PRAGMA profiling_output={string_literal(path)}")
+            if parameters is None:
+                duckdb_cursor.execute(operation)
+            else:
+                duckdb_cursor.execute(operation, parameters)
+            duckdb_cursor.fetchall()
+        finally:
+            duckdb_cursor.execute("PRAGMA disable_profiling")
+        with open(path, "r") as file:
+            return parse_plan(operation, json.load(file))
+    finally:
+        os.remove(path)
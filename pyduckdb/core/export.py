@@ -0,0 +1,211 @@
+"""
+Streaming export, for `Cursor.copy_to`.
+
+Query results are written to local paths by DuckDB's own `COPY ... TO`
+where possible, reading the cursor's result rather than running the
+query again. Otherwise, rows are fetched and written in chunks, so
+memory use is bounded by the chunk size rather than the result size.
+
+"""
+# pylint: disable=c-extension-no-member
+import csv
+import io
+import itertools
+import json
+import os
+from typing import Any, Callable, Iterable, Optional, Sequence, TYPE_CHECKING
+from pep249 import ResultSet
+from .bulk import import_pyarrow
+from .exceptions import InterfaceError, NotSupportedError
+from .utils import resolve_file_format, string_literal
+
+if TYPE_CHECKING:
+    from duckdb import DuckDBPyConnection  # pylint: disable=no-name-in-module
+
+__all__ = [
+    "EXPORT_FORMATS",
+    "ProgressCallback",
+    "resolve_export_format",
+    "can_copy_result",
+    "copy_result",
+    "write_csv",
+    "write_ndjson",
+    "write_parquet",
+]
+
+EXPORT_FORMATS = ("csv", "parquet", "ndjson")
+NATIVE_EXPORT_FORMATS = ("csv", "parquet")
+_VIEW_IDS = itertools.count(1)
+
+ProgressCallback = Callable[[int], None]
+FetchMany = Callable[[int], ResultSet]
+
+
+def resolve_export_format(destination: Any, file_format: Optional[str]) -> str:
+    """
+    Return the format to write, inferring it from a path's extension if
+    not given. File objects are written as CSV by default.
+
+    """
+    if not isinstance(destination, (str, os.PathLike)) and not hasattr(
+        destination, "write"
+    ):
+        raise InterfaceError("Destination must be a path or a writable file.")
+    return resolve_file_format(destination, file_format, EXPORT_FORMATS)
+
+
+def can_copy_result(duckdb_cursor: "DuckDBPyConnection", file_format: str) -> bool:
+    """Whether DuckDB can write a cursor's pending result itself."""
+    return (
+        file_format in NATIVE_EXPORT_FORMATS
+        and hasattr(duckdb_cursor, "fetch_record_batch")
+        and import_pyarrow() is not None
+    )
+
+
+# pylint: disable=too-many-arguments
+def copy_result(
+    duckdb_cursor: "DuckDBPyConnection",
+    path: Any,
+    file_format: str,
+    *,
+    header: bool,
+    delimiter: str,
+    rows_per_batch: int,
+) -> int:
+    """
+    Write the pending result of a DuckDB cursor to a local path with
+    DuckDB's `COPY ... TO`, returning the number of rows written.
+
+    The result is streamed as Arrow record batches into a `COPY` run on
+    a second DuckDB cursor, so the query isn't run again. No rows may
+    have been fetched from the result yet.
+
+    """
+    if file_format == "parquet":
+        options = "FORMAT PARQUET"
+    else:
+        options = (
+            f"FORMAT CSV, HEADER {'TRUE' if header else 'FALSE'}, "
+            f"DELIMITER {string_literal(delimiter)}"
+        )
+    reader = duckdb_cursor.fetch_record_batch(rows_per_batch)
+    view_name = f"__pyduckdb_export_{next(_VIEW_IDS)}"
+    writer = duckdb_cursor.cursor()
+    try:
+        writer.register(view_name, reader)
+        writer.execute(
+            f"COPY (SELECT * FROM {view_name}) "
+            f"TO {string_literal(os.fspath(path))} ({options})"
+        )
+        row = writer.fetchone()
+    finally:
+        writer.close()
+    return row[0] if row else 0
+
+
+def _write_text_chunks(
+    file: Any,
+    fetchmany: FetchMany,
+    chunk_size: int,
+    start_writing: Callable[[Any], Callable[[ResultSet], None]],
+    progress: Optional[ProgressCallback],
+) -> int:
+    """
+    Fetch rows in chunks, writing them to a binary file as UTF-8 text.
+
+    `start_writing` is called with the text stream, and returns the
+    function used to write each chunk of rows.
+
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    written = 0
+    try:
+        write_rows = start_writing(text)
+        while True:
+            rows = fetchmany(chunk_size)
+            if not rows:
+                break
+            write_rows(rows)
+            written += len(rows)
+            if progress is not None:
+                progress(written)
+    finally:
+        text.flush()
+        # Don't close the caller's file along with the wrapper.
+        text.detach()
+    return written
+
+
+def write_csv(
+    file: Any,
+    names: Sequence[str],
+    fetchmany: FetchMany,
+    chunk_size: int,
+    *,
+    header: bool,
+    delimiter: str,
+    progress: Optional[ProgressCallback] = None,
+) -> int:
+    """Write a result to a binary file as CSV, in chunks."""
+
+    def start_writing(text):
+        writer = csv.writer(text, delimiter=delimiter, lineterminator="\n")
+        if header:
+            writer.writerow(names)
+        return writer.writerows
+
+    return _write_text_chunks(file, fetchmany, chunk_size, start_writing, progress)
+
+
+def write_ndjson(
+    file: Any,
+    names: Sequence[str],
+    fetchmany: FetchMany,
+    chunk_size: int,
+    *,
+    progress: Optional[ProgressCallback] = None,
+) -> int:
+    """Write a result to a binary file as newline-delimited JSON, in chunks."""
+
+    def start_writing(text):
+        def write_rows(rows):
+            text.writelines(
+                json.dumps(dict(zip(names, row)), default=str) + "\n" for row in rows
+            )
+
+        return write_rows
+
+    return _write_text_chunks(file, fetchmany, chunk_size, start_writing, progress)
+
+
+def write_parquet(
+    file: Any,
+    names: Sequence[str],
+    batches: Iterable[Any],
+    *,
+    progress: Optional[ProgressCallback] = None,
+) -> int:
+    """Write PyArrow record batches to a path or binary file as Parquet."""
+    pyarrow = import_pyarrow()
+    if pyarrow is None:
+        raise NotSupportedError("Writing Parquet requires PyArrow.")
+    import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+
+    writer = None
+    written = 0
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(file, batch.schema)
+            writer.write_table(pyarrow.Table.from_batches([batch]))
+            written += batch.num_rows
+            if progress is not None:
+                progress(written)
+        if writer is None:
+            empty = pyarrow.table({name: pyarrow.array([]) for name in names})
+            pyarrow.parquet.write_table(empty, file)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
@@ -0,0 +1,148 @@
+"""
+Streaming bulk loading, for `Connection.copy_from`.
+
+On-disk CSV and Parquet files are loaded by DuckDB's own readers. Row
+iterables and file objects are read and inserted in bounded chunks, so
+the whole source is never held in memory.
+
+"""
+# pylint: disable=c-extension-no-member
+import csv
+import io
+import os
+from typing import Any, Iterator, List, NamedTuple, Optional, Union, TYPE_CHECKING
+from .bulk import import_pyarrow, insert_arrow, insert_columnar
+from .exceptions import InterfaceError, NotSupportedError
+from .utils import resolve_file_format, string_literal
+
+if TYPE_CHECKING:
+    from duckdb import DuckDBPyConnection  # pylint: disable=no-name-in-module
+
+__all__ = ["CopyResult", "FORMATS", "resolve_format", "copy_into"]
+
+FORMATS = ("csv", "parquet")
+
+PathType = Union[str, "os.PathLike[str]"]
+
+
+class CopyResult(NamedTuple):
+    """The outcome of a bulk load or export."""
+
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        """The throughput of the copy."""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def resolve_format(source: Any, file_format: Optional[str]) -> Optional[str]:
+    """
+    Return the file format for a path or file object, inferring it from
+    the file extension if not given. Returns None for row iterables.
+
+    """
+    if not isinstance(source, (str, os.PathLike)) and not hasattr(source, "read"):
+        if file_format is not None:
+            raise InterfaceError("`format` can only be set for paths and files.")
+        return None
+    return resolve_file_format(source, file_format, FORMATS)
+
+
+def _csv_rows(
+    source: Any, *, header: bool, delimiter: str
+) -> Iterator[List[Optional[str]]]:
+    """Read rows from a CSV file object, treating empty values as NULL."""
+    wrapper = None
+    mode = getattr(source, "mode", "")
+    if isinstance(source, (io.RawIOBase, io.BufferedIOBase)) or (
+        isinstance(mode, str) and "b" in mode
+    ):
+        wrapper = source = io.TextIOWrapper(source, encoding="utf-8", newline="")
+    try:
+        reader = csv.reader(source, delimiter=delimiter)
+        if header:
+            next(reader, None)
+        for row in reader:
+            yield [value if value != "" else None for value in row]
+    finally:
+        if wrapper is not None:
+            # Don't close the caller's file along with the wrapper.
+            wrapper.detach()
+
+
+def _copy_path(
+    duckdb_cursor: "DuckDBPyConnection",
+    table: str,
+    path: PathType,
+    file_format: str,
+    *,
+    header: bool,
+    delimiter: str,
+) -> int:
+    """Load an on-disk file using DuckDB's own readers."""
+    path_literal = string_literal(os.fspath(path))
+    if file_format == "parquet":
+        scan = f"parquet_scan({path_literal})"
+    else:
+        header_literal = "TRUE" if header else "FALSE"
+        scan = (
+            f"read_csv_auto({path_literal}, header={header_literal}, "
+            f"delim={string_literal(delimiter)})"
+        )
+    result = duckdb_cursor.execute(f"INSERT INTO {table} SELECT * FROM {scan}")
+    row = result.fetchone()
+    return row[0] if row else 0
+
+
+def _copy_parquet_file(
+    duckdb_cursor: "DuckDBPyConnection", table: str, source: Any, chunk_size: int
+) -> int:
+    """Load a Parquet file object in record batches of `chunk_size` rows."""
+    pyarrow = import_pyarrow()
+    if pyarrow is None:
+        raise NotSupportedError("Loading Parquet file objects requires PyArrow.")
+    import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+
+    rows = 0
+    for batch in pyarrow.parquet.ParquetFile(source).iter_batches(chunk_size):
+        insert_arrow(duckdb_cursor, table, pyarrow.Table.from_batches([batch]))
+        rows += batch.num_rows
+    return rows
+
+
+# pylint: disable=too-many-arguments
+def copy_into(
+    duckdb_cursor: "DuckDBPyConnection",
+    table: str,
+    source: Any,
+    *,
+    file_format: Optional[str],
+    chunk_size: int,
+    header: bool,
+    delimiter: str,
+) -> int:
+    """
+    Load `source` into `table`, returning the number of rows loaded.
+
+    The source can be a path to a CSV or Parquet file, a file object, or
+    an iterable of rows.
+
+    """
+    file_format = resolve_format(source, file_format)
+    if file_format is None:
+        return insert_columnar(duckdb_cursor, table, source, batch_size=chunk_size)
+    if isinstance(source, (str, os.PathLike)):
+        return _copy_path(
+            duckdb_cursor,
+            table,
+            source,
+            file_format,
+            header=header,
+            delimiter=delimiter,
+        )
+    if file_format == "parquet":
+        return _copy_parquet_file(duckdb_cursor, table, source, chunk_size)
+    rows = _csv_rows(source, header=header, delimiter=delimiter)
+    return insert_columnar(duckdb_cursor, table, rows, batch_size=chunk_size)
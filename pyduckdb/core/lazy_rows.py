@@ -0,0 +1,321 @@
+"""
+A lazily fetched, memory-bounded sequence of result rows, from
+`Cursor.fetch_sequence` (or `Cursor.fetchall(lazy=True)`).
+
+Rows are fetched from the cursor in chunks as they're needed, so a
+large result doesn't have to be built into one list. Once the chunks
+held in memory pass a budget, the oldest are pickled to a temporary
+file in blocks of a few dozen rows, and the file is memory-mapped to
+read them back: a block is unpickled straight from the mapping, without
+copying its bytes first. Reading one row only unpickles its block, and
+the last block read is kept, so reading in order touches each block
+once.
+
+"""
+import mmap
+import pickle
+import sys
+import tempfile
+from bisect import bisect_right
+from collections import deque
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Deque,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "DEFAULT_MEMORY_BUDGET",
+    "LazyRows",
+    "LazyRowsStats",
+]
+
+DEFAULT_CHUNK_SIZE = 10_000
+DEFAULT_MEMORY_BUDGET = 64 * 2**20
+# Rows sampled from each chunk to estimate its size.
+SIZE_SAMPLE = 64
+# Spilled chunks are pickled in blocks of this many rows, so that reading
+# one row back only unpickles its block.
+SPILL_BLOCK_ROWS = 64
+PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+def _row_size(row: Any) -> int:
+    """Estimate the memory used by a row, and its values if it has any."""
+    size = sys.getsizeof(row)
+    try:
+        return size + sum(map(sys.getsizeof, row))
+    except TypeError:  # Made by a row factory, and not iterable.
+        return size
+
+
+def _chunk_size(rows: List[Any]) -> int:
+    """Estimate the memory used by a chunk of rows, from a sample of them."""
+    sample = rows[:: max(len(rows) // SIZE_SAMPLE, 1)]
+    return sum(map(_row_size, sample)) * len(rows) // len(sample)
+
+
+class LazyRowsStats(NamedTuple):
+    """
+    A snapshot of a lazy sequence's chunks: the rows fetched so far, and
+    how many chunks (and estimated or file bytes) are held in memory or
+    have been spilled to disk.
+
+    """
+
+    rows: int
+    chunks: int
+    resident_chunks: int
+    resident_bytes: int
+    spilled_chunks: int
+    spilled_bytes: int
+
+
+class LazyRows(Sequence[Any]):
+    """
+    A read-only sequence of rows, fetched `chunk_size` rows at a time by
+    calling `fetch` until it returns no rows.
+
+    Indexing and slicing only fetch as far as they need to, except with
+    negative indices; `len` fetches the whole result. Chunks held in
+    memory past `memory_budget` bytes (estimated) are spilled to a
+    temporary file, oldest first. Chunks which can't be pickled stay in
+    memory.
+
+    The cursor mustn't run another statement until the rows it needs
+    have been fetched. Call `close` (or use the sequence as a context
+    manager) to free the rows and the file early.
+
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], List[Any]],
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        first: Optional[List[Any]] = None,
+    ):
+        self._fetch: Optional[Callable[[], List[Any]]] = fetch
+        self.memory_budget = memory_budget
+        # Each chunk's rows (or None once spilled), the index of its first
+        # row, and the offsets of its blocks in the spill file (followed by
+        # the end of the last one).
+        self._chunks: List[Optional[List[Any]]] = []
+        self._starts: List[int] = []
+        self._spilled: List[Optional[List[int]]] = []
+        self._count = 0
+        # Chunks in memory which could be spilled, oldest first, and
+        # their estimated sizes.
+        self._resident: Deque[Tuple[int, int]] = deque()
+        self._resident_bytes = 0
+        self._file: Optional[IO[bytes]] = None
+        self._file_size = 0
+        self._map: Optional[mmap.mmap] = None
+        # The last block to be read back: its chunk, its number and rows.
+        self._loaded: Optional[Tuple[int, int, List[Any]]] = None
+        if first:
+            self._add_chunk(first)
+
+    def __enter__(self) -> "LazyRows":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __repr__(self) -> str:
+        state = "fetched" if self._fetch is None else "fetched so far"
+        return f"<LazyRows: {self._count} rows {state}>"
+
+    def close(self) -> None:
+        """Stop fetching, and free the rows and the spill file."""
+        self._fetch = None
+        self._chunks, self._starts, self._spilled = [], [], []
+        self._count = 0
+        self._resident.clear()
+        self._resident_bytes = 0
+        self._loaded = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._file_size = 0
+
+    def stats(self) -> LazyRowsStats:
+        """Return a snapshot of the chunks fetched so far."""
+        spilled = sum(location is not None for location in self._spilled)
+        return LazyRowsStats(
+            rows=self._count,
+            chunks=len(self._chunks),
+            resident_chunks=len(self._chunks) - spilled,
+            resident_bytes=self._resident_bytes,
+            spilled_chunks=spilled,
+            spilled_bytes=self._file_size,
+        )
+
+    def _add_chunk(self, rows: List[Any]):
+        """Add a fetched chunk, spilling older ones if over the budget."""
+        self._chunks.append(rows)
+        self._starts.append(self._count)
+        self._spilled.append(None)
+        self._count += len(rows)
+        size = _chunk_size(rows)
+        self._resident.append((len(self._chunks) - 1, size))
+        self._resident_bytes += size
+        # The newest chunk is always kept, as it's likely to be read next.
+        while self._resident_bytes > self.memory_budget and len(self._resident) > 1:
+            index, size = self._resident.popleft()
+            if self._spill(index):
+                self._resident_bytes -= size
+
+    def _fetch_chunk(self) -> bool:
+        """Fetch the next chunk, returning False if there are no more rows."""
+        if self._fetch is None:
+            return False
+        rows = self._fetch()
+        if not rows:
+            self._fetch = None
+            return False
+        self._add_chunk(rows)
+        return True
+
+    def _fetch_to(self, count: int) -> bool:
+        """Fetch until at least `count` rows have been, if there are that many."""
+        while self._count < count:
+            if not self._fetch_chunk():
+                return False
+        return True
+
+    def _spill(self, index: int) -> bool:
+        """
+        Write a chunk to the spill file in blocks and drop it from memory,
+        returning False if it can't be pickled.
+
+        """
+        rows = self._chunks[index]
+        try:
+            blocks = [
+                pickle.dumps(rows[start : start + SPILL_BLOCK_ROWS], PROTOCOL)
+                for start in range(0, len(rows), SPILL_BLOCK_ROWS)
+            ]
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return False
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="pyduckdb-rows-")
+        offsets = [self._file_size]
+        for block in blocks:
+            self._file.write(block)
+            offsets.append(offsets[-1] + len(block))
+        self._spilled[index] = offsets
+        self._file_size = offsets[-1]
+        self._chunks[index] = None
+        return True
+
+    def _block(self, index: int, block: int) -> List[Any]:
+        """Read a block of a spilled chunk's rows back from the file."""
+        loaded = self._loaded
+        if loaded is not None and loaded[0] == index and loaded[1] == block:
+            return loaded[2]
+        offsets = self._spilled[index]
+        start, end = offsets[block], offsets[block + 1]
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            self._file.flush()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        with memoryview(self._map) as view, view[start:end] as data:
+            rows = pickle.loads(data)
+        self._loaded = (index, block, rows)
+        return rows
+
+    def _rows(self, index: int, start: int, stop: int) -> List[Any]:
+        """Rows `start` to `stop` of a chunk."""
+        rows = self._chunks[index]
+        if rows is not None:
+            return rows[start:stop]
+        found: List[Any] = []
+        while start < stop:
+            block, offset = divmod(start, SPILL_BLOCK_ROWS)
+            taken = self._block(index, block)[offset : offset + stop - start]
+            found.extend(taken)
+            start += len(taken)
+        return found
+
+    def _row(self, index: int, position: int) -> Any:
+        """One row of a chunk."""
+        rows = self._chunks[index]
+        if rows is not None:
+            return rows[position]
+        block, offset = divmod(position, SPILL_BLOCK_ROWS)
+        return self._block(index, block)[offset]
+
+    def _chunk_length(self, index: int) -> int:
+        """The number of rows in a chunk."""
+        if index + 1 < len(self._starts):
+            return self._starts[index + 1] - self._starts[index]
+        return self._count - self._starts[index]
+
+    def __len__(self) -> int:
+        while self._fetch_chunk():
+            pass
+        return self._count
+
+    def __iter__(self) -> Iterator[Any]:
+        index = 0
+        while index < len(self._chunks) or self._fetch_chunk():
+            rows = self._chunks[index]
+            if rows is not None:
+                yield from rows
+            else:
+                for block in range(len(self._spilled[index]) - 1):
+                    yield from self._block(index, block)
+            index += 1
+
+    @overload
+    def __getitem__(self, key: int) -> Any:
+        ...
+
+    @overload
+    def __getitem__(self, key: slice) -> List[Any]:
+        ...
+
+    def __getitem__(self, key: Union[int, slice]) -> Any:
+        if isinstance(key, slice):
+            return self._slice(key)
+        if key < 0:
+            key += len(self)
+        if key < 0 or not self._fetch_to(key + 1):
+            raise IndexError("Row index out of range.")
+        index = bisect_right(self._starts, key) - 1
+        return self._row(index, key - self._starts[index])
+
+    def _slice(self, key: slice) -> List[Any]:
+        """Return a slice of the rows as a list."""
+        start, stop, step = key.start, key.stop, key.step
+        if (step or 1) > 0 and (start or 0) >= 0 and stop is not None and stop >= 0:
+            # Only fetch as far as the slice goes.
+            self._fetch_to(stop)
+            start, stop, step = key.indices(self._count)
+        else:
+            start, stop, step = key.indices(len(self))
+        if step != 1:
+            return [self[index] for index in range(start, stop, step)]
+        rows: List[Any] = []
+        index = bisect_right(self._starts, start) - 1
+        while start < stop:
+            chunk_start = self._starts[index]
+            end = min(stop - chunk_start, self._chunk_length(index))
+            rows.extend(self._rows(index, start - chunk_start, end))
+            start = chunk_start + end
+            index += 1
+        return rows
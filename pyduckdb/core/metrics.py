@@ -0,0 +1,234 @@
+"""
+A process-wide metrics registry, exposed as `pyduckdb.metrics`.
+
+Collection is off by default. While it's off, the only cost is a flag
+check per statement executed; while it's on, statements are timed and
+their rows counted as with a profile callback (see `tracing`).
+
+"""
+import bisect
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Sequence, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pyduckdb.core.connection import Connection  # pylint: disable=cyclic-import
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "Histogram",
+    "MetricsRegistry",
+    "REGISTRY",
+    "enable",
+    "disable",
+    "is_enabled",
+    "reset",
+    "snapshot",
+    "render_prometheus",
+]
+
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """A cumulative histogram, as used by Prometheus."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record a value. Not thread safe: callers hold the registry lock."""
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The histogram as a dict, with cumulative bucket counts."""
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {"buckets": buckets, "sum": self.sum, "count": self.count}
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms for pyduckdb's connections and cursors.
+
+    Connections opened while collection is enabled are tracked weakly,
+    and the open connection and cursor gauges are counted from them when
+    a snapshot is taken.
+
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = False
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._connections: "weakref.WeakSet[Connection]" = weakref.WeakSet()
+        self.reset()
+
+    def reset(self):
+        """Clear the counters and histograms."""
+        with self._lock:
+            self._queries = 0
+            self._rows = 0
+            self._errors: Dict[str, int] = {}
+            self._query_duration = Histogram(self._buckets)
+            self._handoff_wait = Histogram(self._buckets)
+
+    def track_connection(self, connection: "Connection"):
+        """Count a connection (and its cursors) in the open gauges."""
+        with self._lock:
+            self._connections.add(connection)
+
+    def record_query(self, seconds: float):
+        """Record a statement executed, and how long it took."""
+        with self._lock:
+            self._queries += 1
+            self._query_duration.observe(seconds)
+
+    def record_rows(self, rows: int):
+        """Record rows fetched."""
+        with self._lock:
+            self._rows += rows
+
+    def record_error(self, error_type: str):
+        """Record an error raised, by its PEP 249 class name."""
+        with self._lock:
+            self._errors[error_type] = self._errors.get(error_type, 0) + 1
+
+    def record_handoff(self, seconds: float):
+        """Record how long a call waited for an async connection's worker."""
+        with self._lock:
+            self._handoff_wait.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current metrics as a JSON-serialisable dict."""
+        # pylint: disable=protected-access
+        with self._lock:
+            connections = [conn for conn in self._connections if not conn._closed]
+            return {
+                "enabled": self.enabled,
+                "queries_executed": self._queries,
+                "rows_fetched": self._rows,
+                "errors": dict(self._errors),
+                "open_connections": len(connections),
+                "open_cursors": sum(
+                    1
+                    for connection in connections
+                    for cursor in connection._open_cursors()
+                    if not cursor._closed
+                ),
+                "query_duration_seconds": self._query_duration.snapshot(),
+                "handoff_wait_seconds": self._handoff_wait.snapshot(),
+            }
+
+
+REGISTRY = MetricsRegistry()
+
+
+def enable():
+    """Start collecting metrics."""
+    REGISTRY.enabled = True
+
+
+def disable():
+    """Stop collecting metrics. The values collected so far are kept."""
+    REGISTRY.enabled = False
+
+
+def is_enabled() -> bool:
+    """Whether metrics are being collected."""
+    return REGISTRY.enabled
+
+
+def reset():
+    """Clear the metrics collected so far."""
+    REGISTRY.reset()
+
+
+def snapshot() -> Dict[str, Any]:
+    """Return the current metrics as a JSON-serialisable dict."""
+    return REGISTRY.snapshot()
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_histogram(
+    lines: List[str], name: str, help_text: str, histogram: Dict[str, Any]
+):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for bound, count in histogram["buckets"].items():
+        lines.append(f'{name}_bucket{{le="{bound}"}} {count}')
+    lines.append(f'{name}_bucket{{le="+Inf"}} {histogram["count"]}')
+    lines.append(f"{name}_sum {histogram['sum']}")
+    lines.append(f"{name}_count {histogram['count']}")
+
+
+def render_prometheus(metrics: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Render a snapshot (by default, a new one) in the Prometheus text
+    exposition format.
+
+    """
+    if metrics is None:
+        metrics = snapshot()
+    lines = [
+        "# HELP pyduckdb_queries_total Statements executed.",
+        "# TYPE pyduckdb_queries_total counter",
+        f"pyduckdb_queries_total {metrics['queries_executed']}",
+        "# HELP pyduckdb_rows_fetched_total Rows fetched from results.",
+        "# TYPE pyduckdb_rows_fetched_total counter",
+        f"pyduckdb_rows_fetched_total {metrics['rows_fetched']}",
+        "# HELP pyduckdb_errors_total Errors raised, by PEP 249 exception class.",
+        "# TYPE pyduckdb_errors_total counter",
+    ]
+    for error_type, count in sorted(metrics["errors"].items()):
+        lines.append(f'pyduckdb_errors_total{{type="{_escape(error_type)}"}} {count}')
+    lines.extend(
+        [
+            "# HELP pyduckdb_open_connections Connections currently open.",
+            "# TYPE pyduckdb_open_connections gauge",
+            f"pyduckdb_open_connections {metrics['open_connections']}",
+            "# HELP pyduckdb_open_cursors Cursors currently open.",
+            "# TYPE pyduckdb_open_cursors gauge",
+            f"pyduckdb_open_cursors {metrics['open_cursors']}",
+        ]
+    )
+    _render_histogram(
+        lines,
+        "pyduckdb_query_duration_seconds",
+        "Time spent executing statements.",
+        metrics["query_duration_seconds"],
+    )
+    _render_histogram(
+        lines,
+        "pyduckdb_handoff_wait_seconds",
+        "Time calls waited for an async connection's worker thread.",
+        metrics["handoff_wait_seconds"],
+    )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,222 @@
+"""
+Running one statement with many sets of parameters at once, on a pool
+of cursors and threads, for `Connection.execute_parallel`.
+
+DuckDB releases the GIL while it executes a statement, and each cursor
+is a separate DuckDB connection to the same database instance, so
+independent statements (such as aggregates over disjoint key ranges)
+can run side by side. Each statement is run in autocommit mode on a
+cursor of its own, so it doesn't see writes from a transaction still
+open on the calling connection.
+
+"""
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Union,
+    TYPE_CHECKING,
+)
+from pep249 import QueryParameters, ResultRow, SQLQuery
+from .exceptions import NotSupportedError, OperationalError
+
+if TYPE_CHECKING:
+    from .connection import Connection
+    from .cursor import Cursor
+
+__all__ = ["ParallelResult", "ParallelExecution", "default_workers"]
+
+# How many statements may be submitted per worker thread before their
+# results are consumed, so that long parameter sequences are streamed
+# rather than all held in memory at once.
+SUBMITTED_PER_WORKER = 2
+
+
+def default_workers() -> int:
+    """The default number of worker threads: one per CPU."""
+    return os.cpu_count() or 1
+
+
+class ParallelResult(NamedTuple):
+    """
+    The rows fetched by one statement of a parallel execution, with the
+    position and parameters of its parameter set.
+
+    """
+
+    index: int
+    parameters: Optional[QueryParameters]
+    rows: List[ResultRow]
+
+
+ParallelFuture = "Future[ParallelResult]"
+
+
+def _add(
+    pending: Union[Deque[ParallelFuture], Set[ParallelFuture]],
+    future: ParallelFuture,
+):
+    """Add a future to the pending futures."""
+    if isinstance(pending, deque):
+        pending.append(future)
+    else:
+        pending.add(future)
+
+
+class ParallelExecution:
+    """
+    An iterator over the `ParallelResult`s of a statement executed with
+    each of a sequence of parameter sets, using up to `max_workers`
+    threads each with its own cursor.
+
+    Results are yielded in the order of the parameter sets if `ordered`
+    is set, and otherwise as the statements complete. At most a few
+    statements per worker run ahead of the results being consumed.
+
+    If a statement fails, the statements still running are interrupted,
+    those not started are dropped, and its error is raised. The same
+    happens if the iterator is closed (or garbage collected) before it's
+    exhausted, or if `interrupt` is called from another thread.
+
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        connection: "Connection",
+        operation: SQLQuery,
+        seq_of_parameters: Iterable[Optional[QueryParameters]],
+        max_workers: Optional[int] = None,
+        ordered: bool = True,
+        timeout: Optional[float] = None,
+    ):
+        if max_workers is None:
+            max_workers = default_workers()
+        if max_workers < 1:
+            raise ValueError("`max_workers` must be at least 1.")
+        self._connection = connection
+        self._operation = operation
+        self._parameters = enumerate(seq_of_parameters)
+        self._max_workers = max_workers
+        self._ordered = ordered
+        self._timeout = timeout
+        # Cursors not in use by a statement, and all of the cursors.
+        self._free: "queue.SimpleQueue[Cursor]" = queue.SimpleQueue()
+        self._cursors: List["Cursor"] = []
+        self._lock = threading.Lock()
+        self._interrupted = False
+        self._results = self._run()
+
+    def __iter__(self) -> "ParallelExecution":
+        return self
+
+    def __next__(self) -> ParallelResult:
+        return next(self._results)
+
+    def __enter__(self) -> "ParallelExecution":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self) -> None:
+        """Stop executing statements, and close the cursors."""
+        self._results.close()
+
+    def interrupt(self) -> None:
+        """
+        Interrupt the running statements and drop the rest, from another
+        thread. Iterating raises `OperationalError`.
+
+        """
+        with self._lock:
+            self._interrupted = True
+            cursors = list(self._cursors)
+        for cursor in cursors:
+            try:
+                cursor.interrupt()
+            except NotSupportedError:
+                pass
+
+    def _take_cursor(self) -> "Cursor":
+        """Take a free cursor, or open a new one."""
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+        cursor = self._connection.cursor()
+        with self._lock:
+            self._cursors.append(cursor)
+        return cursor
+
+    def _execute(self, index: int, parameters: Optional[QueryParameters]):
+        """Run the statement with one parameter set, on a worker thread."""
+        if self._interrupted:
+            raise OperationalError("Parallel execution was interrupted.")
+        cursor = self._take_cursor()
+        try:
+            cursor.execute(self._operation, parameters, timeout=self._timeout)
+            rows = cursor.fetchall()
+        finally:
+            self._free.put(cursor)
+        return ParallelResult(index, parameters, rows)
+
+    def _submit(self, executor: ThreadPoolExecutor, count: int) -> List[ParallelFuture]:
+        """Submit up to `count` more statements."""
+        futures = []
+        for index, parameters in self._parameters:
+            futures.append(executor.submit(self._execute, index, parameters))
+            if len(futures) == count:
+                break
+        return futures
+
+    def _run(self) -> Iterator[ParallelResult]:
+        """Submit statements as results are consumed, yielding the results."""
+        executor = ThreadPoolExecutor(
+            self._max_workers, thread_name_prefix="pyduckdb-parallel"
+        )
+        # Futures in submission order, or as a set to wait on.
+        pending: Union[Deque[ParallelFuture], Set[ParallelFuture]]
+        pending = deque() if self._ordered else set()
+        exhausted = False
+        try:
+            for future in self._submit(
+                executor, self._max_workers * SUBMITTED_PER_WORKER
+            ):
+                _add(pending, future)
+            while pending:
+                if isinstance(pending, deque):
+                    future = pending.popleft()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    future = done.pop()
+                    pending.remove(future)
+                result = future.result()
+                for new in self._submit(executor, 1):
+                    _add(pending, new)
+                yield result
+            exhausted = True
+        finally:
+            if not exhausted:
+                for future in pending:
+                    future.cancel()
+                self.interrupt()
+            executor.shutdown(wait=True)
+            self._close_cursors()
+
+    def _close_cursors(self):
+        """Close the cursors, once no statements are running."""
+        with self._lock:
+            cursors, self._cursors = self._cursors, []
+        self._free = queue.SimpleQueue()
+        for cursor in cursors:
+            cursor.close()
@@ -0,0 +1,219 @@
+"""
+Scanning a read-only database file from several processes at once, for
+`pyduckdb.parallel.map_query`.
+
+Python code run on each fetched row is limited to one core by the GIL,
+however fast DuckDB returns the rows. `map_query` splits a query over
+one table into partitions, by `rowid` range or by predicates, and runs
+each in a worker process with its own read-only connection to the file,
+applying a function to each batch of fetched rows and sending back only
+its (optionally reduced) results.
+
+A partition is run by shadowing the table with a common table
+expression of the same name, holding just the partition's rows, so the
+query itself is unchanged. It must name the table without a schema, and
+the table must be in the `main` schema, which the expression reads it
+from (older DuckDB releases reject an expression reading a table of its
+own name unqualified, as a circular reference).
+
+"""
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, TypeVar
+from pep249 import QueryParameters, ResultRow, SQLQuery
+from .bulk import DEFAULT_BATCH_SIZE, quote_identifier
+from .connection import Connection
+from .exceptions import NotSupportedError, ProgrammingError
+from .parallel import default_workers
+from .sql import Token, identifier, referenced_tables, tokenise
+
+__all__ = ["map_query", "partition_queries"]
+
+T = TypeVar("T")
+BatchFunction = Callable[[List[ResultRow]], T]
+Reducer = Callable[[T, T], T]
+
+
+def _partitioned_table(tokens: List[Token], table: Optional[str]) -> str:
+    """The name of the table to partition, checking the query can be."""
+    if table is None:
+        tables = referenced_tables(tokens)
+        if tables is None or len(tables) != 1:
+            raise ProgrammingError(
+                "Can't tell which table to partition: pass its name as `table`."
+            )
+        (table,) = tables
+    table = table.lower()
+    for index in range(1, len(tokens)):
+        if identifier(tokens[index]) == table and tokens[index - 1][1] == ".":
+            raise NotSupportedError(
+                f"The partitioned table {table!r} must be named without a schema."
+            )
+    return table
+
+
+def partition_queries(
+    sql: SQLQuery,
+    table: str,
+    predicates: Sequence[str],
+) -> List[str]:
+    """
+    Rewrite a query to read just the rows of `table` (in the `main`
+    schema) matching each of `predicates` (SQL expressions over its
+    columns) in turn.
+
+    """
+    tokens = tokenise(sql)
+    first = tokens[0][1].upper() if tokens else ""
+    second = tokens[1][1].upper() if len(tokens) > 1 else ""
+    if first == "WITH" and second == "RECURSIVE":
+        raise NotSupportedError("Recursive queries can't be partitioned.")
+    name = quote_identifier(table)
+    # The table is read with its schema, so as not to refer to the common
+    # table expression itself.
+    source = f"main.{name}"
+    body = sql.lstrip()
+    if first == "WITH":
+        if body[:4].upper() != "WITH":
+            raise NotSupportedError(
+                "Queries starting with comments can't be partitioned."
+            )
+        # Add to the query's own common table expressions.
+        body = body[len("WITH") :]
+        return [
+            f"WITH {name} AS (SELECT * FROM {source} WHERE ({predicate})),{body}"
+            for predicate in predicates
+        ]
+    return [
+        f"WITH {name} AS (SELECT * FROM {source} WHERE ({predicate})) {body}"
+        for predicate in predicates
+    ]
+
+
+def _rowid_predicates(database: str, table: str, partitions: int) -> List[str]:
+    """Split a table's rowids into up to `partitions` contiguous ranges."""
+    name = quote_identifier(table)
+    with Connection(database, read_only=True) as connection:
+        low, high = connection.execute(
+            f"SELECT min(rowid), max(rowid) FROM {name};"
+        ).fetchone()
+    if low is None:
+        return ["rowid IS NOT NULL"]
+    size = -(-(high - low + 1) // partitions)
+    return [
+        f"rowid >= {start} AND rowid < {start + size}"
+        for start in range(low, high + 1, size)
+    ]
+
+
+# pylint: disable=too-many-arguments
+def _map_partition(
+    database: str,
+    sql: str,
+    parameters: Optional[QueryParameters],
+    func: BatchFunction,
+    reduce: Optional[Reducer],
+    batch_size: int,
+) -> Any:
+    """
+    Run one partition's query in a worker process, applying `func` to
+    each batch of rows. Returns the results or, if `reduce` is given,
+    whether there were any rows and their reduction.
+
+    """
+    results: List[Any] = []
+    reduced: Any = None
+    with Connection(database, read_only=True) as connection:
+        cursor = connection.cursor()
+        cursor.execute(sql, parameters)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            value = func(rows)
+            if reduce is None:
+                results.append(value)
+            elif not results:
+                results.append(True)
+                reduced = value
+            else:
+                reduced = reduce(reduced, value)
+    return results if reduce is None else (bool(results), reduced)
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def map_query(
+    database: str,
+    sql: SQLQuery,
+    func: BatchFunction,
+    *,
+    parameters: Optional[QueryParameters] = None,
+    partitions: Optional[int] = None,
+    predicates: Optional[Sequence[str]] = None,
+    table: Optional[str] = None,
+    processes: Optional[int] = None,
+    reduce: Optional[Reducer] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    mp_context: Optional[Any] = None,
+) -> Any:
+    """
+    Run a query over one table of a database file in several processes,
+    calling `func` with each batch of up to `batch_size` fetched rows.
+
+    The table (found from the query, or given as `table`) is split into
+    `partitions` `rowid` ranges (by default, one per process), or into
+    one partition per SQL expression in `predicates`. Each partition is
+    run by one of `processes` worker processes (by default, one per
+    CPU) with its own read-only connection, so the database mustn't be
+    open for writing by any process.
+
+    Without `reduce`, returns the list of `func`'s results, in partition
+    order. With it, each worker reduces its results as it goes (as with
+    `functools.reduce`), and the partitions' reductions are reduced in
+    turn into the value returned (or None, if no rows were fetched).
+
+    `func` and `reduce` must be picklable, so defined at the top level
+    of a module. Workers are started with `mp_context` (by default, the
+    "spawn" start method, as DuckDB can't be used in forked processes),
+    so scripts calling this need an `if __name__ == "__main__":` guard.
+
+    """
+    if processes is not None and processes < 1:
+        raise ValueError("`processes` must be at least 1.")
+    if partitions is not None and partitions < 1:
+        raise ValueError("`partitions` must be at least 1.")
+    if predicates is not None and not predicates:
+        raise ValueError("`predicates` must hold at least one predicate.")
+    if processes is None:
+        processes = default_workers()
+    table = _partitioned_table(tokenise(sql), table)
+    if predicates is None:
+        predicates = _rowid_predicates(database, table, partitions or processes)
+    elif partitions is not None:
+        raise ProgrammingError("Pass either `partitions` or `predicates`.")
+    queries = partition_queries(sql, table, predicates)
+    if mp_context is None:
+        mp_context = multiprocessing.get_context("spawn")
+
+    task = functools.partial(
+        _map_partition,
+        database,
+        parameters=parameters,
+        func=func,
+        reduce=reduce,
+        batch_size=batch_size,
+    )
+    with ProcessPoolExecutor(min(processes, len(queries)), mp_context) as executor:
+        futures = [executor.submit(task, query) for query in queries]
+        try:
+            results = [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    if reduce is None:
+        return [value for values in results for value in values]
+    results = [value for any_rows, value in results if any_rows]
+    return functools.reduce(reduce, results) if results else None
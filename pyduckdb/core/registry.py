@@ -0,0 +1,104 @@
+"""
+A process-wide registry of shared DuckDB database instances.
+
+Connections to the same database file are served as cursors of a single
+DuckDB connection, so they share one database instance (and one buffer
+pool). The instance is closed when its last connection is released.
+
+"""
+# pylint: disable=c-extension-no-member
+import os
+import threading
+from typing import Dict, NamedTuple, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from duckdb import DuckDBPyConnection  # pylint: disable=no-name-in-module
+
+__all__ = [
+    "DatabaseKey",
+    "database_key",
+    "acquire_database",
+    "release_database",
+    "reference_count",
+]
+
+IN_MEMORY_DATABASES = ("", ":memory:")
+
+
+class DatabaseKey(NamedTuple):
+    """The key used to share a database instance."""
+
+    path: str
+    read_only: bool
+
+
+class _SharedDatabase:
+    """A shared DuckDB instance and a count of its users."""
+
+    __slots__ = ("instance", "references")
+
+    def __init__(self, instance: "DuckDBPyConnection"):
+        self.instance = instance
+        self.references = 0
+
+
+_LOCK = threading.Lock()
+_DATABASES: Dict[DatabaseKey, _SharedDatabase] = {}
+
+
+def database_key(database: str, read_only: bool) -> Optional[DatabaseKey]:
+    """
+    Return the key under which a database is shared, or None if the
+    database can't be shared (in-memory databases are always private).
+
+    """
+    if database in IN_MEMORY_DATABASES:
+        return None
+    return DatabaseKey(os.path.realpath(database), read_only)
+
+
+def acquire_database(key: DatabaseKey) -> "DuckDBPyConnection":
+    """
+    Return a new DuckDB cursor of the shared instance for `key`, opening
+    the instance if needed. Each call must be paired with a call to
+    `release_database`.
+
+    """
+    import duckdb  # pylint: disable=import-outside-toplevel
+
+    with _LOCK:
+        shared = _DATABASES.get(key)
+        if shared is None:
+            shared = _SharedDatabase(duckdb.connect(key.path, key.read_only))
+            _DATABASES[key] = shared
+        cursor = shared.instance.cursor()
+        shared.references += 1
+        return cursor
+
+
+def release_database(key: DatabaseKey):
+    """
+    Release a reference to the shared instance for `key`, closing it if
+    there are no users left.
+
+    """
+    with _LOCK:
+        shared = _DATABASES.get(key)
+        if shared is None:
+            return
+        shared.references -= 1
+        if shared.references > 0:
+            return
+        del _DATABASES[key]
+
+    try:
+        shared.instance.close()
+    except (ImportError, RuntimeError):  # Interpreter shutting down.
+        pass
+
+
+def reference_count(key: DatabaseKey) -> int:
+    """Return the number of users of the shared instance for `key`."""
+    with _LOCK:
+        shared = _DATABASES.get(key)
+        return 0 if shared is None else shared.references
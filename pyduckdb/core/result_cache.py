@@ -0,0 +1,715 @@
+"""
+A cache of read-only query results, shared by the connections to one
+database which are given the same `ResultCache`.
+
+Results are keyed by the statement's SQL (with whitespace and comments
+normalised) and its parameters. Only single `SELECT`-like statements
+reading tables and views by name are cached: statements calling
+volatile functions such as `random()` or `now()`, sampling, or reading
+from table functions or files aren't, and neither are those on
+temporary tables, which are private to a DuckDB cursor.
+
+A missed result is recorded as the cursor's rows are fetched, and stored
+once they've all been fetched, unless it grows past the cache's size
+first. Fetching it by column (as a DataFrame, say) stops the recording.
+
+Writes and `executemany` calls through any connection using the cache
+invalidate the results which read from the tables they touch (or, in a
+transaction, when it commits), results reading from views are
+invalidated by any write, and everything is invalidated by DDL and by
+statements which can't be analysed. Writes made outside pyduckdb, or
+through connections without the cache, aren't seen.
+
+"""
+# pylint: disable=c-extension-no-member
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from time import monotonic
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+)
+from pep249 import ColumnDescription, QueryParameters, ResultRow, ResultSet, SQLQuery
+from .adapters import rows_converter
+from .exceptions import NotSupportedError
+from .lazy_rows import DEFAULT_CHUNK_SIZE, DEFAULT_MEMORY_BUDGET, LazyRows
+from .rows import BatchConverter, RowFactory, batch_converter
+from .sql import (
+    is_single_statement,
+    referenced_tables,
+    table_name,
+    tokenise,
+)
+from .utils import raise_if_closed
+
+if TYPE_CHECKING:
+    # pylint: disable=cyclic-import
+    import numpy
+    import pandas
+    import pyarrow
+    from pyduckdb.core.connection import Connection
+    from pyduckdb.core.cursor import Cursor
+    from pyduckdb.core.explain import QueryPlan
+    from pyduckdb.core.ingest import CopyResult
+
+__all__ = [
+    "CacheKey",
+    "ResultCacheStats",
+    "CachedResult",
+    "ResultCache",
+    "ResultRecorder",
+    "CachedCursor",
+    "analyse_query",
+    "written_tables",
+    "table_names",
+    "parameters_key",
+    "estimate_size",
+    "BEGIN_STATEMENTS",
+    "COMMIT_STATEMENTS",
+    "ROLLBACK_STATEMENTS",
+]
+
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+BEGIN_STATEMENTS = frozenset(("BEGIN", "START"))
+COMMIT_STATEMENTS = frozenset(("COMMIT", "END"))
+ROLLBACK_STATEMENTS = frozenset(("ROLLBACK", "ABORT"))
+READ_STATEMENTS = frozenset(
+    ("SELECT", "WITH", "VALUES", "FROM", "TABLE", "DESCRIBE", "SHOW", "SUMMARIZE")
+)
+# Statements which change no tables, besides the reads and transactions.
+HARMLESS_STATEMENTS = frozenset(("CHECKPOINT", "ANALYZE", "VACUUM"))
+CACHEABLE_STATEMENTS = frozenset(("SELECT", "WITH", "VALUES", "FROM"))
+
+_VOLATILE = frozenset(
+    (
+        "RANDOM",
+        "SETSEED",
+        "UUID",
+        "GEN_RANDOM_UUID",
+        "NEXTVAL",
+        "CURRVAL",
+        "NOW",
+        "TODAY",
+        "CURRENT_DATE",
+        "CURRENT_TIME",
+        "CURRENT_TIMESTAMP",
+        "CURRENT_LOCALTIME",
+        "CURRENT_LOCALTIMESTAMP",
+        "LOCALTIME",
+        "LOCALTIMESTAMP",
+        "GET_CURRENT_TIME",
+        "GET_CURRENT_TIMESTAMP",
+        "TRANSACTION_TIMESTAMP",
+        "SAMPLE",
+        "TABLESAMPLE",
+    )
+)
+_WRITE_WORDS = frozenset(("INSERT", "UPDATE", "DELETE", "COPY", "CREATE", "DROP"))
+CacheKey = Tuple[str, Hashable]
+
+
+@lru_cache(maxsize=256)
+def analyse_query(operation: SQLQuery) -> Optional[Tuple[str, FrozenSet[str]]]:
+    """
+    Return the normalised SQL of a cacheable read statement and the
+    names of the tables and views it reads, or None if it can't be
+    cached.
+
+    """
+    tokens = tokenise(operation)
+    if (
+        not tokens
+        or tokens[0][0] != "word"
+        or tokens[0][1].upper() not in CACHEABLE_STATEMENTS
+        or not is_single_statement(tokens)
+    ):
+        return None
+    words = {text.upper() for kind, text in tokens if kind == "word"}
+    if not words.isdisjoint(_VOLATILE) or not words.isdisjoint(_WRITE_WORDS):
+        return None
+    tables = referenced_tables(tokens)
+    if tables is None:
+        return None
+    if tokens[-1][1] == ";":
+        tokens = tokens[:-1]
+    return " ".join(text for _, text in tokens), tables
+
+
+@lru_cache(maxsize=256)
+def written_tables(operation: SQLQuery) -> Optional[FrozenSet[str]]:
+    """
+    Return the tables a statement may change: none for reads and
+    transaction statements, or None if it can't be told (for DDL, and
+    anything unrecognised).
+
+    """
+    tokens = tokenise(operation)
+    if not tokens:
+        return frozenset()
+    if not is_single_statement(tokens) or tokens[0][0] != "word":
+        return None
+    kind = tokens[0][1].upper()
+    words = [
+        text.upper() if token_kind == "word" else "" for token_kind, text in tokens
+    ]
+    if kind in READ_STATEMENTS:
+        if not _WRITE_WORDS.isdisjoint(words):
+            return None
+        return frozenset()
+    if kind == "EXPLAIN":
+        if "ANALYZE" in words[1:3]:
+            return None if not _WRITE_WORDS.isdisjoint(words) else frozenset()
+        return frozenset()
+    if kind in HARMLESS_STATEMENTS or kind in BEGIN_STATEMENTS:
+        return frozenset()
+    if kind in COMMIT_STATEMENTS or kind in ROLLBACK_STATEMENTS:
+        return frozenset()
+
+    target = None
+    if kind == "INSERT" and "INTO" in words:
+        target = words.index("INTO") + 1
+    elif kind == "UPDATE":
+        target = 1
+    elif kind == "DELETE" and len(words) > 1 and words[1] == "FROM":
+        target = 2
+    elif kind == "TRUNCATE":
+        target = 2 if len(words) > 1 and words[1] == "TABLE" else 1
+    elif kind == "COPY":
+        if len(tokens) > 1 and tokens[1][1] == "(":
+            return frozenset()  # COPY (query) TO ...
+        name, index = table_name(tokens, 1)
+        if index < len(tokens) and tokens[index][1] == "(":  # A column list.
+            while index < len(tokens) and tokens[index][1] != ")":
+                index += 1
+            index += 1
+        if name is not None and index < len(words) and words[index] == "TO":
+            return frozenset()
+        target = 1
+    if target is None:
+        return None
+    name, _ = table_name(tokens, target)
+    return None if name is None else frozenset((name,))
+
+
+def table_names(table: str) -> Optional[FrozenSet[str]]:
+    """
+    The names results from a table are invalidated by, given the table's
+    name as in SQL (quoted or qualified), or None if it isn't a name.
+
+    """
+    name, _ = table_name(tokenise(table), 0)
+    return None if name is None else frozenset((name,))
+
+
+def parameters_key(parameters: Optional[QueryParameters]) -> Optional[Hashable]:
+    """
+    A hashable key for a statement's parameters, including their types
+    (so that `1`, `1.0` and `True` are told apart), or None if they
+    aren't hashable.
+
+    """
+    if parameters is None:
+        key: Hashable = ()
+    elif isinstance(parameters, Mapping):
+        key = tuple(
+            sorted((name, type(value), value) for name, value in parameters.items())
+        )
+    else:
+        key = tuple((type(value), value) for value in parameters)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def estimate_size(rows: Sequence[ResultRow]) -> int:
+    """Estimate the memory used by rows of Python values, in bytes."""
+    getsizeof = sys.getsizeof
+    return sum(getsizeof(row) + sum(map(getsizeof, row)) for row in rows)
+
+
+class ResultCacheStats(NamedTuple):
+    """
+    A snapshot of a result cache's counters, and the memory used by its
+    results (estimated, in bytes).
+
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    entries: int
+    size: int
+    max_bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        """The share of lookups which were hits, from 0 to 1."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CachedResult(NamedTuple):
+    """
+    A cached result. `tables` are the tables it depends on, or None if
+    any write invalidates it.
+
+    """
+
+    description: Optional[Sequence[ColumnDescription]]
+    rows: Sequence[ResultRow]
+    size: int
+    tables: Optional[FrozenSet[str]]
+    expires_at: Optional[float]
+
+
+# pylint: disable=too-many-instance-attributes
+class ResultCache:
+    """
+    An LRU cache of query results, holding up to about `max_bytes` of
+    rows. If `ttl` is set, results expire after that many seconds.
+
+    Pass the same cache to each connection to a database with
+    `result_cache`, so that they all see each other's writes. It can be
+    used from several threads at once.
+
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[CacheKey, CachedResult]" = OrderedDict()
+        # The keys of results reading from each table, and of results
+        # which any write invalidates.
+        self._by_table: Dict[str, Set[CacheKey]] = {}
+        self._any_write: Set[CacheKey] = set()
+        # Table and view names, read from the catalog when needed, and
+        # dropped after DDL.
+        self._catalog: Optional[Dict[str, str]] = None
+        # Bumped by every invalidation, so results read before a write
+        # finished aren't stored after it.
+        self.version = 0
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def expiry(self) -> Optional[float]:
+        """When a result stored now expires, if there's a TTL."""
+        if self.ttl is None:
+            return None
+        return monotonic() + self.ttl
+
+    def get(self, key: CacheKey) -> Optional[CachedResult]:
+        """Look up a result, counting a hit or a miss."""
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None and (
+                result.expires_at is not None and result.expires_at <= monotonic()
+            ):
+                self._remove(key)
+                result = None
+            if result is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def dependencies(
+        self, tables: FrozenSet[str], read_catalog: Callable[[], Dict[str, str]]
+    ) -> Tuple[bool, Optional[FrozenSet[str]]]:
+        """
+        Check the tables a query reads from against the catalog, read
+        with `read_catalog` (as a map of names to "table" or "view") if
+        it isn't known. Returns whether the query can be cached (it can't
+        read from temporary tables, which aren't in the catalog), and
+        the tables its result depends on (None if it reads from a view).
+
+        """
+        catalog = self._catalog
+        if catalog is None:
+            catalog = read_catalog()
+            with self._lock:
+                self._catalog = catalog
+        dependencies: Optional[FrozenSet[str]] = tables
+        for table in tables:
+            kind = catalog.get(table)
+            if kind is None:
+                return False, None
+            if kind != "table":
+                dependencies = None
+        return True, dependencies
+
+    def put(self, key: CacheKey, result: CachedResult, version: int) -> bool:
+        """
+        Store a result read at `version`, unless there's been a write
+        since. Returns whether it was stored.
+
+        """
+        if result.size > self.max_bytes:
+            return False
+        with self._lock:
+            if version != self.version:
+                return False
+            if key in self._results:
+                self._remove(key)
+            self._results[key] = result
+            self._size += result.size
+            if result.tables is None:
+                self._any_write.add(key)
+            else:
+                for table in result.tables:
+                    self._by_table.setdefault(table, set()).add(key)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._results)))
+                self.evictions += 1
+            return True
+
+    def _remove(self, key: CacheKey):
+        """Remove a result, with the lock held."""
+        result = self._results.pop(key)
+        self._size -= result.size
+        if result.tables is None:
+            self._any_write.discard(key)
+            return
+        for table in result.tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def invalidate(self, tables: Optional[FrozenSet[str]] = None):
+        """
+        Drop the results which depend on any of `tables`, or (if None)
+        all results, and the catalog.
+
+        """
+        with self._lock:
+            self.version += 1
+            if tables is None:
+                keys: Set[CacheKey] = set(self._results)
+                self._catalog = None
+            else:
+                keys = set(self._any_write)
+                for table in tables:
+                    keys.update(self._by_table.get(table, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+    def clear(self):
+        """Drop all results."""
+        self.invalidate(None)
+
+    def stats(self) -> ResultCacheStats:
+        """Return a snapshot of the counters."""
+        with self._lock:
+            return ResultCacheStats(
+                self.hits,
+                self.misses,
+                self.evictions,
+                self.invalidations,
+                len(self._results),
+                self._size,
+                self.max_bytes,
+            )
+
+
+class ResultRecorder:
+    """
+    Records the rows of a missed result as a cursor fetches them, and
+    stores the result in the cache once they've all been fetched.
+
+    """
+
+    __slots__ = ("cache", "key", "tables", "version", "description", "rows", "size")
+
+    def __init__(
+        self,
+        cache: ResultCache,
+        key: CacheKey,
+        tables: Optional[FrozenSet[str]],
+        version: int,
+    ):
+        self.cache = cache
+        self.key = key
+        self.tables = tables
+        self.version = version
+        self.description: Optional[Sequence[ColumnDescription]] = None
+        self.rows: List[ResultRow] = []
+        self.size = 0
+
+    def record(self, rows: Sequence[ResultRow], exhausted: bool) -> bool:
+        """
+        Record fetched rows (before any conversion), storing the result
+        if they were the last. Returns False once there's nothing more
+        to record: the result has been stored, or it's too big to be.
+
+        """
+        self.rows.extend(rows)
+        self.size += estimate_size(rows)
+        if self.size > self.cache.max_bytes:
+            self.rows = []
+            return False
+        if not exhausted:
+            return True
+        cache = self.cache
+        result = CachedResult(
+            self.description, self.rows, self.size, self.tables, cache.expiry()
+        )
+        cache.put(self.key, result, self.version)
+        return False
+
+
+class CachedCursor:
+    """
+    A read-only, cursor-like view of a cached result, returned by
+    `Connection.execute` on a cache hit. Rows are converted by the
+    registered converters and the `row_factory` as they're fetched, as
+    for a `Cursor`, but statements can't be executed on it: use
+    `Connection.cursor()` for that. The rest of the `Cursor` interface
+    is there, so the two can be used alike: `explain` runs on a new
+    cursor, and the transaction and interrupt methods do nothing, as
+    no transaction is open and no statement is executing.
+
+    """
+
+    arraysize = 1
+
+    def __init__(
+        self,
+        connection: "Connection",
+        result: CachedResult,
+        operation: SQLQuery,
+        parameters: Optional[QueryParameters],
+    ):
+        self._connection = weakref.proxy(connection)
+        self._result = result
+        self._operation = operation
+        self._parameters = parameters
+        self._position = 0
+        self._closed = False
+        self.row_factory: Optional[RowFactory] = connection.row_factory
+        self._convert_rows: Optional[BatchConverter] = None
+        self.statement_timeout: Optional[float] = connection.statement_timeout
+
+    @property
+    def connection(self) -> "Connection":
+        return self._connection
+
+    @property
+    def description(self) -> Optional[Sequence[ColumnDescription]]:
+        return self._result.description
+
+    @property
+    def rowcount(self) -> int:
+        return -1
+
+    def close(self) -> None:
+        """Close the cursor."""
+        self._closed = True
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def interrupt(self) -> None:
+        """Do nothing, as no statement is executing."""
+
+    def nextset(self) -> Optional[bool]:
+        raise NotSupportedError(
+            "DuckDB Cursors do not support more than one result set."
+        )
+
+    @raise_if_closed
+    def setinputsizes(self, sizes: Any) -> None:
+        pass
+
+    @raise_if_closed
+    def setoutputsize(self, size: int, column: Optional[int] = None) -> None:
+        pass
+
+    @raise_if_closed
+    def explain(
+        self,
+        operation: SQLQuery,
+        parameters: Optional[QueryParameters] = None,
+        *,
+        analyze: bool = True,
+    ) -> "QueryPlan":
+        """Return the plan for a query, from a new cursor. See `Cursor.explain`."""
+        cursor = self._connection.cursor()
+        try:
+            return cursor.explain(operation, parameters, analyze=analyze)
+        finally:
+            cursor.close()
+
+    def __enter__(self) -> "CachedCursor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _take(self, size: Optional[int]) -> ResultSet:
+        """Take the next `size` rows (or all of them), converted."""
+        rows = self._result.rows
+        start = self._position
+        stop = len(rows) if size is None else min(start + size, len(rows))
+        self._position = stop
+        taken = list(rows[start:stop])
+        if not taken:
+            return taken
+        convert = self._convert_rows
+        if convert is None:
+            convert = self._convert_rows = self._make_converter()
+        return convert(taken)
+
+    def _make_converter(self) -> BatchConverter:
+        """Make the function converting the result's rows."""
+        convert_types = rows_converter(self.description)
+        make_rows = None
+        if self.row_factory is not None:
+            make_rows = batch_converter(self.row_factory, self)
+        if convert_types is None:
+            return make_rows or list
+        if make_rows is None:
+            return convert_types
+        return lambda rows: make_rows(convert_types(rows))
+
+    @raise_if_closed
+    def fetchone(self) -> Optional[ResultRow]:
+        rows = self._take(1)
+        return rows[0] if rows else None
+
+    @raise_if_closed
+    def fetchmany(self, size: Optional[int] = None) -> ResultSet:
+        return self._take(self.arraysize if size is None else size)
+
+    @raise_if_closed
+    def fetchall(self, lazy: bool = False) -> ResultSet:
+        """
+        Fetch the remaining rows. If `lazy` is set, return them as a
+        `LazyRows` sequence (see `fetch_sequence`).
+
+        """
+        if lazy:
+            return self.fetch_sequence()
+        return self._take(None)
+
+    @raise_if_closed
+    def fetch_sequence(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    ) -> LazyRows:
+        """Return the remaining rows as a `LazyRows` sequence, as for a `Cursor`."""
+        return LazyRows(lambda: self._take(chunk_size), memory_budget)
+
+    def _execute_again(self) -> Tuple["Cursor", int]:
+        """
+        Run the query again on a new cursor, for the fetches which can't
+        be made from the cached rows. Returns it and the number of rows
+        already fetched here, which the caller skips.
+
+        DuckDB drops the rest of a chunk from the columnar fetches once
+        any of its rows have been fetched, so they're sliced instead.
+
+        """
+        cursor = self._connection.cursor()
+        cursor.execute(self._operation, self._parameters)
+        skip, self._position = self._position, len(self._result.rows)
+        return cursor, skip
+
+    @raise_if_closed
+    def fetchnumpy(self) -> Dict[str, "numpy.ndarray"]:
+        """Fetch the remaining rows as NumPy arrays, by running the query again."""
+        cursor, skip = self._execute_again()
+        columns = cursor.fetchnumpy()
+        if not skip:
+            return columns
+        return {name: column[skip:] for name, column in columns.items()}
+
+    @raise_if_closed
+    def fetchdf(self) -> "pandas.DataFrame":
+        """Fetch the remaining rows as a DataFrame, by running the query again."""
+        cursor, skip = self._execute_again()
+        frame = cursor.fetchdf()
+        if not skip:
+            return frame
+        return frame.iloc[skip:].reset_index(drop=True)
+
+    @raise_if_closed
+    def fetch_arrow_table(self) -> "pyarrow.Table":
+        """Fetch the remaining rows as a PyArrow Table, by running the query again."""
+        cursor, skip = self._execute_again()
+        return cursor.fetch_arrow_table().slice(skip)
+
+    @raise_if_closed
+    def fetch_record_batches(
+        self, rows_per_batch: Optional[int] = None
+    ) -> Iterator["pyarrow.RecordBatch"]:
+        """
+        Iterate over the remaining rows as PyArrow RecordBatches, by running
+        the query again. See `Cursor.fetch_record_batches`.
+
+        """
+        cursor, skip = self._execute_again()
+        if not skip:
+            if rows_per_batch is None:
+                return cursor.fetch_record_batches()
+            return cursor.fetch_record_batches(rows_per_batch)
+        table = cursor.fetch_arrow_table().slice(skip)
+        return iter(table.to_batches(max_chunksize=rows_per_batch))
+
+    @raise_if_closed
+    def copy_to(self, destination: Any, **options: Any) -> "CopyResult":
+        """
+        Write the remaining rows to a path or file, by running the query
+        again. See `Cursor.copy_to`.
+
+        """
+        cursor, skip = self._execute_again()
+        if skip:
+            cursor.fetchmany(skip)
+        return cursor.copy_to(destination, **options)
+
+    def __iter__(self) -> Iterator[ResultRow]:
+        return iter(self.fetchall())
+
+    def __next__(self) -> ResultRow:
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def _not_supported(self, *_args: Any, **_kwargs: Any) -> Any:
+        raise NotSupportedError(
+            "Statements can't be executed on a cached result. Use a cursor "
+            "from `Connection.cursor()`."
+        )
+
+    execute = executemany = executescript = insert_many = callproc = _not_supported
@@ -0,0 +1,141 @@
+"""
+Row factories, set as `row_factory` on a connection or cursor.
+
+As with `sqlite3`, a row factory is called with the cursor and each row
+as a tuple. A factory can also give a `batch_factory(cursor)` function,
+which is called once per result and returns a function converting a
+list of rows at a time: `Row` does this, so that the column names are
+only looked up once per result rather than once per row.
+
+"""
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    TYPE_CHECKING,
+)
+from pep249 import ColumnDescription, ResultRow
+
+if TYPE_CHECKING:
+    from pyduckdb.core.cursor import Cursor  # pylint: disable=cyclic-import
+
+__all__ = [
+    "Row",
+    "RowFactory",
+    "BatchConverter",
+    "ColumnIndex",
+    "column_index",
+    "batch_converter",
+]
+
+RowFactory = Callable[["Cursor", ResultRow], Any]
+BatchConverter = Callable[[Sequence[ResultRow]], List[Any]]
+
+
+class ColumnIndex(NamedTuple):
+    """
+    A result's column names, and a map of them to their positions. Where
+    names are repeated, the first column wins, and lower case names are
+    included for case-insensitive lookups.
+
+    """
+
+    names: Tuple[str, ...]
+    positions: Dict[str, int]
+
+
+def column_index(description: Optional[Sequence[ColumnDescription]]) -> ColumnIndex:
+    """Index the column names from a cursor's description."""
+    names = tuple(column[0] for column in description or ())
+    positions: Dict[str, int] = {}
+    for position, name in enumerate(names):
+        positions.setdefault(name, position)
+    for position, name in enumerate(names):
+        positions.setdefault(name.lower(), position)
+    return ColumnIndex(names, positions)
+
+
+class Row:
+    """
+    A result row, indexed by position or by column name, like
+    `sqlite3.Row`. Column names are matched exactly, then
+    case-insensitively.
+
+    Rows from the same result share one map of column names, so a row
+    costs little more than its tuple of values.
+
+    """
+
+    __slots__ = ("_columns", "_values")
+
+    def __init__(self, columns: Union[ColumnIndex, "Cursor"], values: ResultRow):
+        # Called with the cursor when used as a plain row factory.
+        if type(columns) is not ColumnIndex:  # pylint: disable=unidiomatic-typecheck
+            columns = column_index(columns.description)
+        self._columns = columns
+        self._values = tuple(values)
+
+    @classmethod
+    def batch_factory(cls, cursor: "Cursor") -> BatchConverter:
+        """Return a function making rows for the cursor's current result."""
+        make_row = partial(cls, column_index(cursor.description))
+        return lambda rows: list(map(make_row, rows))
+
+    def __getitem__(self, key: Union[int, slice, str]) -> Any:
+        if not isinstance(key, str):
+            return self._values[key]
+        positions = self._columns.positions
+        position = positions.get(key)
+        if position is None:
+            position = positions.get(key.lower())
+            if position is None:
+                raise IndexError(f"No column named {key!r}.")
+        return self._values[position]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._values)
+
+    def keys(self) -> List[str]:
+        """The column names, in order."""
+        return list(self._columns.names)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Row):
+            return NotImplemented
+        return (
+            self._values == other._values
+            and self._columns.names == other._columns.names
+        )
+
+    def __hash__(self) -> int:
+        return hash((self._columns.names, self._values))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={value!r}"
+            for name, value in zip(self._columns.names, self._values)
+        )
+        return f"Row({fields})"
+
+
+def batch_converter(factory: RowFactory, cursor: "Cursor") -> BatchConverter:
+    """
+    Return a function applying a row factory to a list of rows from the
+    cursor's current result.
+
+    """
+    batch_factory = getattr(factory, "batch_factory", None)
+    if batch_factory is not None:
+        return batch_factory(cursor)
+    return lambda rows: [factory(cursor, values) for values in rows]
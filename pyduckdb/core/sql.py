@@ -0,0 +1,203 @@
+"""
+A small SQL tokeniser, and the table names found with it, shared by the
+result cache (to tell what a statement reads and writes) and
+`map_query` (to find the table to partition).
+
+This isn't a parser: it only knows enough of DuckDB's syntax to find
+the tables named after `FROM`, `JOIN` and the write statements' keywords,
+and callers treat anything it can't make sense of conservatively.
+
+"""
+import re
+from typing import FrozenSet, List, Optional, Set, Tuple
+from pep249 import SQLQuery
+
+__all__ = [
+    "Token",
+    "tokenise",
+    "identifier",
+    "is_single_statement",
+    "table_name",
+    "referenced_tables",
+]
+
+_TOKEN = re.compile(
+    r"""
+    ('(?:[^']|'')*')                       # String literal.
+    | ("(?:[^"]|"")*")                     # Quoted identifier.
+    | --[^\n]*                             # Line comment.
+    | /\*.*?\*/                            # Block comment.
+    | ([A-Za-z_][\w$]*)                    # Word.
+    | (\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)     # Number.
+    | (\S)                                 # Anything else.
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+# Words which can follow a table name, and so aren't its alias.
+_CLAUSE_WORDS = frozenset(
+    (
+        "WHERE",
+        "GROUP",
+        "ORDER",
+        "LIMIT",
+        "OFFSET",
+        "HAVING",
+        "WINDOW",
+        "QUALIFY",
+        "UNION",
+        "INTERSECT",
+        "EXCEPT",
+        "JOIN",
+        "INNER",
+        "LEFT",
+        "RIGHT",
+        "FULL",
+        "OUTER",
+        "CROSS",
+        "NATURAL",
+        "POSITIONAL",
+        "ASOF",
+        "ANTI",
+        "SEMI",
+        "ON",
+        "USING",
+        "PIVOT",
+        "UNPIVOT",
+        "SELECT",
+        "FROM",
+        "SET",
+        "VALUES",
+        "RETURNING",
+        "BY",
+        "DEFAULT",
+    )
+)
+
+# Words which can come before a parenthesis that isn't a function call's.
+_NOT_CALLS = frozenset(
+    ("IN", "EXISTS", "ANY", "ALL", "SOME", "AS", "FROM", "JOIN", "LATERAL", "ON")
+    + ("USING", "SELECT", "WHERE", "AND", "OR", "NOT", "UNION", "ARRAY", "MATERIALIZED")
+)
+
+Token = Tuple[str, str]
+
+
+def tokenise(operation: SQLQuery) -> List[Token]:
+    """
+    Split SQL into (kind, text) tokens, dropping comments. Kinds are
+    "string", "quoted", "word", "number" and "symbol".
+
+    """
+    tokens = []
+    for match in _TOKEN.finditer(operation):
+        string, quoted, word, number, symbol = match.groups()
+        if string is not None:
+            tokens.append(("string", string))
+        elif quoted is not None:
+            tokens.append(("quoted", quoted))
+        elif word is not None:
+            tokens.append(("word", word))
+        elif number is not None:
+            tokens.append(("number", number))
+        elif symbol is not None:
+            tokens.append(("symbol", symbol))
+    return tokens
+
+
+def identifier(token: Token) -> Optional[str]:
+    """The name a token refers to, if it's an identifier."""
+    kind, text = token
+    if kind == "quoted":
+        return text[1:-1].replace('""', '"').lower()
+    if kind == "word":
+        return text.lower()
+    return None
+
+
+def is_single_statement(tokens: List[Token]) -> bool:
+    """Whether the tokens hold one statement, ignoring a trailing `;`."""
+    semicolons = [index for index, token in enumerate(tokens) if token[1] == ";"]
+    return all(index == len(tokens) - 1 for index in semicolons)
+
+
+def table_name(tokens: List[Token], start: int) -> Tuple[Optional[str], int]:
+    """
+    Read a possibly qualified table name starting at `start`, returning
+    its last part (or None if there isn't a name there) and the index
+    after it.
+
+    """
+    name = identifier(tokens[start]) if start < len(tokens) else None
+    if name is None:
+        return None, start
+    index = start + 1
+    while (
+        index + 1 < len(tokens)
+        and tokens[index][1] == "."
+        and identifier(tokens[index + 1]) is not None
+    ):
+        name = identifier(tokens[index + 1])
+        index += 2
+    return name, index
+
+
+def referenced_tables(tokens: List[Token]) -> Optional[FrozenSet[str]]:
+    """
+    The tables and views a read statement reads from by name, or None if
+    it reads from anything else (a table function or a file).
+
+    """
+    # Common table expressions are defined as `name AS (...)`.
+    ctes = {
+        identifier(tokens[index])
+        for index in range(len(tokens) - 2)
+        if tokens[index + 1][1].upper() == "AS"
+        and tokens[index + 2][1].upper() in ("(", "MATERIALIZED", "NOT")
+    }
+    tables: Set[str] = set()
+    # Whether each open parenthesis is a function call's, in which FROM
+    # is part of the arguments, as in `EXTRACT(year FROM day)`.
+    calls: List[bool] = []
+    index = 0
+    while index < len(tokens):
+        kind, text = tokens[index]
+        keyword = text.upper() if kind == "word" else ""
+        index += 1
+        if text == "(":
+            previous = tokens[index - 2] if index > 1 else ("symbol", "")
+            calls.append(
+                previous[0] in ("word", "quoted")
+                and previous[1].upper() not in _NOT_CALLS
+            )
+            continue
+        if text == ")":
+            if calls:
+                calls.pop()
+            continue
+        if keyword not in ("FROM", "JOIN") or (calls and calls[-1]):
+            continue
+        while index < len(tokens):
+            kind, text = tokens[index]
+            if text == "(":  # A subquery, whose tables are found in turn.
+                break
+            if kind in ("string", "number"):
+                return None
+            name, index = table_name(tokens, index)
+            if name is None or (index < len(tokens) and tokens[index][1] == "("):
+                return None
+            if name not in ctes:
+                tables.add(name)
+            # Skip an alias.
+            if index < len(tokens) and tokens[index][1].upper() == "AS":
+                index += 2
+            elif (
+                index < len(tokens)
+                and tokens[index][0] in ("word", "quoted")
+                and tokens[index][1].upper() not in _CLAUSE_WORDS
+            ):
+                index += 1
+            if keyword == "FROM" and index < len(tokens) and tokens[index][1] == ",":
+                index += 1
+                continue
+            break
+    return frozenset(tables)
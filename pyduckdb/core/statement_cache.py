@@ -0,0 +1,142 @@
+"""
+An LRU cache of parsed statements, like SQLite's `cached_statements`.
+
+DuckDB's Python API doesn't expose prepared statement handles, but it
+can parse SQL into statement objects (`extract_statements`), which can
+be executed again with parameters bound as usual. Caching those skips
+parsing the SQL text on every call. Parsed statements don't belong to
+any DuckDB cursor, so one cache is shared by a connection's cursors.
+
+"""
+# pylint: disable=c-extension-no-member
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional, TYPE_CHECKING
+from pep249 import SQLQuery, QueryParameters
+
+if TYPE_CHECKING:
+    from duckdb import DuckDBPyConnection  # pylint: disable=no-name-in-module
+
+__all__ = ["StatementCacheStats", "StatementCache", "statement_kind"]
+
+_FIRST_KEYWORD = re.compile(r"[\s(]*([A-Za-z]+)")
+CACHEABLE_STATEMENTS = frozenset(
+    ("SELECT", "WITH", "VALUES", "FROM", "INSERT", "UPDATE", "DELETE")
+)
+INVALIDATING_STATEMENTS = frozenset(("CREATE", "DROP", "ALTER"))
+
+
+class StatementCacheStats(NamedTuple):
+    """A snapshot of a connection's statement cache counters."""
+
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+
+def statement_kind(operation: SQLQuery) -> Optional[str]:
+    """Return the leading keyword of a SQL statement, in upper case."""
+    match = _FIRST_KEYWORD.match(operation)
+    if match is None:
+        return None
+    return match.group(1).upper()
+
+
+class StatementCache:
+    """
+    An LRU cache of up to `capacity` parsed statements for a connection,
+    keyed by their SQL text. Scripts of several statements aren't
+    cached.
+
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._statements: "OrderedDict[str, Any]" = OrderedDict()
+        # Cursors of a thread-safe connection share the cache.
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Drop every cached statement."""
+        with self._lock:
+            self._statements.clear()
+            self.invalidations += 1
+
+    def stats(self) -> StatementCacheStats:
+        """Return a snapshot of the counters."""
+        return StatementCacheStats(
+            self.hits, self.misses, self.evictions, self.invalidations
+        )
+
+    def _statement(
+        self, duckdb_cursor: "DuckDBPyConnection", operation: SQLQuery
+    ) -> Any:
+        """
+        Return the parsed statement for `operation`, or the SQL text
+        itself if it's made of several statements.
+
+        """
+        with self._lock:
+            statement = self._statements.get(operation)
+            if statement is not None:
+                self._statements.move_to_end(operation)
+                self.hits += 1
+                return statement
+            self.misses += 1
+
+        statements = duckdb_cursor.extract_statements(operation)
+        if len(statements) != 1:
+            return operation
+        (statement,) = statements
+        with self._lock:
+            self._statements[operation] = statement
+            self._statements.move_to_end(operation)
+            if len(self._statements) > self.capacity:
+                self._statements.popitem(last=False)
+                self.evictions += 1
+        return statement
+
+    def execute(
+        self,
+        duckdb_cursor: "DuckDBPyConnection",
+        operation: SQLQuery,
+        parameters: Optional[QueryParameters] = None,
+    ):
+        """
+        Execute `operation` on a DuckDB cursor, using a cached parsed
+        statement where possible.
+
+        """
+        kind = statement_kind(operation)
+        if kind in INVALIDATING_STATEMENTS:
+            self.invalidate()
+        elif kind in CACHEABLE_STATEMENTS:
+            operation = self._statement(duckdb_cursor, operation)
+
+        if parameters is None:
+            duckdb_cursor.execute(operation)
+        else:
+            duckdb_cursor.execute(operation, parameters)
+
+    def executemany(
+        self,
+        duckdb_cursor: "DuckDBPyConnection",
+        operation: SQLQuery,
+        seq_of_parameters: Any,
+    ):
+        """
+        Execute `operation` once for each set of parameters.
+
+        DuckDB already parses the statement once per `executemany` call,
+        so this only invalidates the cache after DDL.
+
+        """
+        if statement_kind(operation) in INVALIDATING_STATEMENTS:
+            self.invalidate()
+        duckdb_cursor.executemany(operation, seq_of_parameters)
@@ -0,0 +1,116 @@
+"""
+Statement timeouts.
+
+One watchdog thread per process keeps a heap of deadlines, and calls
+each deadline's callback (which interrupts a cursor's statement) if it
+passes before the deadline is cancelled. Scheduling and cancelling a
+deadline is cheap, so statements which finish in time cost little more
+than a heap push.
+
+"""
+import heapq
+import itertools
+import threading
+from time import perf_counter
+from typing import Callable, List, Optional, Tuple
+
+__all__ = ["Deadline", "Watchdog", "WATCHDOG"]
+
+
+class Deadline:
+    """A callback scheduled with a `Watchdog`, which can be cancelled."""
+
+    __slots__ = ("when", "callback", "_watchdog")
+
+    def __init__(self, when: float, callback: Callable[[], None], watchdog: "Watchdog"):
+        self.when = when
+        self.callback: Optional[Callable[[], None]] = callback
+        self._watchdog = watchdog
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the deadline has been cancelled (or has already fired)."""
+        return self.callback is None
+
+    def cancel(self):
+        """Stop the callback from being called, if it hasn't been already."""
+        if self.callback is not None:
+            self.callback = None
+            self._watchdog._cancelled()  # pylint: disable=protected-access
+
+
+class Watchdog:
+    """
+    A thread calling callbacks at their deadlines. The thread is started
+    on first use.
+
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Deadline]] = []
+        self._ids = itertools.count()
+        self._condition = threading.Condition(threading.Lock())
+        self._thread: Optional[threading.Thread] = None
+        self._cancelled_count = 0
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> Deadline:
+        """Call `callback` on the watchdog thread in `delay` seconds."""
+        deadline = Deadline(perf_counter() + delay, callback, self)
+        with self._condition:
+            heapq.heappush(self._heap, (deadline.when, next(self._ids), deadline))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._work, name="pyduckdb-watchdog", daemon=True
+                )
+                self._thread.start()
+            elif self._heap[0][2] is deadline:
+                self._condition.notify()
+        return deadline
+
+    def _cancelled(self):
+        """
+        Count a cancelled deadline, dropping cancelled deadlines from the
+        heap once they make up most of it, so that long timeouts on many
+        short statements don't let it grow without bound.
+
+        """
+        with self._condition:
+            self._cancelled_count += 1
+            if self._cancelled_count > 64 and self._cancelled_count * 2 > len(
+                self._heap
+            ):
+                # In place, as the watchdog thread holds on to the heap.
+                self._heap[:] = [item for item in self._heap if not item[2].cancelled]
+                heapq.heapify(self._heap)
+                self._cancelled_count = 0
+
+    def _next_due(self) -> Callable[[], None]:
+        """Wait for the next deadline which hasn't been cancelled to pass."""
+        heap = self._heap
+        while True:
+            while heap and heap[0][2].cancelled:
+                heapq.heappop(heap)
+                self._cancelled_count = max(self._cancelled_count - 1, 0)
+            if not heap:
+                self._condition.wait()
+                continue
+            delay = heap[0][0] - perf_counter()
+            if delay > 0:
+                self._condition.wait(delay)
+                continue
+            deadline = heapq.heappop(heap)[2]
+            callback, deadline.callback = deadline.callback, None
+            return callback
+
+    def _work(self):
+        """The watchdog thread's main loop."""
+        while True:
+            with self._condition:
+                callback = self._next_due()
+            try:
+                callback()
+            except Exception:  # pylint: disable=broad-except
+                pass
+
+
+WATCHDOG = Watchdog()
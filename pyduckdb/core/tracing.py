@@ -0,0 +1,179 @@
+"""
+Query tracing and profiling hooks, set with `Connection.set_trace_callback`
+and `Connection.set_profile_callback`.
+
+A trace callback is called with the SQL text of each statement before it
+runs, as with `sqlite3`. A profile callback is called with a
+`QueryProfile` once a statement's results have been consumed: when the
+last row is fetched, or when the cursor runs another statement or is
+closed or garbage collected. Errors raised by either callback are logged
+to the "pyduckdb" logger rather than raised.
+
+"""
+import logging
+import threading
+from time import perf_counter
+from typing import Any, Callable, NamedTuple, Optional
+from pep249 import SQLQuery
+
+__all__ = [
+    "QueryProfile",
+    "TraceCallback",
+    "ProfileCallback",
+    "QueryTimer",
+    "call_hook",
+    "report_profile",
+    "SlowQueryLogger",
+    "set_handoff_wait",
+    "take_handoff_wait",
+]
+
+TraceCallback = Callable[[SQLQuery], None]
+
+_LOGGER = logging.getLogger("pyduckdb")
+_handoff = threading.local()
+
+
+def set_handoff_wait(seconds: float):
+    """
+    Record how long the call now running on this thread waited to be
+    picked up, for async connections' worker threads.
+
+    """
+    _handoff.wait = seconds
+
+
+def take_handoff_wait() -> float:
+    """
+    Return the wait recorded for the call now running on this thread,
+    clearing it so that it's only counted once.
+
+    """
+    wait = getattr(_handoff, "wait", 0.0)
+    _handoff.wait = 0.0
+    return wait
+
+
+class QueryProfile(NamedTuple):
+    """
+    Timings for one statement, in seconds.
+
+    `execute_time` is the time spent running the statement, and
+    `first_row_time` the time from starting it to the first row being
+    fetched (None if no rows were fetched). `fetch_time` is the total time
+    spent fetching rows. For async connections, `queue_time` is the total
+    time the statement's calls spent waiting for the worker thread.
+
+    """
+
+    sql: SQLQuery
+    parameters: Any
+    execute_time: float
+    first_row_time: Optional[float]
+    fetch_time: float
+    rows: int
+    queue_time: float = 0.0
+
+    @property
+    def total_time(self) -> float:
+        """The time spent queued, executing and fetching."""
+        return self.queue_time + self.execute_time + self.fetch_time
+
+
+ProfileCallback = Callable[[QueryProfile], None]
+
+
+class QueryTimer:
+    """Accumulates the timings for one statement as its rows are fetched."""
+
+    __slots__ = (
+        "sql",
+        "parameters",
+        "started_at",
+        "execute_time",
+        "first_row_time",
+        "fetch_time",
+        "rows",
+        "queue_time",
+    )
+
+    def __init__(self, sql: SQLQuery, parameters: Any):
+        self.sql = sql
+        self.parameters = parameters
+        self.execute_time = 0.0
+        self.first_row_time: Optional[float] = None
+        self.fetch_time = 0.0
+        self.rows = 0
+        self.queue_time = take_handoff_wait()
+        self.started_at = perf_counter()
+
+    def executed(self):
+        """Record that the statement has finished running."""
+        self.execute_time = perf_counter() - self.started_at
+
+    def fetched(self, started_at: float, rows: int):
+        """Record a fetch which started at `started_at` and returned `rows`."""
+        finished_at = perf_counter()
+        self.fetch_time += finished_at - started_at
+        if rows and self.first_row_time is None:
+            self.first_row_time = finished_at - self.started_at
+        self.rows += rows
+        self.queue_time += take_handoff_wait()
+
+    def profile(self) -> QueryProfile:
+        """Return the statement's timings."""
+        return QueryProfile(
+            self.sql,
+            self.parameters,
+            self.execute_time,
+            self.first_row_time,
+            self.fetch_time,
+            self.rows,
+            self.queue_time,
+        )
+
+
+def call_hook(hook: Callable[[Any], None], value: Any):
+    """Call a trace or profile callback, logging any error it raises."""
+    try:
+        hook(value)
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception("Error in callback %r.", hook)
+
+
+def report_profile(callback: ProfileCallback, timer: QueryTimer):
+    """Call a profile callback with a statement's timings."""
+    call_hook(callback, timer.profile())
+
+
+class SlowQueryLogger:
+    """
+    A profile callback which logs statements taking at least `threshold`
+    seconds in total, to the "pyduckdb.slow_query" logger by default.
+
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        logger: Optional[logging.Logger] = None,
+        level: int = logging.WARNING,
+    ):
+        self.threshold = threshold
+        self.logger = logger or logging.getLogger("pyduckdb.slow_query")
+        self.level = level
+
+    def __call__(self, profile: QueryProfile):
+        if profile.total_time < self.threshold:
+            return
+        self.logger.log(
+            self.level,
+            "Slow query (%.3fs total, %.3fs executing, %.3fs fetching "
+            "%d rows, %.3fs queued): %s",
+            profile.total_time,
+            profile.execute_time,
+            profile.fetch_time,
+            profile.rows,
+            profile.queue_time,
+            profile.sql,
+        )
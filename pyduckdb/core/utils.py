@@ -1,10 +1,57 @@
 """Some useful utility pieces."""
+import os
+import sys
 from functools import wraps
-from typing import Callable, Optional
+from typing import Any, Callable, Optional, Sequence
 from .types import ReturnType
-from .exceptions import CONNECTION_CLOSED, ProgrammingError
+from .exceptions import (
+    CONNECTION_CLOSED,
+    DUCKDB_ERRORS,
+    NotSupportedError,
+    ProgrammingError,
+    _parse_runtime_error,
+)
+from .metrics import REGISTRY as METRICS
 
-__all__ = ["raise_if_closed"]
+__all__ = [
+    "is_duckdb_connection",
+    "raise_if_closed",
+    "raise_if_closed_and_convert",
+    "check_interruptible",
+    "string_literal",
+    "resolve_file_format",
+]
+
+# File formats inferred from path extensions, for loading and export.
+EXTENSION_FORMATS = {
+    ".csv": "csv",
+    ".tsv": "csv",
+    ".txt": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".json": "ndjson",
+}
+
+
+def is_duckdb_connection(value: Any) -> bool:
+    """
+    Whether `value` is a DuckDBPyConnection. This doesn't import DuckDB:
+    if it hasn't been imported yet, nothing can be a DuckDB connection.
+
+    """
+    duckdb = sys.modules.get("duckdb")
+    return duckdb is not None and isinstance(value, duckdb.DuckDBPyConnection)
+
+
+def check_interruptible(duckdb_connection: Any):
+    """Raise if this DuckDB release can't interrupt statements."""
+    if not hasattr(duckdb_connection, "interrupt"):
+        raise NotSupportedError(
+            "This DuckDB release can't interrupt statements, so statement "
+            "timeouts and cancellation aren't supported."
+        )
 
 
 def raise_if_closed(method: Callable[..., ReturnType]) -> Callable[..., ReturnType]:
@@ -18,12 +65,39 @@ def raise_if_closed(method: Callable[..., ReturnType]) -> Callable[..., ReturnTy
     def wrapped(self, *args, **kwargs):
         """Raise if the connection/cursor is closed."""
         if self._closed:  # pylint: disable=protected-access
+            if METRICS.enabled:
+                METRICS.record_error(ProgrammingError.__name__)
             raise CONNECTION_CLOSED
         return method(self, *args, **kwargs)
 
     return wrapped
 
 
+def raise_if_closed_and_convert(
+    method: Callable[..., ReturnType]
+) -> Callable[..., ReturnType]:
+    """
+    Wrap a connection/cursor method, combining `raise_if_closed` and
+    `convert_runtime_errors` in a single wrapper. This saves a Python
+    frame per call, which matters for the fetch and execute methods.
+
+    """
+
+    @wraps(method)
+    def wrapped(self, *args, **kwargs):
+        """Raise if closed, and raise correct errors from DuckDB's errors."""
+        if self._closed:  # pylint: disable=protected-access
+            if METRICS.enabled:
+                METRICS.record_error(ProgrammingError.__name__)
+            raise CONNECTION_CLOSED
+        try:
+            return method(self, *args, **kwargs)
+        except DUCKDB_ERRORS as err:
+            raise _parse_runtime_error(err) from err
+
+    return wrapped
+
+
 def ignore_transaction_error(
     method: Callable[..., ReturnType]
 ) -> Callable[..., Optional[ReturnType]]:
@@ -38,9 +112,41 @@ def ignore_transaction_error(
         """Ignore transaction errors, returning `None` instead."""
         try:
             return method(*args, **kwargs)
-        except (ProgrammingError, RuntimeError) as err:
+        except (ProgrammingError, *DUCKDB_ERRORS) as err:
             if str(err).endswith("no transaction is active"):
                 return None
             raise
 
     return wrapped
+
+
+def string_literal(value: str) -> str:
+    """Render a string as a SQL string literal."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def resolve_file_format(
+    target: Any, file_format: Optional[str], formats: Sequence[str]
+) -> str:
+    """
+    Return the format of a path or file object, one of `formats`. If it
+    isn't given, it's inferred from a path's extension, and file objects
+    are CSV.
+
+    """
+    is_path = isinstance(target, (str, os.PathLike))
+    if file_format is None:
+        if not is_path:
+            return "csv"
+        extension = os.path.splitext(os.fspath(target))[1].lower()
+        file_format = EXTENSION_FORMATS.get(extension)
+        if file_format not in formats:
+            raise ProgrammingError(
+                f"Cannot infer the format of {os.fspath(target)!r}; pass `format`."
+            )
+        return file_format
+
+    file_format = file_format.lower()
+    if file_format not in formats:
+        raise NotSupportedError(f"Unsupported format {file_format!r}.")
+    return file_format
@@ -0,0 +1,34 @@
+"""
+Process-wide metrics for pyduckdb's connections and cursors: statements
+executed, rows fetched, errors by PEP 249 class, open connections and
+cursors, statement latency, and async worker handoff waits.
+
+Collection is off by default; turn it on with `enable()`, then read the
+metrics with `snapshot()` or `render_prometheus()`.
+
+"""
+from pyduckdb.core.metrics import (
+    DEFAULT_BUCKETS,
+    Histogram,
+    MetricsRegistry,
+    REGISTRY,
+    disable,
+    enable,
+    is_enabled,
+    render_prometheus,
+    reset,
+    snapshot,
+)
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "Histogram",
+    "MetricsRegistry",
+    "REGISTRY",
+    "enable",
+    "disable",
+    "is_enabled",
+    "reset",
+    "snapshot",
+    "render_prometheus",
+]
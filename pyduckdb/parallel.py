@@ -0,0 +1,17 @@
+"""
+Running queries in parallel: many parameter sets of one statement on a
+pool of threads (see `Connection.execute_parallel`), and scans of a
+read-only database file across several processes, for Python
+post-processing which would otherwise be limited to one core by the GIL.
+
+"""
+from pyduckdb.core.parallel import ParallelExecution, ParallelResult, default_workers
+from pyduckdb.core.process_map import map_query, partition_queries
+
+__all__ = [
+    "ParallelExecution",
+    "ParallelResult",
+    "default_workers",
+    "map_query",
+    "partition_queries",
+]
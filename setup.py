@@ -28,7 +28,12 @@ setuptools.setup(
     ],
     python_requires=">=3.7",
     install_requires=[
-        "duckdb==0.2.5",
+        "duckdb>=0.9.0",
         "pep249>=0.0.1b3"
-    ]
+    ],
+    extras_require={
+        "numpy": ["numpy"],
+        "pandas": ["pandas"],
+        "arrow": ["pyarrow"],
+    }
 )